@@ -17,6 +17,9 @@ except ImportError:
 
 
 if __name__ == "__main__":
+    from geomagio.edge import EdgeFactory
+    from geomagio.WebService import WebService
+
     # read configuration from environment
     edge_host = os.getenv("EDGE_HOST", "cwbpub.cr.usgs.gov")
     edge_port = int(os.getenv("EDGE_PORT", "2060"))
@@ -27,11 +30,11 @@ if __name__ == "__main__":
 
     # configure factory
     if factory_type == "edge":
-        factory = geomagio.edge.EdgeFactory(host=edge_host, port=edge_port)
+        factory = EdgeFactory(host=edge_host, port=edge_port)
     else:
         raise "Unknown factory type '%s'" % factory_type
 
     print("Starting webservice on %s:%d" % (webservice_host, webservice_port))
-    app = geomagio.WebService(factory, version)
+    app = WebService(factory, version)
     httpd = make_server(webservice_host, webservice_port, app)
     httpd.serve_forever()
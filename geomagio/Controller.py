@@ -3,24 +3,51 @@ from __future__ import absolute_import, print_function
 from builtins import str as unicode
 
 import argparse
+import copy
+import math
 import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from obspy.core import Stream, UTCDateTime
-from .algorithm import algorithms, AlgorithmException
-from .PlotTimeseriesFactory import PlotTimeseriesFactory
+from .algorithm import algorithms, AlgorithmException, PipelineAlgorithm
+from .Metrics import Metrics
+from .Registry import Registry
 from .StreamTimeseriesFactory import StreamTimeseriesFactory
 from . import TimeseriesUtility, Util
 
-# factory packages
-from . import binlog
-from . import edge
-from . import iaga2002
-from . import imfjson
-from . import pcdcp
-from . import imfv122
-from . import imfv283
-from . import temperature
-from . import vbf
+
+# intervals run_as_update checks when --update-limit is 0
+MAX_UPDATE_INTERVALS = 1000
+
+# factories used by --input, imported when used
+input_factories = Registry(
+    {
+        "edge": "geomagio.edge:EdgeFactory",
+        "goes": "geomagio.imfv283:GOESIMFV283Factory",
+        "iaga2002": "geomagio.iaga2002:IAGA2002Factory",
+        "imfv122": "geomagio.imfv122:IMFV122Factory",
+        "imfv283": "geomagio.imfv283:IMFV283Factory",
+        "miniseed": "geomagio.edge:MiniSeedFactory",
+        "pcdcp": "geomagio.pcdcp:PCDCPFactory",
+    }
+)
+
+# factories used by --output, imported when used
+output_factories = Registry(
+    {
+        "binlog": "geomagio.binlog:BinLogFactory",
+        "edge": "geomagio.edge:EdgeFactory",
+        "iaga2002": "geomagio.iaga2002:IAGA2002Factory",
+        "imfjson": "geomagio.imfjson:IMFJSONFactory",
+        "miniseed": "geomagio.edge:EdgeFactory",
+        "pcdcp": "geomagio.pcdcp:PCDCPFactory",
+        "plot": "geomagio.PlotTimeseriesFactory:PlotTimeseriesFactory",
+        "temperature": "geomagio.temperature:TEMPFactory",
+        "vbf": "geomagio.vbf:VBFFactory",
+    }
+)
 
 
 class Controller(object):
@@ -34,6 +61,9 @@ class Controller(object):
         the factory that will output the timeseries data
     algorithm: Algorithm
         the algorithm(s) that will procees the timeseries data
+    metrics: Metrics
+        optional, records time spent and samples handled by each stage,
+        and requests and bytes for each factory.
 
     Notes
     -----
@@ -46,10 +76,22 @@ class Controller(object):
         recursively backup so it can update all missing data.
     """
 
-    def __init__(self, inputFactory, outputFactory, algorithm):
+    def __init__(self, inputFactory, outputFactory, algorithm, metrics=None):
         self._inputFactory = inputFactory
         self._algorithm = algorithm
         self._outputFactory = outputFactory
+        self.metrics = metrics or Metrics()
+
+    def close(self):
+        """Close the input and output factories.
+
+        Waits for output that is written in the background,
+        and raises any error writing it.
+        """
+        try:
+            self._inputFactory.close()
+        finally:
+            self._outputFactory.close()
 
     def _get_input_timeseries(self, observatory, channels, starttime, endtime):
         """Get timeseries from the input factory for requested options.
@@ -75,21 +117,31 @@ class Controller(object):
         timeseries : obspy.core.Stream
         """
         timeseries = Stream()
-        for obs in observatory:
-            # get input interval for observatory
-            # do this per observatory in case an
-            # algorithm needs different amounts of data
-            input_start, input_end = self._algorithm.get_input_interval(
-                start=starttime, end=endtime, observatory=obs, channels=channels
-            )
-            if input_start is None or input_end is None:
-                continue
-            timeseries += self._inputFactory.get_timeseries(
-                observatory=obs,
-                starttime=input_start,
-                endtime=input_end,
-                channels=channels,
-            )
+        with self.metrics.timer("stage", stage="input"):
+            # observatories with the same input interval, keyed by interval
+            # UTCDateTime is not hashable
+            groups = OrderedDict()
+            for obs in observatory:
+                # get input interval for observatory
+                # do this per observatory in case an
+                # algorithm needs different amounts of data
+                input_start, input_end = self._algorithm.get_input_interval(
+                    start=starttime, end=endtime, observatory=obs, channels=channels
+                )
+                if input_start is None or input_end is None:
+                    continue
+                key = (input_start.ns, input_end.ns)
+                groups.setdefault(key, (input_start, input_end, []))[2].append(obs)
+            # request observatories with the same interval together
+            for input_start, input_end, observatories in groups.values():
+                timeseries += self._get_timeseries(
+                    factory=self._inputFactory,
+                    observatories=observatories,
+                    starttime=input_start,
+                    endtime=input_end,
+                    channels=channels,
+                )
+        self._record_samples("input", timeseries)
         return timeseries
 
     def _rename_channels(self, timeseries, renames):
@@ -134,13 +186,103 @@ class Controller(object):
         timeseries : obspy.core.Stream
         """
         timeseries = Stream()
-        for obs in observatory:
-            timeseries += self._outputFactory.get_timeseries(
-                observatory=obs, starttime=starttime, endtime=endtime, channels=channels
+        with self.metrics.timer("stage", stage="output_read"):
+            for obs in observatory:
+                timeseries += self._get_timeseries(
+                    factory=self._outputFactory,
+                    observatory=obs,
+                    starttime=starttime,
+                    endtime=endtime,
+                    channels=channels,
+                )
+        self._record_samples("output_read", timeseries)
+        return timeseries
+
+    def _get_timeseries(self, factory, observatories=None, **kwargs):
+        """Get timeseries from a factory, and record the request.
+
+        Parameters
+        ----------
+        factory : TimeseriesFactory
+            factory to read.
+        observatories : array_like
+            when set, factory.get_timeseries_observatories is called instead.
+        **kwargs
+            passed to factory.get_timeseries.
+
+        Returns
+        -------
+        timeseries : obspy.core.Stream
+        """
+        if observatories is None:
+            timeseries = factory.get_timeseries(**kwargs)
+        else:
+            timeseries = factory.get_timeseries_observatories(
+                observatories=observatories, **kwargs
             )
+        self._record_request(factory, "get", timeseries)
+        return timeseries
+
+    def _put_timeseries(self, factory, timeseries, **kwargs):
+        """Put timeseries to a factory, and record the request.
+
+        Parameters
+        ----------
+        factory : TimeseriesFactory
+            factory to write.
+        timeseries : obspy.core.Stream
+            data to write.
+        **kwargs
+            passed to factory.put_timeseries.
+        """
+        with self.metrics.timer("stage", stage="output"):
+            factory.put_timeseries(timeseries=timeseries, **kwargs)
+        self._record_request(factory, "put", timeseries)
+        self._record_samples("output", timeseries)
+
+    def _process(self, timeseries):
+        """Process timeseries using the algorithm.
+
+        Each algorithm in a PipelineAlgorithm is timed separately.
+
+        Parameters
+        ----------
+        timeseries : obspy.core.Stream
+            input data.
+
+        Returns
+        -------
+        timeseries : obspy.core.Stream
+            processed data.
+        """
+        algorithms = [self._algorithm]
+        if isinstance(self._algorithm, PipelineAlgorithm):
+            algorithms = self._algorithm.algorithms
+        for algorithm in algorithms:
+            name = algorithm.__class__.__name__
+            with self.metrics.timer("stage", stage="process", algorithm=name):
+                timeseries = algorithm.process(timeseries)
+            self._record_samples("process", timeseries, algorithm=name)
         return timeseries
 
-    def run(self, options, input_timeseries=None):
+    def _record_request(self, factory, operation, timeseries):
+        """Record a factory request and the number of bytes transferred."""
+        labels = {"factory": factory.__class__.__name__, "operation": operation}
+        self.metrics.increment("factory_requests", **labels)
+        self.metrics.increment(
+            "factory_bytes", sum(trace.data.nbytes for trace in timeseries), **labels
+        )
+
+    def _record_samples(self, stage, timeseries, **labels):
+        """Record the number of samples handled by a stage."""
+        self.metrics.increment(
+            "stage_samples",
+            sum(len(trace.data) for trace in timeseries),
+            stage=stage,
+            **labels
+        )
+
+    def run(self, options, input_timeseries=None, output_gaps=None):
         """run controller
         Parameters
         ----------
@@ -150,6 +292,9 @@ class Controller(object):
         input_timeseries : obspy.core.Stream
             Used by run_as_update to save a double input read, since it has
             already read the input to confirm data can be produced.
+        output_gaps : array_like
+            Used by run_as_update to only write data within gaps,
+            so existing output between gaps is not replaced.
         """
         algorithm = self._algorithm
         input_channels = options.inchannels or algorithm.get_input_channels()
@@ -182,25 +327,77 @@ class Controller(object):
             TimeseriesUtility.pad_timeseries(timeseries, next_starttime, input_end)
         # process
         if options.rename_input_channel:
-            timeseries = self._rename_channels(
-                timeseries=timeseries, renames=options.rename_input_channel
-            )
-        processed = algorithm.process(timeseries)
+            with self.metrics.timer("stage", stage="rename"):
+                timeseries = self._rename_channels(
+                    timeseries=timeseries, renames=options.rename_input_channel
+                )
+        processed = self._process(timeseries)
         # trim if --no-trim is not set
         if not options.no_trim:
-            processed.trim(starttime=starttime, endtime=endtime)
+            with self.metrics.timer("stage", stage="trim"):
+                processed.trim(starttime=starttime, endtime=endtime)
+            self._record_samples("trim", processed)
         if options.rename_output_channel:
-            processed = self._rename_channels(
-                timeseries=processed, renames=options.rename_output_channel
-            )
+            with self.metrics.timer("stage", stage="rename"):
+                processed = self._rename_channels(
+                    timeseries=processed, renames=options.rename_output_channel
+                )
+        if output_gaps is not None:
+            TimeseriesUtility.fill_outside_gaps(processed, output_gaps)
         # output
-        self._outputFactory.put_timeseries(
+        self._put_timeseries(
+            factory=self._outputFactory,
             timeseries=processed,
             starttime=starttime,
             endtime=endtime,
             channels=output_channels,
         )
 
+    def run_chunks(self, options):
+        """run controller over consecutive chunks of the requested interval.
+
+        Parameters
+        ----------
+        options: dictionary
+            The dictionary of all the command line arguments. Could in theory
+            contain other options passed in by the controller.
+            options.chunk_size is the number of seconds in each chunk.
+
+        Notes
+        -----
+        Chunks are aligned to multiples of chunk_size since the unix epoch.
+        Each chunk is read, processed, and written before the next chunk is
+        read, so memory use depends on chunk_size instead of the length of
+        [starttime, endtime].  Additional input each chunk needs, such as
+        filter taps, is requested using algorithm.get_input_interval,
+        the same as for run.
+        """
+        delta = TimeseriesUtility.get_delta_from_interval(
+            options.output_interval or options.interval
+        )
+        chunks = Util.get_intervals(
+            starttime=options.starttime,
+            # intervals are [start, end), include sample at endtime
+            endtime=options.endtime + delta,
+            size=options.chunk_size,
+            trim=True,
+        )
+        for chunk in chunks:
+            chunk_options = copy.copy(options)
+            chunk_options.starttime = chunk["start"]
+            chunk_options.endtime = chunk["end"] - delta
+            next_starttime = self._algorithm.get_next_starttime()
+            if next_starttime and next_starttime > chunk_options.endtime:
+                # stateful algorithm already processed this chunk
+                continue
+            print(
+                "processing chunk",
+                chunk_options.starttime,
+                chunk_options.endtime,
+                file=sys.stderr,
+            )
+            self.run(chunk_options)
+
     def run_as_update(self, options, update_count=0):
         """Updates data.
         Parameters
@@ -208,89 +405,175 @@ class Controller(object):
         options: dictionary
             The dictionary of all the command line arguments. Could in theory
             contain other options passed in by the controller.
+        update_count: int
+            number of intervals already checked, compared to
+            options.update_limit.
 
         Notes
         -----
         Finds gaps in the target data, and if there's new data in the input
-            source, calls run with the start/end time of a given gap to fill
-            in.
+            source, processes data to fill in those gaps.
         It checks the start of the target data, and if it's missing, and
-            there's new data available, it backs up the starttime/endtime,
-            and recursively calls itself, to check the previous period, to see
-            if new data is available there as well. Calls run for each new
-            period, oldest to newest.
+            there's new data available, it backs up the starttime/endtime
+            to check the previous interval as well, until an interval does
+            not start with a fillable gap or update_limit is reached.
+            Without an update_limit, at most MAX_UPDATE_INTERVALS intervals
+            are checked.
+        Output for all intervals that may be checked is read at once.
+            Without an update_limit, the output read is extended to twice as
+            many intervals each time it is exhausted.
+        Gaps are then grouped into spans, and each span is updated oldest to
+            newest, using one input read, and one call to run that only
+            writes data within fillable gaps.
         """
-        # If an update_limit is set, make certain we don't step past it.
-        if options.update_limit != 0:
-            if update_count >= options.update_limit:
-                return
         algorithm = self._algorithm
         if algorithm.get_next_starttime() is not None:
             raise AlgorithmException("Stateful algorithms cannot use run_as_update")
         input_channels = options.inchannels or algorithm.get_input_channels()
         output_observatory = options.output_observatory
         output_channels = options.outchannels or algorithm.get_output_channels()
-        print(
-            "checking gaps",
-            options.starttime,
-            options.endtime,
-            output_observatory,
-            output_channels,
-            file=sys.stderr,
-        )
-        # request output to see what has already been generated
-        output_timeseries = self._get_output_timeseries(
-            observatory=options.output_observatory,
-            starttime=options.starttime,
-            endtime=options.endtime,
-            channels=output_channels,
-        )
-        if len(output_timeseries) > 0:
-            # find gaps in output, so they can be updated
-            output_gaps = TimeseriesUtility.get_merged_gaps(
-                TimeseriesUtility.get_stream_gaps(output_timeseries)
-            )
-        else:
-            output_gaps = [
-                [
-                    options.starttime,
-                    options.endtime,
-                    # next sample time not used
-                    None,
-                ]
-            ]
-        for output_gap in output_gaps:
+        interval = options.endtime - options.starttime
+        starttime = options.starttime
+        endtime = options.endtime
+        # number of intervals that may be checked, None when unlimited
+        remaining = None
+        if options.update_limit != 0:
+            remaining = options.update_limit - update_count
+            if remaining <= 0:
+                return
+        # read output for all intervals that may be checked
+        read_count = remaining or 1
+        read_start = starttime - (read_count - 1) * interval
+        output_gaps = self._get_output_gaps(options, read_start, endtime)
+        # step back while an interval starts with a fillable gap
+        checked = 1
+        while checked < (remaining or MAX_UPDATE_INTERVALS):
+            start_gaps = [gap for gap in output_gaps if gap[0] <= starttime <= gap[1]]
+            if len(start_gaps) == 0:
+                break
+            gap_end = min(start_gaps[0][1], starttime + interval)
             input_timeseries = self._get_input_timeseries(
                 observatory=options.observatory,
-                starttime=output_gap[0],
-                endtime=output_gap[1],
+                starttime=starttime,
+                endtime=gap_end,
                 channels=input_channels,
             )
-            if not algorithm.can_produce_data(
-                starttime=output_gap[0], endtime=output_gap[1], stream=input_timeseries
+            if input_timeseries.count() == 0 or not algorithm.can_produce_data(
+                starttime=starttime, endtime=gap_end, stream=input_timeseries
             ):
+                break
+            if starttime - interval < read_start:
+                # unlimited, read output for as many earlier intervals
+                count = min(read_count, MAX_UPDATE_INTERVALS - read_count)
+                previous_start = read_start - count * interval
+                output_gaps = (
+                    self._get_output_gaps(options, previous_start, read_start - 1)
+                    + output_gaps
+                )
+                read_start = previous_start
+                read_count += count
+            starttime = starttime - interval
+            checked += 1
+        output_gaps = [
+            [max(gap[0], starttime), gap[1], gap[2]]
+            for gap in output_gaps
+            if gap[1] >= starttime
+        ]
+        # fill gaps, one span of nearby gaps at a time, oldest to newest
+        for span in self._get_gap_spans(output_gaps, interval):
+            # read input for all gaps in span at once
+            input_timeseries = self._get_input_timeseries(
+                observatory=options.observatory,
+                starttime=span[0][0],
+                endtime=span[-1][1],
+                channels=input_channels,
+            )
+            fillable_gaps = [
+                output_gap
+                for output_gap in span
+                if algorithm.can_produce_data(
+                    starttime=output_gap[0],
+                    endtime=output_gap[1],
+                    stream=input_timeseries,
+                )
+            ]
+            if len(fillable_gaps) == 0:
                 continue
-            # check for fillable gap at start
-            if output_gap[0] == options.starttime:
-                # found fillable gap at start, recurse to previous interval
-                interval = options.endtime - options.starttime
-                starttime = options.starttime - interval
-                endtime = options.starttime - 1
-                options.starttime = starttime
-                options.endtime = endtime
-                self.run_as_update(options, update_count + 1)
-            # fill gap
-            options.starttime = output_gap[0]
-            options.endtime = output_gap[1]
+            update_options = copy.copy(options)
+            update_options.starttime = fillable_gaps[0][0]
+            update_options.endtime = fillable_gaps[-1][1]
             print(
                 "processing",
-                options.starttime,
-                options.endtime,
+                update_options.starttime,
+                update_options.endtime,
                 output_observatory,
                 output_channels,
                 file=sys.stderr,
             )
-            self.run(options, input_timeseries)
+            self.run(update_options, input_timeseries, output_gaps=fillable_gaps)
+
+    def _get_output_gaps(self, options, starttime, endtime):
+        """Find gaps in existing output.
+
+        Parameters
+        ----------
+        options: dictionary
+            command line arguments.
+        starttime : obspy.core.UTCDateTime
+            time of first sample to check.
+        endtime : obspy.core.UTCDateTime
+            time of last sample to check.
+
+        Returns
+        -------
+        array_like
+            merged gaps, see TimeseriesUtility.get_merged_gaps.
+        """
+        output_channels = options.outchannels or self._algorithm.get_output_channels()
+        print(
+            "checking gaps",
+            starttime,
+            endtime,
+            options.output_observatory,
+            output_channels,
+            file=sys.stderr,
+        )
+        # request output to see what has already been generated
+        output_timeseries = self._get_output_timeseries(
+            observatory=options.output_observatory,
+            starttime=starttime,
+            endtime=endtime,
+            channels=output_channels,
+        )
+        if len(output_timeseries) == 0:
+            # next sample time not used
+            return [[starttime, endtime, None]]
+        return TimeseriesUtility.get_merged_gaps(
+            TimeseriesUtility.get_stream_gaps(output_timeseries)
+        )
+
+    def _get_gap_spans(self, gaps, interval):
+        """Group gaps that are close together.
+
+        Parameters
+        ----------
+        gaps : array_like
+            gaps, in order.
+        interval : float
+            gaps separated by less than this many seconds are grouped.
+
+        Returns
+        -------
+        list<list>
+            groups of gaps, in order.
+        """
+        spans = []
+        for gap in gaps:
+            if spans and gap[0] - spans[-1][-1][1] < interval:
+                spans[-1].append(gap)
+            else:
+                spans.append([gap])
+        return spans
 
 
 def get_input_factory(args):
@@ -328,45 +611,59 @@ def get_input_factory(args):
             input_stream = BytesIO(Util.read_url(args.input_url))
     input_type = args.input
     if input_type == "edge":
-        input_factory = edge.EdgeFactory(
+        input_factory = input_factories[input_type](
             host=args.input_host,
             port=args.input_port,
             locationCode=args.locationcode,
+            concurrency=args.input_concurrency,
             **input_factory_args
         )
     elif input_type == "miniseed":
-        input_factory = edge.MiniSeedFactory(
+        input_factory = input_factories[input_type](
             host=args.input_host,
             port=args.input_port,
             locationCode=args.locationcode,
             convert_channels=args.convert_voltbin,
+            concurrency=args.input_concurrency,
             **input_factory_args
         )
     elif input_type == "goes":
         # TODO: deal with other goes arguments
-        input_factory = imfv283.GOESIMFV283Factory(
+        input_factory = input_factories[input_type](
             directory=args.input_goes_directory,
             getdcpmessages=args.input_goes_getdcpmessages,
             password=args.input_goes_password,
             server=args.input_goes_server,
             user=args.input_goes_user,
+            cache_directory=args.input_cache,
+            cache_settle=args.input_cache_settle,
+            concurrency=args.input_concurrency,
+            server_concurrency=args.input_goes_server_concurrency,
             **input_factory_args
         )
     else:
         # stream compatible factories
-        if input_type == "iaga2002":
-            input_factory = iaga2002.IAGA2002Factory(**input_factory_args)
-        elif input_type == "imfv122":
-            input_factory = imfv122.IMFV122Factory(**input_factory_args)
-        elif input_type == "imfv283":
-            input_factory = imfv283.IMFV283Factory(**input_factory_args)
-        elif input_type == "pcdcp":
-            input_factory = pcdcp.PCDCPFactory(**input_factory_args)
+        input_factory = input_factories[input_type](**input_factory_args)
         # wrap stream
         if input_stream is not None:
             input_factory = StreamTimeseriesFactory(
                 factory=input_factory, stream=input_stream
             )
+    if args.input_cache and input_type in ["edge", "miniseed"]:
+        from .edge.WaveformCache import WaveformCache
+
+        input_factory.client = WaveformCache(
+            client=input_factory.client,
+            directory=args.input_cache,
+            max_size=args.input_cache_size * 1024 * 1024,
+            settle_time=args.input_cache_settle,
+        )
+    if args.input_incremental and input_type in ["edge", "miniseed"]:
+        from .edge.TailBuffer import TailBuffer
+
+        input_factory.client = TailBuffer(
+            client=input_factory.client, overlap=args.input_tail_overlap
+        )
     return input_factory
 
 
@@ -412,46 +709,45 @@ def get_output_factory(args):
     if output_type == "edge":
         # TODO: deal with other edge arguments
         locationcode = args.outlocationcode or args.locationcode or None
-        output_factory = edge.EdgeFactory(
+        output_factory = output_factories[output_type](
             host=args.output_host,
             port=args.output_read_port,
             write_port=args.output_port,
             locationCode=locationcode,
             tag=args.output_edge_tag,
             forceout=args.output_edge_forceout,
+            concurrency=args.output_concurrency,
             **output_factory_args
         )
     elif output_type == "miniseed":
         # TODO: deal with other miniseed arguments
         locationcode = args.outlocationcode or args.locationcode or None
-        output_factory = edge.EdgeFactory(
+        output_factory = output_factories[output_type](
             host=args.output_host,
             port=args.output_read_port,
             write_port=args.output_port,
             locationCode=locationcode,
+            concurrency=args.output_concurrency,
             **output_factory_args
         )
     elif output_type == "plot":
-        output_factory = PlotTimeseriesFactory()
+        output_factory = output_factories[output_type]()
     else:
         # stream compatible factories
-        if output_type == "binlog":
-            output_factory = binlog.BinLogFactory(**output_factory_args)
-        elif output_type == "iaga2002":
-            output_factory = iaga2002.IAGA2002Factory(**output_factory_args)
-        elif output_type == "imfjson":
-            output_factory = imfjson.IMFJSONFactory(**output_factory_args)
-        elif output_type == "pcdcp":
-            output_factory = pcdcp.PCDCPFactory(**output_factory_args)
-        elif output_type == "temperature":
-            output_factory = temperature.TEMPFactory(**output_factory_args)
-        elif output_type == "vbf":
-            output_factory = vbf.VBFFactory(**output_factory_args)
+        output_factory = output_factories[output_type](**output_factory_args)
         # wrap stream
         if output_stream is not None:
             output_factory = StreamTimeseriesFactory(
                 factory=output_factory, stream=output_stream
             )
+    if args.output_spool and output_type in ["edge", "miniseed"]:
+        from .edge.SpoolFactory import SpoolFactory
+
+        output_factory = SpoolFactory(
+            factory=output_factory,
+            directory=args.output_spool,
+            flush_interval=args.output_spool_interval,
+        )
     return output_factory
 
 
@@ -486,6 +782,12 @@ def main(args):
     if args.output_stdout and args.update:
         raise Exception("Cannot combine" + " --output-stdout and --update")
 
+    if args.daemon:
+        if not args.realtime:
+            raise Exception("Cannot use --daemon without --realtime")
+        if args.jobs > 1:
+            raise Exception("Cannot combine --daemon and --jobs")
+
     # translate realtime into start/end times
     if args.realtime:
         if args.realtime is True:
@@ -499,19 +801,15 @@ def main(args):
             else:
                 args.realtime = 600
         # calculate endtime/starttime
-        now = UTCDateTime()
-        args.endtime = UTCDateTime(now.year, now.month, now.day, now.hour, now.minute)
-        args.starttime = args.endtime - args.realtime
+        args.starttime, args.endtime = get_realtime_interval(args.realtime)
 
-    if args.observatory_foreach:
-        observatory = args.observatory
-        observatory_exception = None
-        for obs in observatory:
-            args.observatory = (obs,)
-            args.output_observatory = (obs,)
-            try:
-                _main(args)
-            except Exception as e:
+    if args.daemon:
+        run_daemon(args)
+    elif args.observatory_foreach:
+        observatory_exception = False
+        for obs, e in run_observatories(args):
+            if e is not None:
+                observatory_exception = True
                 print(
                     "Exception processing observatory {}".format(obs),
                     str(e),
@@ -525,6 +823,163 @@ def main(args):
         _main(args)
 
 
+def get_realtime_interval(interval_seconds):
+    """Get the interval of the last N seconds.
+
+    Parameters
+    ----------
+    interval_seconds : int
+        number of seconds in interval.
+
+    Returns
+    -------
+    tuple: (starttime, endtime)
+        starttime: obspy.core.UTCDateTime
+        endtime: obspy.core.UTCDateTime
+            the start of the current minute.
+    """
+    now = UTCDateTime()
+    endtime = UTCDateTime(now.year, now.month, now.day, now.hour, now.minute)
+    starttime = endtime - interval_seconds
+    return (starttime, endtime)
+
+
+def get_next_tick(now, interval):
+    """Get the next time aligned to a multiple of interval.
+
+    Parameters
+    ----------
+    now : float
+        current unix epoch time in seconds.
+    interval : int
+        seconds between ticks.
+
+    Returns
+    -------
+    float
+        first multiple of interval after now.
+    """
+    return (math.floor(now / interval) + 1) * interval
+
+
+def run_daemon(args):
+    """Run controller(s) every --daemon-interval seconds, until interrupted.
+
+    Factories and algorithms are created once and reused for each run,
+    so stateful algorithms keep their state in memory between runs.
+    Each run processes the --realtime interval ending at the current
+    minute.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        command line arguments
+
+    Notes
+    -----
+    Runs are scheduled at multiples of --daemon-interval since the epoch.
+    When a run takes longer than the interval, ticks that were missed are
+    dropped instead of run late.
+    """
+    if args.observatory_foreach:
+        runs = []
+        for obs in args.observatory:
+            obs_args = copy.copy(args)
+            obs_args.observatory = (obs,)
+            obs_args.output_observatory = (obs,)
+            runs.append((obs_args, get_controller(obs_args)))
+    else:
+        runs = [(args, get_controller(args))]
+    interval = args.daemon_interval
+    # first run starts immediately
+    tick = None
+    try:
+        while True:
+            for run_args, controller in runs:
+                run_args.starttime, run_args.endtime = get_realtime_interval(
+                    run_args.realtime
+                )
+                try:
+                    run_controller(controller, run_args)
+                except Exception as e:
+                    print(
+                        "Exception processing observatory {}".format(
+                            ",".join(run_args.observatory)
+                        ),
+                        str(e),
+                        file=sys.stderr,
+                    )
+            now = time.time()
+            next_tick = get_next_tick(now, interval)
+            if tick is not None:
+                dropped = int(round((next_tick - tick) / interval)) - 1
+                if dropped > 0:
+                    print("Dropped {} late run(s)".format(dropped), file=sys.stderr)
+            tick = next_tick
+            time.sleep(max(0, tick - now))
+    finally:
+        for run_args, controller in runs:
+            controller.close()
+
+
+def run_observatories(args):
+    """Run _main separately for each observatory.
+
+    Used by --observatory-foreach.  When --jobs is more than 1,
+    observatories are processed in parallel using a pool of processes,
+    and each process creates its own factories and algorithm.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        command line arguments
+
+    Returns
+    -------
+    list<tuple>
+        one (observatory, exception) tuple per observatory, in the order
+        observatories were specified.
+        exception is None when the observatory was processed successfully.
+    """
+    observatories = args.observatory
+    results = []
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = [
+                executor.submit(_main_observatory, args, obs) for obs in observatories
+            ]
+            for obs, future in zip(observatories, futures):
+                try:
+                    future.result()
+                    results.append((obs, None))
+                except Exception as e:
+                    results.append((obs, e))
+    else:
+        for obs in observatories:
+            try:
+                _main_observatory(args, obs)
+                results.append((obs, None))
+            except Exception as e:
+                results.append((obs, e))
+    return results
+
+
+def _main_observatory(args, observatory):
+    """Call _main for a single observatory.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        command line arguments, not modified.
+    observatory : str
+        observatory to process.
+    """
+    args = copy.copy(args)
+    args.observatory = (observatory,)
+    args.output_observatory = (observatory,)
+    _main(args)
+
+
 def _main(args):
     """Actual main method logic, called by main
 
@@ -533,17 +988,98 @@ def _main(args):
     args : argparse.Namespace
         command line arguments
     """
-    # create controller
+    controller = get_controller(args)
+    try:
+        run_controller(controller, args)
+    finally:
+        controller.close()
+
+
+def get_controller(args):
+    """Create a controller with factories and algorithm from arguments.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        command line arguments
+
+    Returns
+    -------
+    Controller
+        configured controller.
+    """
     input_factory = get_input_factory(args)
     output_factory = get_output_factory(args)
-    algorithm = algorithms[args.algorithm]()
-    algorithm.configure(args)
-    controller = Controller(input_factory, output_factory, algorithm)
+    algorithm = get_algorithm(args)
+    return Controller(input_factory, output_factory, algorithm)
+
 
-    if args.update:
-        controller.run_as_update(args)
+def get_algorithm(args):
+    """Parse algorithm arguments.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        arguments
+
+    Returns
+    -------
+    Algorithm
+        configured algorithm.
+        a PipelineAlgorithm when more than one algorithm is specified.
+    """
+    names = args.algorithm
+    if isinstance(names, (str, unicode)):
+        names = [names]
+    if len(names) == 1:
+        algorithm = algorithms[names[0]]()
     else:
-        controller.run(args)
+        algorithm = PipelineAlgorithm([algorithms[name]() for name in names])
+    algorithm.configure(args)
+    return algorithm
+
+
+def run_controller(controller, args):
+    """Run controller using the mode selected by arguments.
+
+    Parameters
+    ----------
+    controller : Controller
+        controller to run.
+    args : argparse.Namespace
+        command line arguments
+
+    Notes
+    -----
+    When --metrics-file is set, metrics for this run are written after
+    the run completes, even if it fails.
+    """
+    observatory = [obs for obs in args.observatory if obs]
+    controller.metrics = Metrics(labels={"observatory": ",".join(observatory)})
+    try:
+        if args.update:
+            controller.run_as_update(args)
+        elif args.chunk_size > 0:
+            controller.run_chunks(args)
+        else:
+            controller.run(args)
+    finally:
+        if args.metrics_file:
+            controller.metrics.write_file(
+                args.metrics_file.format(obs="-".join(observatory)),
+                format=args.metrics_format,
+            )
+
+
+def _location_code(code):
+    """Validate a location code argument.
+
+    Imports geomagio.edge only when a location code is used,
+    see geomagio.edge.LocationCode.
+    """
+    from .edge.LocationCode import LocationCode
+
+    return LocationCode(code)
 
 
 def parse_args(args):
@@ -558,6 +1094,9 @@ def parse_args(args):
     argparse.Namespace
         dictionary like object containing arguments.
     """
+    # importing algorithms can be slow,
+    # only add arguments for algorithms that are used
+    algorithm_names = get_algorithm_names(args)
     parser = argparse.ArgumentParser(
         description="""
             Read, optionally process, and Write Geomag Timeseries data.
@@ -571,11 +1110,51 @@ def parse_args(args):
     input_type_group = input_group.add_mutually_exclusive_group(required=True)
     input_type_group.add_argument(
         "--input",
-        choices=("edge", "goes", "iaga2002", "imfv122", "imfv283", "miniseed", "pcdcp"),
+        choices=[k for k in input_factories],
         default="edge",
         help='Input format (Default "edge")',
     )
 
+    input_group.add_argument(
+        "--input-cache",
+        default=None,
+        help="""
+                Cache edge, miniseed or goes input in DIRECTORY,
+                and only request data that is not cached.
+                """,
+        metavar="DIRECTORY",
+    )
+    input_group.add_argument(
+        "--input-cache-settle",
+        default=600,
+        help="""
+                Data newer than N seconds may still change,
+                and is not cached (Default 600)
+                """,
+        metavar="N",
+        type=int,
+    )
+    input_group.add_argument(
+        "--input-cache-size",
+        default=1024,
+        help="""
+                Maximum size of --input-cache in megabytes,
+                least recently used days are removed (Default 1024)
+                """,
+        metavar="MB",
+        type=int,
+    )
+    input_group.add_argument(
+        "--input-concurrency",
+        default=1,
+        help="""
+                Number of channels to request at the same time,
+                when using edge or miniseed input,
+                or observatories when using goes input (Default 1)
+                """,
+        metavar="N",
+        type=int,
+    )
     input_group.add_argument(
         "--input-file", help="Read from specified file", metavar="FILE"
     )
@@ -585,6 +1164,27 @@ def parse_args(args):
         help='Hostname or IP address (Default "cwbpub.cr.usgs.gov")',
         metavar="HOST",
     )
+    input_group.add_argument(
+        "--input-incremental",
+        action="store_true",
+        default=False,
+        help="""
+                Keep recent edge or miniseed input in memory,
+                and only request samples after the last sample received.
+                Used with --daemon.
+                """,
+    )
+    input_group.add_argument(
+        "--input-tail-overlap",
+        default=600,
+        help="""
+                Seconds before the last sample received to request again
+                with --input-incremental, so gaps filled late are updated,
+                default 600.
+                """,
+        metavar="N",
+        type=float,
+    )
     input_group.add_argument(
         "--input-interval",
         default=None,
@@ -637,7 +1237,7 @@ def parse_args(args):
                 instead of "--type"
                 """,
         metavar="CODE",
-        type=edge.LocationCode,
+        type=_location_code,
     )
     input_group.add_argument(
         "--observatory",
@@ -660,6 +1260,16 @@ def parse_args(args):
         help="When specifying multiple observatories, process"
         " each observatory separately",
     )
+    input_group.add_argument(
+        "--jobs",
+        default=1,
+        help="""
+                Number of observatories to process in parallel
+                when using --observatory-foreach (Default 1)
+                """,
+        metavar="N",
+        type=int,
+    )
     input_group.add_argument(
         "--rename-input-channel",
         action="append",
@@ -739,17 +1349,7 @@ def parse_args(args):
     # output arguments
     output_type_group.add_argument(
         "--output",
-        choices=(
-            "binlog",
-            "edge",
-            "iaga2002",
-            "imfjson",
-            "miniseed",
-            "pcdcp",
-            "plot",
-            "temperature",
-            "vbf",
-        ),
+        choices=[k for k in output_factories],
         # TODO: set default to 'iaga2002'
         help="Output format",
     )
@@ -761,6 +1361,16 @@ def parse_args(args):
         help="Defaults to --inchannels",
         metavar="CHANNEL",
     )
+    output_group.add_argument(
+        "--output-concurrency",
+        default=1,
+        help="""
+                Number of channels to write at the same time,
+                when using edge or miniseed output (Default 1)
+                """,
+        metavar="N",
+        type=int,
+    )
     output_group.add_argument(
         "--output-file", help="Write to specified file", metavar="FILE"
     )
@@ -799,6 +1409,21 @@ def parse_args(args):
         metavar="PORT",
         type=int,
     )
+    output_group.add_argument(
+        "--output-spool",
+        help="""
+                Write to a spool in DIRECTORY first, when using edge or
+                miniseed output.  Data that cannot be written stays in
+                the spool, and is written before later data.
+                """,
+        metavar="DIRECTORY",
+    )
+    output_group.add_argument(
+        "--output-spool-interval",
+        help="Seconds between background attempts to write --output-spool",
+        metavar="SECONDS",
+        type=float,
+    )
     output_group.add_argument(
         "--output-stdout",
         action="store_true",
@@ -826,7 +1451,7 @@ def parse_args(args):
         "--outlocationcode",
         help="Defaults to --locationcode",
         metavar="CODE",
-        type=edge.LocationCode,
+        type=_location_code,
     )
     output_group.add_argument(
         "--output-edge-forceout",
@@ -847,9 +1472,15 @@ def parse_args(args):
         "--algorithm",
         choices=[k for k in algorithms],
         default="identity",
-        help='Default is "identity", which skips processing',
+        help="""
+                Default is "identity", which skips processing.
+                When more than one algorithm is specified, each algorithm
+                processes the output of the previous algorithm,
+                and only the last algorithm uses --outchannels.
+                """,
+        nargs="+",
     )
-    for k in algorithms:
+    for k in algorithm_names:
         algorithms[k].add_arguments(processing_group)
     processing_group.add_argument(
         "--update",
@@ -868,6 +1499,37 @@ def parse_args(args):
                 Update mode checks for gaps and will step backwards
                 to gap fill, if the start of the current interval is a gap,
                 when limit is set to more than 0.
+                When 0, at most 1000 intervals are checked.
+                """,
+        metavar="N",
+    )
+    processing_group.add_argument(
+        "--daemon",
+        action="store_true",
+        default=False,
+        help="""
+                Keep running, and process the --realtime interval
+                every --daemon-interval seconds.
+                Factories and algorithm state are kept in memory
+                between runs.
+                """,
+    )
+    processing_group.add_argument(
+        "--daemon-interval",
+        type=int,
+        default=60,
+        help="Seconds between runs when using --daemon (Default 60)",
+        metavar="N",
+    )
+    processing_group.add_argument(
+        "--chunk-size",
+        type=int,
+        default=0,
+        help="""
+                Read, process, and write data in chunks of N seconds,
+                when set to more than 0.
+                Limits memory use when processing long intervals.
+                Not used with --update.
                 """,
         metavar="N",
     )
@@ -877,6 +1539,27 @@ def parse_args(args):
         default=False,
         help="Ensures output data will not be trimmed down",
     )
+    processing_group.add_argument(
+        "--metrics-file",
+        default=None,
+        help="""
+                Write time spent and samples handled by each stage,
+                and requests and bytes for each factory, after each run.
+                "{obs}" is replaced with the observatory code,
+                for use with --observatory-foreach.
+                """,
+        metavar="FILE",
+    )
+    processing_group.add_argument(
+        "--metrics-format",
+        choices=["json", "prometheus"],
+        default="json",
+        help="""
+                Format for --metrics-file (Default json).
+                json appends one line per run,
+                prometheus replaces a node exporter textfile.
+                """,
+    )
 
     # GOES parameters
     goes_group = parser.add_argument_group(
@@ -906,6 +1589,13 @@ def parse_args(args):
         help="The server name(s) to retrieve the GOES data from",
         metavar="HOST",
     )
+    goes_group.add_argument(
+        "--input-goes-server-concurrency",
+        default=1,
+        help="Maximum number of requests to each GOES server at the same time",
+        metavar="N",
+        type=int,
+    )
     goes_group.add_argument(
         "--input-goes-user",
         default="GEOMAG",
@@ -938,7 +1628,35 @@ def parse_args(args):
         help="(Deprecated, Unused) Conversion factor (nT/bin) for bins",
     )
 
-    return parser.parse_args(args)
+    parsed, unknown = parser.parse_known_args(args)
+    if unknown:
+        # arguments for other algorithms are allowed, but not used
+        for k in algorithms:
+            if k not in algorithm_names:
+                algorithms[k].add_arguments(processing_group)
+        parsed = parser.parse_args(args)
+    return parsed
+
+
+def get_algorithm_names(args):
+    """Get names of algorithms selected by --algorithm.
+
+    Parameters
+    ----------
+    args : list of strings
+
+    Returns
+    -------
+    list<str>
+        selected algorithm names,
+        or all algorithm names when showing usage.
+    """
+    if "-h" in args or "--help" in args:
+        return [k for k in algorithms]
+    parser = argparse.ArgumentParser(add_help=False, fromfile_prefix_chars="@")
+    parser.add_argument("--algorithm", default=["identity"], nargs="+")
+    names = parser.parse_known_args(args)[0].algorithm
+    return [k for k in algorithms if k in names]
 
 
 def add_deprecated_args(parser, input_group, output_group):
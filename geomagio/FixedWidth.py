@@ -0,0 +1,296 @@
+"""Fixed width text utilities.
+
+Text is handled as 2d arrays of ascii bytes, with one row per line,
+so whole columns are parsed or formatted at once.
+"""
+import numpy
+
+
+def format_decimals(values, width, decimals):
+    """Format values like ``"%{width}.{decimals}f"``.
+
+    Parameters
+    ----------
+    values : array_like
+        values to format.
+    width : int
+        number of characters per value.
+    decimals : int
+        number of digits after the decimal point.
+
+    Returns
+    -------
+    numpy.array
+        2d array of ascii bytes, one row per value,
+        or None if any value is not finite or does not fit in width.
+
+    Notes
+    -----
+    Values are scaled and rounded to integers, then formatted as digits.
+    Values that are close to halfway between two outputs are formatted
+    using python, which rounds the exact binary value.
+    """
+    values = numpy.asarray(values, dtype=numpy.float64)
+    # characters available for sign and whole digits
+    available = width - decimals - 1 if decimals > 0 else width
+    if not numpy.isfinite(values).all():
+        return None
+    scaled = numpy.abs(values) * 10.0 ** decimals
+    if len(values) == 0 or scaled.max() >= 10.0 ** (available + decimals):
+        return None
+    integers = numpy.round(scaled).astype(numpy.int64)
+    ambiguous = numpy.abs(scaled - numpy.floor(scaled) - 0.5) < 1e-6
+    negative = numpy.signbit(values)
+    whole, fraction = numpy.divmod(integers, 10 ** decimals)
+    digits = numpy.ones(len(values), dtype=numpy.int64)
+    for power in range(1, available):
+        digits += whole >= 10 ** power
+    if (digits + negative > available).any():
+        return None
+    chars = numpy.empty((len(values), width), dtype=numpy.uint8)
+    for power in range(decimals):
+        chars[:, width - 1 - power] = fraction // 10 ** power % 10 + ord("0")
+    if decimals > 0:
+        chars[:, available] = ord(".")
+    for power in range(available):
+        chars[:, available - 1 - power] = numpy.where(
+            power < digits,
+            whole // 10 ** power % 10 + ord("0"),
+            numpy.where(negative & (power == digits), ord("-"), ord(" ")),
+        )
+    if ambiguous.any():
+        formatted = "".join(
+            "%*.*f" % (width, decimals, value) for value in values[ambiguous]
+        )
+        if len(formatted) != width * ambiguous.sum():
+            return None
+        chars[ambiguous] = numpy.frombuffer(
+            formatted.encode("ascii"), dtype=numpy.uint8
+        ).reshape(-1, width)
+    return chars
+
+
+def format_digits(values, width):
+    """Format non-negative integers like ``"%0{width}d"``.
+
+    Parameters
+    ----------
+    values : array_like
+        integers to format, that fit in width.
+    width : int
+        number of characters per value.
+
+    Returns
+    -------
+    numpy.array
+        2d array of ascii bytes, one row per value.
+    """
+    values = numpy.asarray(values, dtype=numpy.int64)
+    chars = numpy.empty((len(values), width), dtype=numpy.uint8)
+    for power in range(width):
+        chars[:, width - 1 - power] = values // 10 ** power % 10 + ord("0")
+    return chars
+
+
+def get_lines(data, min_width=0):
+    """Get lines of text as a 2d array.
+
+    Parameters
+    ----------
+    data : str
+        lines of text.
+    min_width : int
+        lines are padded with spaces to at least this width.
+
+    Returns
+    -------
+    numpy.array
+        2d array of ascii bytes, one row per line without line ending,
+        with shorter lines padded with spaces.
+        or None if data is empty or not ascii.
+    """
+    try:
+        buf = data.encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    lines = _get_uniform_lines(buf, min_width)
+    if lines is None:
+        lines = data.splitlines()
+        if len(lines) == 0:
+            return None
+        width = max(max(map(len, lines)), min_width)
+        buf = "".join(line.ljust(width) for line in lines).encode("ascii")
+        lines = numpy.frombuffer(buf, dtype=numpy.uint8).reshape(-1, width)
+    return lines
+
+
+def get_sample_times(starttime, delta, start, end):
+    """Get sample times.
+
+    Parameters
+    ----------
+    starttime : float
+        epoch time of first sample.
+    delta : float
+        seconds between samples.
+    start : int
+        index of first sample.
+    end : int
+        index after last sample.
+
+    Returns
+    -------
+    numpy.array
+        ``numpy.datetime64`` times in microseconds, the same as
+        ``datetime.utcfromtimestamp(starttime + i * delta)``.
+    """
+    times = starttime + numpy.arange(start, end) * delta
+    seconds = numpy.floor(times)
+    # utcfromtimestamp rounds half to even, like numpy.round
+    microseconds = numpy.round((times - seconds) * 1e6)
+    return (seconds * 1e6 + microseconds).astype(numpy.int64).astype("datetime64[us]")
+
+
+def get_time_fields(times):
+    """Get calendar fields of times.
+
+    Parameters
+    ----------
+    times : numpy.array
+        ``numpy.datetime64`` times.
+
+    Returns
+    -------
+    dict
+        integer arrays with keys "year", "month", "day", "day_of_year",
+        "hour", "minute", "second", and "microsecond".
+    """
+    times = times.astype("datetime64[us]")
+    days = times.astype("datetime64[D]")
+    months = times.astype("datetime64[M]")
+    years = times.astype("datetime64[Y]")
+    microseconds = (times - days).astype(numpy.int64)
+    return {
+        "year": years.astype(numpy.int64) + 1970,
+        "month": months.astype(numpy.int64) % 12 + 1,
+        "day": (days - months).astype(numpy.int64) + 1,
+        "day_of_year": (days - years).astype(numpy.int64) + 1,
+        "hour": microseconds // 3600000000,
+        "minute": microseconds // 60000000 % 60,
+        "second": microseconds // 1000000 % 60,
+        "microsecond": microseconds % 1000000,
+    }
+
+
+def join_columns(rows, columns):
+    """Join columns into lines of text.
+
+    Parameters
+    ----------
+    rows : int
+        number of lines.
+    columns : array_like
+        each column is either a 2d array of ascii bytes with one row per
+        line, or a str that is repeated on every line.
+
+    Returns
+    -------
+    bytes
+        joined lines.
+    """
+    parts = []
+    for column in columns:
+        if isinstance(column, str):
+            column = numpy.frombuffer(column.encode("ascii"), dtype=numpy.uint8)
+            column = numpy.broadcast_to(column, (rows, len(column)))
+        parts.append(column)
+    return numpy.concatenate(parts, axis=1).tobytes()
+
+
+def parse_decimals(chars):
+    """Parse fixed width columns of right aligned decimal numbers.
+
+    Parameters
+    ----------
+    chars : numpy.array
+        2d array of ascii bytes, one row per value.
+        the decimal point, if any, must be in the same column for all rows.
+
+    Returns
+    -------
+    numpy.array
+        float64 values, or None if any value is not a decimal
+        with the same number of digits after the decimal point.
+
+    Notes
+    -----
+    Values are parsed as integers, then divided by a power of ten, which
+    matches ``float()`` because both are correctly rounded.
+    """
+    rows, width = chars.shape
+    if rows == 0:
+        return None
+    dot = bytes(chars[0]).find(b".")
+    if dot == -1:
+        dot = width
+    # one contiguous array per character position
+    positions = numpy.ascontiguousarray(chars.T)
+    invalid = numpy.zeros(rows, dtype=bool)
+    negative = numpy.zeros(rows, dtype=bool)
+    started = numpy.zeros(rows, dtype=bool)
+    mantissa = numpy.zeros(rows, dtype=numpy.int64)
+    # leading spaces, optional minus, then at least one digit
+    is_digit = started
+    for position in positions[:dot]:
+        digit = position - ord("0")
+        is_digit = digit < 10
+        is_space = position == ord(" ")
+        is_minus = position == ord("-")
+        invalid |= (started & ~is_digit) | ~(is_digit | is_space | is_minus)
+        negative |= is_minus
+        started |= ~is_space
+        mantissa = mantissa * 10 + numpy.where(is_digit, digit, 0)
+    invalid |= ~is_digit
+    # then decimal point and only digits
+    if dot < width:
+        invalid |= positions[dot] != ord(".")
+    for position in positions[dot + 1 :]:
+        digit = position - ord("0")
+        invalid |= digit >= 10
+        mantissa = mantissa * 10 + digit
+    if invalid.any():
+        return None
+    values = mantissa / 10.0 ** max(width - dot - 1, 0)
+    values[negative] *= -1
+    return values
+
+
+def _get_uniform_lines(buf, min_width):
+    """Get lines as a 2d array, when all lines have the same length.
+
+    Parameters
+    ----------
+    buf : bytes
+        lines ending with a newline or carriage return and newline,
+        the last line ending is optional.
+    min_width : int
+        minimum line length, excluding line ending.
+
+    Returns
+    -------
+    numpy.array
+        2d array of bytes, one row per line without line ending,
+        or None if lines are not all the same length.
+    """
+    first = buf.find(b"\n")
+    ending = b"\r\n" if first > 0 and buf[first - 1] == ord("\r") else b"\n"
+    if not buf.endswith(ending):
+        buf += ending
+    stride = buf.find(ending) + len(ending)
+    width = stride - len(ending)
+    if width == 0 or width < min_width or len(buf) % stride != 0:
+        return None
+    lines = numpy.frombuffer(buf, dtype=numpy.uint8).reshape(-1, stride)
+    if (lines[:, width:] != numpy.frombuffer(ending, dtype=numpy.uint8)).any():
+        return None
+    return lines[:, :width]
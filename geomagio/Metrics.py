@@ -0,0 +1,152 @@
+"""Timing and counter metrics."""
+from __future__ import absolute_import
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import os
+import time
+
+
+class Metrics(object):
+    """Collect named values, with optional labels.
+
+    Values with the same name and labels are added together.
+
+    Parameters
+    ----------
+    prefix : str
+        prefix added to metric names when writing prometheus format.
+    labels : dict
+        labels added to all metrics when written.
+    """
+
+    def __init__(self, prefix="geomag", labels=None):
+        self.prefix = prefix
+        self.labels = labels or {}
+        self.values = OrderedDict()
+
+    def get(self, name, **labels):
+        """Get the current value of a metric.
+
+        Parameters
+        ----------
+        name : str
+            metric name.
+        **labels
+            metric labels.
+
+        Returns
+        -------
+        float
+            metric value, or 0 if not recorded.
+        """
+        return self.values.get(self._get_key(name, labels), 0)
+
+    def increment(self, name, value=1, **labels):
+        """Add to a metric.
+
+        Parameters
+        ----------
+        name : str
+            metric name.
+        value : float
+            amount to add, default 1.
+        **labels
+            metric labels.
+        """
+        key = self._get_key(name, labels)
+        self.values[key] = self.values.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block of code.
+
+        Adds elapsed seconds to "<name>_seconds",
+        and increments "<name>_count".
+
+        Parameters
+        ----------
+        name : str
+            metric name.
+        **labels
+            metric labels.
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.increment(name + "_seconds", time.time() - start, **labels)
+            self.increment(name + "_count", 1, **labels)
+
+    def to_list(self):
+        """Get metrics as a list.
+
+        Returns
+        -------
+        list<dict>
+            each dictionary has the keys "name", "labels", and "value".
+        """
+        metrics = []
+        for (name, labels), value in self.values.items():
+            metric_labels = dict(self.labels)
+            metric_labels.update(labels)
+            metrics.append({"name": name, "labels": metric_labels, "value": value})
+        return metrics
+
+    def write_json(self, fh):
+        """Write metrics as one line of JSON.
+
+        Parameters
+        ----------
+        fh : writable
+            text file handle, usually opened for append.
+        """
+        fh.write(json.dumps({"time": time.time(), "metrics": self.to_list()}))
+        fh.write("\n")
+
+    def write_prometheus(self, fh):
+        """Write metrics using the prometheus text exposition format.
+
+        Parameters
+        ----------
+        fh : writable
+            text file handle.
+        """
+        # all samples of a metric must follow its TYPE line
+        families = OrderedDict()
+        for metric in self.to_list():
+            name = "{}_{}".format(self.prefix, metric["name"])
+            families.setdefault(name, []).append(metric)
+        for name, metrics in families.items():
+            fh.write("# TYPE {} gauge\n".format(name))
+            for metric in metrics:
+                labels = ",".join(
+                    '{}="{}"'.format(key, str(value).replace('"', '\\"'))
+                    for key, value in sorted(metric["labels"].items())
+                )
+                fh.write("{}{{{}}} {}\n".format(name, labels, metric["value"]))
+
+    def write_file(self, filename, format="json"):
+        """Write metrics to a file.
+
+        Parameters
+        ----------
+        filename : str
+            path to file.
+        format : {'json', 'prometheus'}
+            json lines are appended to the file.
+            prometheus files are replaced, so collectors never read a
+            partially written file.
+        """
+        if format == "prometheus":
+            tmp_filename = filename + ".tmp"
+            with open(tmp_filename, "w") as fh:
+                self.write_prometheus(fh)
+            os.replace(tmp_filename, filename)
+        else:
+            with open(filename, "a") as fh:
+                self.write_json(fh)
+
+    def _get_key(self, name, labels):
+        return (name, tuple(sorted(labels.items())))
@@ -0,0 +1,55 @@
+"""Mapping of names to classes that are imported when first used."""
+from __future__ import absolute_import
+
+from collections.abc import Mapping
+import importlib
+
+
+class Registry(Mapping):
+    """Map names to classes, without importing modules until a class is used.
+
+    Some modules are slow to import, usually because of their dependencies,
+    so only import the ones that are used.
+
+    Parameters
+    ----------
+    paths : dict
+        keys are names,
+        values are paths like "geomagio.edge:EdgeFactory",
+        a module name and attribute name separated by a colon.
+    """
+
+    def __init__(self, paths):
+        self._paths = dict(paths)
+        self._values = {}
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            module_name, attribute = self._paths[name].split(":")
+            module = importlib.import_module(module_name)
+            self._values[name] = getattr(module, attribute)
+        return self._values[name]
+
+    def __contains__(self, name):
+        return name in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def get_path(self, name):
+        """Get the path for a name, without importing it.
+
+        Parameters
+        ----------
+        name : str
+            registered name.
+
+        Returns
+        -------
+        str
+            path, in the format "module:attribute".
+        """
+        return self._paths[name]
@@ -59,6 +59,14 @@ class TimeseriesFactory(object):
         self.urlTemplate = urlTemplate
         self.urlInterval = urlInterval
 
+    def close(self):
+        """Finish writing, and release resources such as connections.
+
+        Called after the last put_timeseries.
+        The default implementation does nothing.
+        """
+        pass
+
     def get_timeseries(
         self,
         starttime,
@@ -154,6 +162,45 @@ class TimeseriesFactory(object):
         )
         return timeseries
 
+    def get_timeseries_observatories(
+        self,
+        starttime,
+        endtime,
+        observatories,
+        channels=None,
+        type=None,
+        interval=None,
+    ):
+        """Get timeseries data for several observatories.
+
+        The default implementation calls get_timeseries for each observatory,
+        in order.  Factories that can request several observatories at the
+        same time override this method.
+
+        Parameters
+        ----------
+        observatories : array_like
+            observatory codes.
+
+        See get_timeseries for other parameters.
+
+        Returns
+        -------
+        obspy.core.Stream
+            stream containing traces for requested timeseries.
+        """
+        timeseries = obspy.core.Stream()
+        for observatory in observatories:
+            timeseries += self.get_timeseries(
+                starttime=starttime,
+                endtime=endtime,
+                observatory=observatory,
+                channels=channels,
+                type=type,
+                interval=interval,
+            )
+        return timeseries
+
     def parse_string(self, data, **kwargs):
         """Creates error message that this functions is not implemented by
         TimeseriesFactory.
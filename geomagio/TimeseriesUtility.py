@@ -265,6 +265,34 @@ def get_merged_gaps(gaps):
     return merged_gaps
 
 
+def fill_outside_gaps(timeseries, gaps, fill_value=numpy.nan):
+    """Replace values that are not within gaps.
+
+    Parameters
+    ----------
+    timeseries: obspy.core.Stream
+        stream to update.
+    gaps: array_like
+        array of gaps, as returned by get_merged_gaps.
+        each gap is an array [start of gap, end of gap, next sample]
+    fill_value: float
+        value used outside gaps, default numpy.nan.
+
+    Notes: the original timeseries object is changed.
+    """
+    for trace in timeseries:
+        stats = trace.stats
+        times = stats.starttime.timestamp + numpy.arange(stats.npts) * stats.delta
+        # allow for rounding when comparing times
+        tolerance = stats.delta / 2
+        in_gaps = numpy.full(stats.npts, False)
+        for gap in gaps:
+            in_gaps |= (times >= gap[0].timestamp - tolerance) & (
+                times <= gap[1].timestamp + tolerance
+            )
+        trace.data = numpy.where(in_gaps, trace.data, fill_value)
+
+
 def get_channels(stream):
     """Get a list of channels in a stream.
 
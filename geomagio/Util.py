@@ -1,5 +1,6 @@
 import numpy
 import os
+from concurrent.futures import ThreadPoolExecutor
 from obspy.core import Stats, Trace
 from io import BytesIO
 
@@ -104,6 +105,39 @@ def get_intervals(starttime, endtime, size=86400, align=True, trim=False):
     return intervals
 
 
+def map_concurrent(function, items, concurrency=1):
+    """Call a function for each item, using a pool of threads.
+
+    Useful when each call spends most of its time waiting for I/O,
+    such as a request to a server.
+
+    Parameters
+    ----------
+    function : callable
+        function to call with each item.
+    items : array_like
+        items to process.
+    concurrency : int
+        maximum number of calls at the same time.
+        when 1 or less, items are processed in order without threads.
+
+    Returns
+    -------
+    list
+        return values, in the same order as items.
+
+    Raises
+    ------
+    Exception
+        the first exception raised by a call, in item order.
+    """
+    items = list(items)
+    if concurrency <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as executor:
+        return list(executor.map(function, items))
+
+
 def read_file(filepath):
     """Open and read file contents.
 
@@ -10,7 +10,6 @@ from datetime import datetime
 from json import dumps
 import sys
 
-from geomagio.edge import EdgeFactory
 from geomagio.iaga2002 import IAGA2002Writer
 from geomagio.imfjson import IMFJSONWriter
 from geomagio.ObservatoryMetadata import ObservatoryMetadata
@@ -80,7 +79,12 @@ class WebService(object):
         error_stream=sys.stderr,
     ):
         self.error_stream = error_stream
-        self.factory = factory or EdgeFactory()
+        if factory is None:
+            # imported when used, so importing geomagio does not load edge
+            from geomagio.edge import EdgeFactory
+
+            factory = EdgeFactory()
+        self.factory = factory
         self.metadata = metadata or ObservatoryMetadata().metadata
         self.version = version
         self.usage_documentation = usage_documentation or WebServiceUsage()
@@ -4,6 +4,7 @@ Geomag Algorithm Module
 from __future__ import absolute_import
 
 from . import ChannelConverter
+from . import FixedWidth
 from . import StreamConverter
 from . import TimeseriesUtility
 from . import Util
@@ -19,6 +20,7 @@ __all__ = [
     "ChannelConverter",
     "Controller",
     "DeltaFAlgorithm",
+    "FixedWidth",
     "ObservatoryMetadata",
     "PlotTimeseriesFactory",
     "StreamConverter",
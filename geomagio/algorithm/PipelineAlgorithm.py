@@ -0,0 +1,131 @@
+"""Algorithm that runs a sequence of algorithms."""
+from __future__ import absolute_import
+
+import copy
+
+from .Algorithm import Algorithm
+
+
+class PipelineAlgorithm(Algorithm):
+    """Run algorithms in order, each processing the output of the previous.
+
+    Intermediate results are passed in memory instead of being written to,
+    and read back from, a factory.
+
+    Parameters
+    ----------
+    algorithms: list<Algorithm>
+        algorithms to run, in order.
+    """
+
+    def __init__(self, algorithms=None):
+        self.algorithms = algorithms or []
+        Algorithm.__init__(self)
+
+    def process(self, stream):
+        """Run each algorithm using output from the previous algorithm.
+
+        Parameters
+        ----------
+        stream : obspy.core.Stream
+            input data
+
+        Returns
+        -------
+        obspy.core.Stream
+            output of the last algorithm
+        """
+        for algorithm in self.algorithms:
+            stream = algorithm.process(stream)
+        return stream
+
+    def get_input_channels(self):
+        """Get input channels of the first algorithm."""
+        return self.algorithms[0].get_input_channels()
+
+    def get_required_channels(self):
+        """Get required channels of the first algorithm."""
+        return self.algorithms[0].get_required_channels()
+
+    def get_output_channels(self):
+        """Get output channels of the last algorithm."""
+        return self.algorithms[-1].get_output_channels()
+
+    def get_input_interval(self, start, end, observatory=None, channels=None):
+        """Get Input Interval
+
+        Chains get_input_interval, from the last algorithm to the first,
+        so each algorithm receives the input it needs to produce the input
+        requested by the next algorithm.
+
+        start : UTCDateTime
+            start time of requested output.
+        end : UTCDateTime
+            end time of requested output.
+        observatory : string
+            observatory code.
+        channels : string
+            input channels.
+
+        Returns
+        -------
+        input_start : UTCDateTime
+            start of input required to generate requested output
+        input_end : UTCDateTime
+            end of input required to generate requested output.
+        """
+        for i in reversed(range(len(self.algorithms))):
+            algorithm = self.algorithms[i]
+            start, end = algorithm.get_input_interval(
+                start=start,
+                end=end,
+                observatory=observatory,
+                channels=channels if i == 0 else algorithm.get_input_channels(),
+            )
+            if start is None or end is None:
+                return (None, None)
+        return (start, end)
+
+    def can_produce_data(self, starttime, endtime, stream):
+        """Check whether the first algorithm can process the input stream."""
+        return self.algorithms[0].can_produce_data(starttime, endtime, stream)
+
+    def get_next_starttime(self):
+        """Get the latest next_starttime of any stateful algorithm.
+
+        Returns
+        -------
+        UTCDateTime:
+            Time at which Controller should start processing,
+            or None if all algorithms are stateless.
+        """
+        next_starttime = None
+        for algorithm in self.algorithms:
+            algorithm_starttime = algorithm.get_next_starttime()
+            if algorithm_starttime is None:
+                continue
+            if next_starttime is None or algorithm_starttime > next_starttime:
+                next_starttime = algorithm_starttime
+        return next_starttime
+
+    def configure(self, arguments):
+        """Configure each algorithm using comand line arguments.
+
+        The first algorithm uses --inchannels, and later algorithms use
+        the output channels of the previous algorithm.
+        Only the last algorithm uses --outchannels.
+
+        Parameters
+        ----------
+        arguments: Namespace
+            parsed command line arguments
+        """
+        last = len(self.algorithms) - 1
+        inchannels = arguments.inchannels
+        for i, algorithm in enumerate(self.algorithms):
+            algorithm_arguments = copy.copy(arguments)
+            algorithm_arguments.inchannels = inchannels
+            if i != last:
+                algorithm_arguments.outchannels = None
+            algorithm.configure(algorithm_arguments)
+            inchannels = algorithm.get_output_channels() or inchannels
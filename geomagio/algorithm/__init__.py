@@ -6,6 +6,7 @@ from __future__ import absolute_import
 # base classes
 from .Algorithm import Algorithm
 from .AlgorithmException import AlgorithmException
+from .PipelineAlgorithm import PipelineAlgorithm
 
 # algorithms
 from .AdjustedAlgorithm import AdjustedAlgorithm
@@ -40,6 +41,7 @@ __all__ = [
     "DbDtAlgorithm",
     "DeltaFAlgorithm",
     "FilterAlgorithm",
+    "PipelineAlgorithm",
     "SqDistAlgorithm",
     "XYZAlgorithm",
 ]
@@ -3,7 +3,7 @@ from typing import Any, Dict, List, Union
 
 from fastapi import APIRouter, Depends, Query
 from obspy import UTCDateTime, Stream
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 
 from ... import TimeseriesFactory, TimeseriesUtility
 from ...edge import EdgeFactory
@@ -116,12 +116,13 @@ def format_timeseries(
         timeseries object with requested data
     """
     if format == OutputFormat.JSON:
-        data = IMFJSONWriter.format(timeseries, elements)
-        media_type = "application/json"
-    else:
-        data = IAGA2002Writer.format(timeseries, elements)
-        media_type = "text/plain"
-    return Response(data, media_type=media_type)
+        # stream json, instead of building the document in memory
+        return StreamingResponse(
+            IMFJSONWriter().iter_chunks(timeseries, elements),
+            media_type="application/json",
+        )
+    data = IAGA2002Writer.format(timeseries, elements)
+    return Response(data, media_type="text/plain")
 
 
 def get_timeseries(data_factory: TimeseriesFactory, query: DataApiQuery) -> Stream:
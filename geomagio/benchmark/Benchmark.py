@@ -0,0 +1,300 @@
+"""Time algorithms, parsers and writers using synthetic data."""
+from __future__ import absolute_import, print_function
+
+import argparse
+from collections import OrderedDict
+from datetime import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy
+import obspy
+from obspy.core import UTCDateTime
+
+from ..algorithm.FilterAlgorithm import FilterAlgorithm, STEPS
+from ..algorithm.SqDistAlgorithm import SqDistAlgorithm
+from ..iaga2002 import IAGA2002Parser, IAGA2002Writer
+from .. import TimeseriesUtility
+from .Synthetic import get_synthetic_stream
+
+
+STARTTIME = UTCDateTime("2020-01-01T00:00:00Z")
+DAY = 86400
+MONTH = 30 * DAY
+
+# what bin/geomag.py does before reading data
+STARTUP_SCRIPT = """
+from geomagio.Controller import parse_args
+parse_args([
+    "--input", "miniseed",
+    "--output", "iaga2002",
+    "--observatory", "BOU",
+    "--algorithm", "xyz",
+])
+"""
+
+
+def _get_stream(interval, duration, scale, **kwargs):
+    """Get synthetic stream starting at STARTTIME.
+
+    Parameters
+    ----------
+    interval : str
+        interval length {minute, second, tenhertz}
+    duration : int
+        seconds of data, before scaling.
+    scale : float
+        multiplier for duration.
+    **kwargs
+        passed to get_synthetic_stream.
+    """
+    delta = TimeseriesUtility.get_delta_from_interval(interval)
+    duration = max(delta, round(duration * scale / delta) * delta)
+    # end half a sample early, so rounding cannot drop the last sample
+    return get_synthetic_stream(
+        starttime=STARTTIME,
+        endtime=STARTTIME + duration - delta / 2,
+        interval=interval,
+        **kwargs
+    )
+
+
+def _count_samples(stream):
+    return sum(len(trace.data) for trace in stream)
+
+
+def benchmark_get_trace_gaps(scale):
+    """One month of second data, with 1% gaps."""
+    stream = _get_stream("second", MONTH, scale, channels=["H"], gap_density=0.01)
+    trace = stream[0]
+    return _count_samples(stream), lambda: TimeseriesUtility.get_trace_gaps(trace)
+
+
+def benchmark_firfilter(scale):
+    """One day of 10Hz data, filtered to one second."""
+    stream = _get_stream("tenhertz", DAY, scale, channels=["H"])
+    window = numpy.array(STEPS[0]["window"])
+    window = window / sum(window)
+    data = stream[0].data
+    return (
+        _count_samples(stream),
+        lambda: FilterAlgorithm.firfilter(data, window, 10),
+    )
+
+
+def benchmark_sqdist_additive(scale):
+    """One month of minute data, with daily seasons."""
+    stream = _get_stream("minute", MONTH, scale, channels=["H"])
+    data = stream[0].data
+    return (
+        _count_samples(stream),
+        lambda: SqDistAlgorithm.additive(
+            yobs=data, m=1440, alpha=1.0 / 1440.0 / 30, beta=0, gamma=1.0 / 30
+        ),
+    )
+
+
+def benchmark_iaga2002_parse(scale):
+    """One day of second data, four channels."""
+    stream = _get_stream("second", DAY, scale)
+    data = IAGA2002Writer.format(stream, ["H", "E", "Z", "F"]).decode("utf8")
+    return _count_samples(stream), lambda: IAGA2002Parser().parse(data)
+
+
+def benchmark_iaga2002_format_data(scale):
+    """One day of second data, four channels."""
+    stream = _get_stream("second", DAY, scale)
+    return (
+        _count_samples(stream),
+        lambda: IAGA2002Writer()._format_data(stream, ["H", "E", "Z", "F"]),
+    )
+
+
+def benchmark_startup(scale):
+    """Import Controller and parse arguments in a new process.
+
+    Data is not used, so scale is ignored.
+    """
+    env = dict(os.environ)
+    # find geomagio in a new process, even when not installed
+    package_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(
+        [package_dir] + [p for p in [env.get("PYTHONPATH")] if p]
+    )
+    command = [sys.executable, "-c", STARTUP_SCRIPT]
+    return 1, lambda: subprocess.run(command, check=True, env=env)
+
+
+# benchmark setup functions, by name.
+# each function accepts a scale, and returns a tuple of
+# (number of input samples, function to time).
+BENCHMARKS = OrderedDict(
+    [
+        ("TimeseriesUtility.get_trace_gaps", benchmark_get_trace_gaps),
+        ("FilterAlgorithm.firfilter", benchmark_firfilter),
+        ("SqDistAlgorithm.additive", benchmark_sqdist_additive),
+        ("IAGA2002Parser.parse", benchmark_iaga2002_parse),
+        ("IAGA2002Writer._format_data", benchmark_iaga2002_format_data),
+        ("Controller.startup", benchmark_startup),
+    ]
+)
+
+
+def run_benchmark(name, scale=1.0, repeat=3):
+    """Time one benchmark.
+
+    Setup is repeated before each run, and is not timed.
+
+    Parameters
+    ----------
+    name : str
+        key in BENCHMARKS.
+    scale : float
+        multiplier for the amount of data.
+    repeat : int
+        number of times to run.
+
+    Returns
+    -------
+    dict
+        "samples" processed, number of times "repeat"ed, the fastest run
+        in "seconds", and "samples_per_second".
+    """
+    setup = BENCHMARKS[name]
+    times = []
+    for _ in range(repeat):
+        samples, run = setup(scale)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    seconds = min(times)
+    return {
+        "samples": samples,
+        "repeat": repeat,
+        "seconds": seconds,
+        "samples_per_second": seconds and samples / seconds or None,
+    }
+
+
+def run_benchmarks(names=None, scale=1.0, repeat=3):
+    """Time benchmarks.
+
+    Parameters
+    ----------
+    names : array_like
+        keys in BENCHMARKS, default all.
+    scale : float
+        multiplier for the amount of data.
+    repeat : int
+        number of times to run each benchmark.
+
+    Returns
+    -------
+    dict
+        "environment" used to run benchmarks,
+        and "results" with one entry per benchmark name.
+    """
+    results = OrderedDict()
+    for name in names or BENCHMARKS:
+        results[name] = run_benchmark(name, scale=scale, repeat=repeat)
+    return {
+        "environment": {
+            "time": datetime.utcnow().isoformat() + "Z",
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "obspy": obspy.__version__,
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline, current):
+    """Compare benchmark results.
+
+    Parameters
+    ----------
+    baseline : dict
+        results from run_benchmarks.
+    current : dict
+        results from run_benchmarks.
+
+    Returns
+    -------
+    OrderedDict
+        ratio of current seconds to baseline seconds, for each benchmark
+        in both results.  Ratios greater than 1 are slower.
+    """
+    ratios = OrderedDict()
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        baseline_seconds = baseline["results"][name]["seconds"]
+        if baseline_seconds:
+            ratios[name] = result["seconds"] / baseline_seconds
+    return ratios
+
+
+def main(args=None):
+    """Command line entrypoint.
+
+    Parameters
+    ----------
+    args : array_like
+        command line arguments, default sys.argv.
+    """
+    parser = argparse.ArgumentParser(
+        description="Time algorithms, parsers and writers using synthetic data."
+    )
+    parser.add_argument(
+        "--benchmark",
+        choices=list(BENCHMARKS),
+        help="Benchmarks to run, default all",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--compare",
+        help="Compare to results in FILE, exit with status 1 when slower",
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--output", help="Write results to FILE, default stdout", metavar="FILE"
+    )
+    parser.add_argument(
+        "--repeat", default=3, help="Runs per benchmark (Default 3)", type=int
+    )
+    parser.add_argument(
+        "--scale",
+        default=1.0,
+        help="Multiplier for the amount of data (Default 1.0)",
+        type=float,
+    )
+    parser.add_argument(
+        "--threshold",
+        default=1.25,
+        help="Slowest allowed ratio when using --compare (Default 1.25)",
+        type=float,
+    )
+    args = parser.parse_args(args)
+    results = run_benchmarks(names=args.benchmark, scale=args.scale, repeat=args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = False
+        for name, ratio in compare_results(baseline, results).items():
+            print("{}: {:.2f}x".format(name, ratio), file=sys.stderr)
+            if ratio > args.threshold:
+                slower = True
+        if slower:
+            sys.exit(1)
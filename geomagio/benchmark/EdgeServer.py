@@ -0,0 +1,522 @@
+"""Local stand-in for an Edge/CWB server."""
+from __future__ import absolute_import
+
+import io
+import random
+import re
+import shlex
+import socketserver
+import struct
+import threading
+import time
+
+import numpy
+import obspy.core
+import obspy.io.mseed.util
+from obspy.core import Stream, Trace, UTCDateTime
+
+from ..edge.RawInputClient import PACKSTR, PACKETHEAD, TAG, FORCEOUT
+from ..edge.WaveformCache import merge_stream
+
+
+# bytes in a RawInputClient header, tag and forceout packet
+RAWHEADERSIZE = struct.calcsize(PACKSTR)
+# tracebuf2 header, "s" and "t" data types are big-endian
+TRACEBUFHEADER = ">2i3d7s9s4s3s2s3s2s2s"
+# maximum samples per tracebuf2 packet
+TRACEBUFSAMPLES = 1000
+
+
+class EdgeServer(object):
+    """Serve and store waveforms using the same protocols as Edge/CWB.
+
+    Protocols:
+
+    - waveserver, used by obspy.clients.earthworm.Client and EdgeFactory.
+    - query, used by obspy.clients.neic.Client and MiniSeedFactory.
+    - raw input, used by RawInputClient and EdgeFactory.put_timeseries.
+    - miniseed input, used by MiniSeedInputClient
+      and MiniSeedFactory.put_timeseries.
+
+    Data written using either input protocol can be read using either
+    output protocol.  Each protocol listens on its own port.
+
+    Parameters
+    ----------
+    host: str
+        address to listen on.
+    latency: float
+        seconds to wait before handling each request or received chunk.
+    throughput: int
+        maximum bytes per second for each connection, default no limit.
+    failure_rate: float
+        probability that a connection is closed before it is handled.
+    seed: int
+        seed for failure injection.
+
+    Notes
+    -----
+    Ports are assigned by the operating system, use the attributes
+    waveserver_port, query_port, raw_input_port and miniseed_input_port
+    after calling start().
+
+    Like Edge, written data is stored after clients disconnect,
+    use wait_for_inputs() before reading data that was just written.
+
+        with EdgeServer(latency=0.01) as server:
+            factory = EdgeFactory(
+                host=server.host,
+                port=server.waveserver_port,
+                write_port=server.raw_input_port,
+            )
+    """
+
+    def __init__(
+        self, host="127.0.0.1", latency=0, throughput=None, failure_rate=0, seed=0
+    ):
+        self.host = host
+        self.latency = latency
+        self.throughput = throughput
+        self.failure_rate = failure_rate
+        self.stats = {
+            "connections": 0,
+            "failures": 0,
+            "bytes_received": 0,
+            "bytes_sent": 0,
+        }
+        self.waveserver_port = None
+        self.query_port = None
+        self.raw_input_port = None
+        self.miniseed_input_port = None
+        self._lock = threading.Lock()
+        self._inputs = threading.Condition(self._lock)
+        self._active_inputs = 0
+        self._random = random.Random(seed)
+        self._servers = []
+        # traces by sncl
+        self._traces = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def add_stream(self, stream):
+        """Store waveforms, replacing existing samples at the same times.
+
+        Parameters
+        ----------
+        stream: obspy.core.Stream
+            waveforms to add.
+        """
+        with self._lock:
+            for trace in stream.split():
+                sncl = (
+                    trace.stats.network,
+                    trace.stats.station,
+                    trace.stats.location,
+                    trace.stats.channel,
+                )
+                existing = self._traces.get(sncl, Stream())
+                # remove samples that will be replaced
+                delta = trace.stats.delta
+                updated = existing.slice(
+                    endtime=trace.stats.starttime - delta / 2, nearest_sample=False
+                ) + existing.slice(
+                    starttime=trace.stats.endtime + delta / 2, nearest_sample=False
+                )
+                updated += trace.copy()
+                self._traces[sncl] = merge_stream(updated)
+
+    def get_stream(self, network, station, location, channel, starttime, endtime):
+        """Get stored waveforms.
+
+        Parameters
+        ----------
+        network: str
+            network code, or regular expression.
+        station: str
+            station code, or regular expression.
+        location: str
+            location code, or regular expression.
+        channel: str
+            channel code, or regular expression.
+        starttime: obspy.core.UTCDateTime
+            time of first sample.
+        endtime: obspy.core.UTCDateTime
+            time of last sample.
+
+        Returns
+        -------
+        obspy.core.Stream
+            stored waveforms without gaps, may be empty.
+        """
+        patterns = [re.compile(p + "$") for p in (network, station, location, channel)]
+        stream = Stream()
+        with self._lock:
+            for sncl, traces in self._traces.items():
+                if all(p.match(v) for p, v in zip(patterns, sncl)):
+                    stream += traces.slice(starttime, endtime, nearest_sample=False)
+        return stream.split().copy()
+
+    def start(self):
+        """Start listening on all ports, using background threads."""
+        handlers = [
+            ("waveserver_port", WaveServerHandler),
+            ("query_port", QueryHandler),
+            ("raw_input_port", RawInputHandler),
+            ("miniseed_input_port", MiniSeedInputHandler),
+        ]
+        for attribute, handler in handlers:
+            server = _TCPServer((self.host, 0), handler)
+            server.edge = self
+            thread = threading.Thread(
+                target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+            )
+            thread.start()
+            self._servers.append((server, thread))
+            setattr(self, attribute, server.server_address[1])
+
+    def stop(self):
+        """Stop listening, and close all ports."""
+        for server, thread in self._servers:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self._servers = []
+
+    def wait_for_inputs(self, timeout=5, interval=0.05):
+        """Wait until input connections are closed, and data is stored.
+
+        Parameters
+        ----------
+        timeout: float
+            maximum seconds to wait.
+        interval: float
+            seconds without new connections before returning.
+
+        Returns
+        -------
+        bool
+            False if timeout was reached.
+        """
+        end = time.time() + timeout
+        with self._inputs:
+            while True:
+                connections = self.stats["connections"]
+                remaining = end - time.time()
+                if not self._inputs.wait_for(
+                    lambda: self._active_inputs == 0, remaining
+                ):
+                    return False
+                # wait for connections that are not accepted yet
+                self._inputs.wait(min(interval, max(0, remaining)))
+                if connections == self.stats["connections"]:
+                    return self._active_inputs == 0
+
+    def _should_fail(self):
+        """Count a connection, and decide whether to inject a failure."""
+        with self._lock:
+            self.stats["connections"] += 1
+            fail = self._random.random() < self.failure_rate
+            if fail:
+                self.stats["failures"] += 1
+            return fail
+
+    def _throttle(self, nbytes, key):
+        """Count bytes, and wait long enough to honor throughput."""
+        with self._lock:
+            self.stats[key] += nbytes
+        if self.throughput:
+            time.sleep(nbytes / self.throughput)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Shared connection handling, with latency and failure injection."""
+
+    # whether connections write data, see EdgeServer.wait_for_inputs
+    is_input = False
+
+    def handle(self):
+        self.edge = self.server.edge
+        if self.edge._should_fail():
+            return
+        if self.is_input:
+            with self.edge._inputs:
+                self.edge._active_inputs += 1
+        try:
+            self.handle_connection()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if self.is_input:
+                with self.edge._inputs:
+                    self.edge._active_inputs -= 1
+                    self.edge._inputs.notify_all()
+
+    def handle_connection(self):
+        raise NotImplementedError()
+
+    def recv(self, size=65536):
+        """Receive bytes, returns empty bytes when connection is closed."""
+        data = self.request.recv(size)
+        self.edge._throttle(len(data), "bytes_received")
+        return data
+
+    def recv_exactly(self, size):
+        """Receive exactly size bytes, or None when connection is closed."""
+        data = b""
+        while len(data) < size:
+            chunk = self.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def recv_line(self, terminator):
+        """Receive a request line, or None when connection is closed."""
+        data = b""
+        while not data.endswith(terminator):
+            chunk = self.recv(1)
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def send(self, data, chunk_size=512):
+        """Send bytes, in chunks when throughput is limited.
+
+        Parameters
+        ----------
+        data: bytes
+            data to send.
+        chunk_size: int
+            chunks are multiples of this size.
+        """
+        if self.edge.throughput:
+            # about 10 chunks per second
+            size = max(1, int(self.edge.throughput / 10 / chunk_size)) * chunk_size
+        else:
+            size = max(1, len(data))
+        for start in range(0, len(data), size):
+            chunk = data[start : start + size]
+            self.request.sendall(chunk)
+            self.edge._throttle(len(chunk), "bytes_sent")
+
+    def wait(self):
+        """Simulate latency."""
+        if self.edge.latency:
+            time.sleep(self.edge.latency)
+
+
+class WaveServerHandler(_Handler):
+    """Earthworm waveserver GETSCNLRAW requests, one per connection."""
+
+    def handle_connection(self):
+        line = self.recv_line(b"\n")
+        if line is None:
+            return
+        tokens = line.decode().split()
+        if len(tokens) != 8 or tokens[0] != "GETSCNLRAW:":
+            return
+        request_id, station, channel, network, location = tokens[1:6]
+        starttime = UTCDateTime(float(tokens[6]))
+        endtime = UTCDateTime(float(tokens[7]))
+        stream = self.edge.get_stream(
+            re.escape(network),
+            re.escape(station),
+            "" if location == "--" else re.escape(location),
+            re.escape(channel),
+            starttime,
+            endtime,
+        )
+        self.wait()
+        scnl = " ".join([request_id, "0", station, channel, network, location])
+        if len(stream) == 0:
+            # requested data lie in tank gap
+            self.send(("%s FG s4\n" % scnl).encode())
+            return
+        data = b"".join(_get_tracebufs(trace) for trace in stream)
+        self.send(
+            (
+                "%s F s4 %f %f %d\n"
+                % (
+                    scnl,
+                    stream[0].stats.starttime.timestamp,
+                    stream[-1].stats.endtime.timestamp,
+                    len(data),
+                )
+            ).encode()
+        )
+        self.send(data)
+
+
+class QueryHandler(_Handler):
+    """CWB QueryServer requests, one per connection.
+
+    Responds with 512 byte miniseed records, followed by "<EOR>".
+    """
+
+    def handle_connection(self):
+        line = self.recv_line(b"\t")
+        if line is None:
+            return
+        args = shlex.split(line.decode())
+        options = dict(zip(args[::2], args[1::2]))
+        seedname = options["-s"].ljust(12)
+        starttime = UTCDateTime(options["-b"])
+        endtime = starttime + float(options["-d"])
+        stream = self.edge.get_stream(
+            seedname[0:2].strip(),
+            seedname[2:7].strip(),
+            seedname[10:12].strip(),
+            seedname[7:10],
+            starttime,
+            endtime,
+        )
+        self.wait()
+        buf = io.BytesIO()
+        if len(stream) > 0:
+            stream.write(buf, format="MSEED", reclen=512)
+        self.send(buf.getvalue())
+        # clients expect "<EOR>" at the start of a read
+        self.send(b"<EOR>")
+
+
+class RawInputHandler(_Handler):
+    """RawInputServer packets, see RawInputClient."""
+
+    is_input = True
+
+    def handle_connection(self):
+        while True:
+            header = self.recv_exactly(RAWHEADERSIZE)
+            if header is None:
+                return
+            (
+                head,
+                nsamp,
+                seedname,
+                yr,
+                doy,
+                ratemantissa,
+                ratedivisor,
+                _,
+                _,
+                _,
+                _,
+                secs,
+                usecs,
+                _,
+            ) = struct.unpack(PACKSTR, header)
+            if head != PACKETHEAD:
+                return
+            if nsamp in (TAG, FORCEOUT):
+                continue
+            data = self.recv_exactly(nsamp * 4)
+            if data is None:
+                return
+            self.wait()
+            seedname = seedname.decode()
+            self.edge.add_stream(
+                Stream(
+                    Trace(
+                        numpy.frombuffer(data, dtype=">i4").astype(numpy.int32),
+                        {
+                            "network": seedname[0:2].strip(),
+                            "station": seedname[2:7].strip(),
+                            "channel": seedname[7:10],
+                            "location": seedname[10:12].strip(),
+                            "starttime": UTCDateTime(year=yr, julday=doy)
+                            + secs
+                            + usecs / 1e6,
+                            "sampling_rate": _get_rate(ratemantissa, ratedivisor),
+                        },
+                    )
+                )
+            )
+
+
+class MiniSeedInputHandler(_Handler):
+    """MiniSeed records, see MiniSeedInputClient.
+
+    Records are stored as they are received, assumes all records on one
+    connection use the same record length.
+    """
+
+    is_input = True
+
+    def handle_connection(self):
+        buf = b""
+        reclen = None
+        while True:
+            chunk = self.recv()
+            if not chunk:
+                return
+            buf += chunk
+            if reclen is None:
+                # fixed header and blockette 1000
+                if len(buf) < 128:
+                    continue
+                reclen = obspy.io.mseed.util.get_record_information(io.BytesIO(buf))[
+                    "record_length"
+                ]
+            complete = len(buf) // reclen * reclen
+            if complete:
+                self.wait()
+                self.edge.add_stream(
+                    obspy.core.read(io.BytesIO(buf[:complete]), format="MSEED")
+                )
+                buf = buf[complete:]
+
+
+def _get_rate(ratemantissa, ratedivisor):
+    """Get sampling rate from SEED rate factor and multiplier.
+
+    RawInputClient encodes hour and day rates approximately.
+    """
+    rate = ratemantissa if ratemantissa > 0 else -1.0 / ratemantissa
+    if ratedivisor > 0:
+        return rate * ratedivisor
+    return rate / -ratedivisor
+
+
+def _get_tracebufs(trace):
+    """Encode a trace as tracebuf2 packets."""
+    if trace.data.dtype.kind == "f":
+        datatype, dtype = b"t8", ">f8"
+    else:
+        datatype, dtype = b"s4", ">i4"
+    data = trace.data.astype(dtype)
+    delta = trace.stats.delta
+    packets = []
+    for start in range(0, len(data), TRACEBUFSAMPLES):
+        samples = data[start : start + TRACEBUFSAMPLES]
+        starttime = trace.stats.starttime + start * delta
+        packets.append(
+            struct.pack(
+                TRACEBUFHEADER,
+                0,
+                len(samples),
+                starttime.timestamp,
+                (starttime + (len(samples) - 1) * delta).timestamp,
+                trace.stats.sampling_rate,
+                trace.stats.station.encode(),
+                trace.stats.network.encode(),
+                trace.stats.channel.encode(),
+                (trace.stats.location or "--").encode(),
+                b"20",
+                datatype,
+                b"",
+                b"",
+            )
+        )
+        packets.append(samples.tobytes())
+    return b"".join(packets)
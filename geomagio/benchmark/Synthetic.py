@@ -0,0 +1,112 @@
+"""Deterministic synthetic geomagnetic data."""
+from __future__ import absolute_import
+
+import numpy
+from obspy.core import Stream, UTCDateTime
+
+from .. import TimeseriesUtility
+
+
+# typical field values, in nT, for synthetic channels
+BASELINES = {
+    "H": 20800.0,
+    "E": -60.0,
+    "D": 0.0,
+    "X": 20700.0,
+    "Y": 1500.0,
+    "Z": 47600.0,
+    "F": 52100.0,
+}
+
+
+def get_synthetic_stream(
+    starttime=UTCDateTime("2020-01-01T00:00:00Z"),
+    endtime=UTCDateTime("2020-01-01T23:59:00Z"),
+    interval="minute",
+    channels=("H", "E", "Z", "F"),
+    observatory="SYN",
+    type="variation",
+    gap_density=0.0,
+    gap_length=60,
+    seed=0,
+):
+    """Generate a multi-channel stream that resembles observatory data.
+
+    Each channel is a baseline, plus a daily variation, plus a random walk.
+    The same arguments always generate the same data.
+
+    Parameters
+    ----------
+    starttime : obspy.core.UTCDateTime
+        time of first sample.
+    endtime : obspy.core.UTCDateTime
+        time of last sample.
+    interval : str
+        interval length {minute, second, tenhertz}
+    channels : array_like
+        channels to generate.
+    observatory : str
+        observatory code.
+    type : str
+        data type {definitive, quasi-definitive, variation}
+    gap_density : float
+        approximate fraction of samples, between 0 and 1,
+        replaced with NaN in each channel.
+    gap_length : int
+        number of samples in each gap.
+    seed : int
+        seed for random number generator.
+
+    Returns
+    -------
+    obspy.core.Stream
+        stream with one trace per channel.
+    """
+    random = numpy.random.RandomState(seed)
+    stream = Stream()
+    for channel in channels:
+        trace = TimeseriesUtility.create_empty_trace(
+            starttime=starttime,
+            endtime=endtime,
+            observatory=observatory,
+            channel=channel,
+            type=type,
+            interval=interval,
+            network="NT",
+            station=observatory,
+            location="R0",
+        )
+        stats = trace.stats
+        stats.data_type = type
+        stats.data_interval = interval
+        times = stats.starttime.timestamp + numpy.arange(stats.npts) * stats.delta
+        daily = numpy.sin(2 * numpy.pi * (times % 86400) / 86400)
+        walk = numpy.cumsum(
+            random.normal(scale=0.05 * stats.delta ** 0.5, size=stats.npts)
+        )
+        trace.data = BASELINES.get(channel, 0.0) + 25.0 * daily + walk
+        _add_gaps(trace.data, gap_density, gap_length, random)
+        stream += trace
+    return stream
+
+
+def _add_gaps(data, gap_density, gap_length, random):
+    """Replace runs of samples with NaN.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        data to modify in place.
+    gap_density : float
+        approximate fraction of samples to replace.
+    gap_length : int
+        number of samples in each gap.
+    random : numpy.random.RandomState
+        random number generator.
+    """
+    gap_count = int(len(data) * gap_density / gap_length)
+    if gap_count == 0:
+        return
+    starts = random.randint(0, max(1, len(data) - gap_length), size=gap_count)
+    for start in starts:
+        data[start : start + gap_length] = numpy.nan
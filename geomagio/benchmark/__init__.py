@@ -0,0 +1,19 @@
+"""Benchmarks for algorithms, parsers, writers and edge clients.
+
+Run from the command line using:
+    python -m geomagio.benchmark
+"""
+from __future__ import absolute_import
+
+from .EdgeServer import EdgeServer
+from .Benchmark import BENCHMARKS, compare_results, run_benchmark, run_benchmarks
+from .Synthetic import get_synthetic_stream
+
+__all__ = [
+    "BENCHMARKS",
+    "compare_results",
+    "EdgeServer",
+    "get_synthetic_stream",
+    "run_benchmark",
+    "run_benchmarks",
+]
@@ -0,0 +1,4 @@
+"""Run benchmarks using "python -m geomagio.benchmark"."""
+from .Benchmark import main
+
+main()
@@ -17,11 +17,39 @@ import obspy.core
 from datetime import datetime
 from obspy.clients import earthworm
 
-from .. import ChannelConverter, TimeseriesUtility
+from .. import ChannelConverter, TimeseriesUtility, Util
 from ..TimeseriesFactory import TimeseriesFactory
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..ObservatoryMetadata import ObservatoryMetadata
 from .RawInputClient import RawInputClient
+from .sncl import SNCLTable
+
+# known values, for reverse SNCL lookups
+SNCL_ELEMENTS = [
+    "D",
+    "E",
+    "F",
+    "H",
+    "Z",
+    "G",
+    "X",
+    "Y",
+    "E-E",
+    "E-N",
+    "DIST",
+    "DST",
+    "SQ",
+    "SV",
+]
+SNCL_TYPES = [
+    "variation",
+    "adjusted",
+    "quasi-definitive",
+    "definitive",
+    "reported",
+    "provisional",
+]
+SNCL_INTERVALS = ["day", "hour", "minute", "second"]
 
 
 class EdgeFactory(TimeseriesFactory):
@@ -59,6 +87,9 @@ class EdgeFactory(TimeseriesFactory):
     forceout: bool
         Tells edge to forceout a packet to miniseed.  Generally used when
         the user knows no more data is coming.
+    concurrency: int
+        number of channels to request or write at the same time.
+        each channel is written using its own RawInputClient connection.
 
     See Also
     --------
@@ -87,6 +118,7 @@ class EdgeFactory(TimeseriesFactory):
         cwbport=0,
         tag="GeomagAlg",
         forceout=False,
+        concurrency=1,
     ):
         TimeseriesFactory.__init__(self, observatory, channels, type, interval)
         self.client = earthworm.Client(host, port)
@@ -101,6 +133,9 @@ class EdgeFactory(TimeseriesFactory):
         self.cwbhost = cwbhost or ""
         self.cwbport = cwbport
         self.forceout = forceout
+        self.concurrency = concurrency
+        self._sncl_table = None
+        self._sncl_location = None
 
     def get_timeseries(
         self,
@@ -154,12 +189,15 @@ class EdgeFactory(TimeseriesFactory):
         try:
             # send stdout to stderr
             sys.stdout = sys.stderr
-            # get the timeseries
+            # get the timeseries, requesting channels at the same time
             timeseries = obspy.core.Stream()
-            for channel in channels:
-                data = self._get_timeseries(
+            for data in Util.map_concurrent(
+                lambda channel: self._get_timeseries(
                     starttime, endtime, observatory, channel, type, interval
-                )
+                ),
+                channels,
+                self.concurrency,
+            ):
                 timeseries += data
         finally:
             # restore stdout
@@ -198,6 +236,12 @@ class EdgeFactory(TimeseriesFactory):
         Streams sent to timeseries are expected to have a single trace per
             channel and that trace should have an ndarray, with nan's
             representing gaps.
+        All channels are written, even when some fail.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if any channels could not be written.
         """
         stats = timeseries[0].stats
         observatory = observatory or stats.station or self.observatory
@@ -215,10 +259,22 @@ class EdgeFactory(TimeseriesFactory):
                     'Missing channel "%s" for output, available channels %s'
                     % (channel, str(TimeseriesUtility.get_channels(timeseries)))
                 )
-        for channel in channels:
-            self._put_channel(
-                timeseries, observatory, channel, type, interval, starttime, endtime
-            )
+
+        def put_channel(channel):
+            try:
+                self._put_channel(
+                    timeseries, observatory, channel, type, interval, starttime, endtime
+                )
+            except Exception as e:
+                return e
+
+        errors = Util.map_concurrent(put_channel, channels, self.concurrency)
+        errors = [(c, e) for c, e in zip(channels, errors) if e is not None]
+        if errors:
+            raise TimeseriesFactoryException(
+                "Error writing channels: "
+                + ", ".join('"%s" (%s)' % (c, e) for c, e in errors)
+            ) from errors[0][1]
 
     def _convert_timeseries_to_decimal(self, stream):
         """convert geomag edge timeseries data stored as ints, to decimal by
@@ -277,6 +333,73 @@ class EdgeFactory(TimeseriesFactory):
             trace.data = numpy.ma.masked_invalid(trace.data)
         return stream
 
+    def get_edge_sncls(self, items):
+        """Get edge SNCL codes for many channels.
+
+        Translations are memoized, so each is only calculated once.
+
+        Parameters
+        ----------
+        items : array_like
+            tuples of (observatory, channel, type, interval).
+
+        Returns
+        -------
+        list<tuple>
+            (network, station, location, channel) for each item.
+        """
+        return self._get_sncl_table().get_sncls(items)
+
+    def parse_edge_sncls(self, sncls):
+        """Get channels for many edge SNCL codes.
+
+        Parameters
+        ----------
+        sncls : array_like
+            tuples of (network, station, location, channel).
+
+        Returns
+        -------
+        list<tuple>
+            (observatory, channel, type, interval) for each SNCL.
+
+        Raises
+        ------
+        SNCLException
+            when a SNCL does not match a known channel, type and interval.
+        """
+        return self._get_sncl_table().parse_sncls(sncls)
+
+    def _get_edge_sncl(self, observatory, channel, type, interval):
+        """get memoized edge network, station, location and channel.
+
+        See _get_edge_network, _get_edge_station, _get_edge_location and
+        _get_edge_channel.
+
+        Returns
+        -------
+        tuple
+            (network, station, location, channel)
+        """
+        return self._get_sncl_table().get_sncl(observatory, channel, type, interval)
+
+    def _get_sncl_table(self):
+        """Get SNCL translation table, which depends on locationCode."""
+        if self._sncl_table is None or self._sncl_location != self.locationCode:
+            self._sncl_location = self.locationCode
+            self._sncl_table = SNCLTable(
+                lambda *args: (
+                    self._get_edge_network(*args),
+                    self._get_edge_station(*args),
+                    self._get_edge_location(*args),
+                    self._get_edge_channel(*args),
+                ),
+                elements=SNCL_ELEMENTS,
+                types=SNCL_TYPES,
+                intervals=SNCL_INTERVALS,
+            )
+        return self._sncl_table
+
     def _get_edge_channel(self, observatory, channel, type, interval):
         """get edge channel.
 
@@ -482,10 +605,9 @@ class EdgeFactory(TimeseriesFactory):
         obspy.core.trace
             timeseries trace of the requested channel data
         """
-        station = self._get_edge_station(observatory, channel, type, interval)
-        location = self._get_edge_location(observatory, channel, type, interval)
-        network = self._get_edge_network(observatory, channel, type, interval)
-        edge_channel = self._get_edge_channel(observatory, channel, type, interval)
+        network, station, location, edge_channel = self._get_edge_sncl(
+            observatory, channel, type, interval
+        )
         try:
             data = self.client.get_waveforms(
                 network, station, location, edge_channel, starttime, endtime
@@ -576,10 +698,9 @@ class EdgeFactory(TimeseriesFactory):
         -----
         RawInputClient seems to only work when sockets are
         """
-        station = self._get_edge_station(observatory, channel, type, interval)
-        location = self._get_edge_location(observatory, channel, type, interval)
-        network = self._get_edge_network(observatory, channel, type, interval)
-        edge_channel = self._get_edge_channel(observatory, channel, type, interval)
+        network, station, location, edge_channel = self._get_edge_sncl(
+            observatory, channel, type, interval
+        )
 
         now = obspy.core.UTCDateTime(datetime.utcnow())
         if ((now - endtime) > 864000) and (self.cwbport > 0):
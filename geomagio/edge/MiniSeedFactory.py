@@ -10,6 +10,7 @@ Edge is the USGS earthquake hazard centers replacement for earthworm.
 """
 from __future__ import absolute_import
 
+import collections
 import sys
 import numpy
 import numpy.ma
@@ -17,12 +18,33 @@ import numpy.ma
 import obspy.core
 from obspy.clients.neic import client as miniseed
 
-from .. import ChannelConverter, TimeseriesUtility
+from .. import ChannelConverter, TimeseriesUtility, Util
 from ..Metadata import get_instrument
 from ..TimeseriesFactory import TimeseriesFactory
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..ObservatoryMetadata import ObservatoryMetadata
 from .MiniSeedInputClient import MiniSeedInputClient
+from .sncl import SNCLTable
+
+# known values, for reverse SNCL lookups
+SNCL_ELEMENTS = (
+    ["D", "F", "G", "H", "U", "V", "W", "X", "Y", "Z", "E-E", "E-N", "Dst4", "Dst3"]
+    + [
+        element + "_" + suffix
+        for suffix in ["Dist", "SQ", "SV", "DT"]
+        for element in ["D", "F", "G", "H", "U", "V", "W", "X", "Y", "Z"]
+    ]
+    + [element + "_" + suffix for suffix in ["Bin", "Volt"] for element in "UVW"]
+)
+SNCL_TYPES = [
+    "variation",
+    "adjusted",
+    "quasi-definitive",
+    "definitive",
+    "reported",
+    "provisional",
+]
+SNCL_INTERVALS = ["day", "hour", "minute", "second", "tenhertz"]
 
 
 class MiniSeedFactory(TimeseriesFactory):
@@ -50,6 +72,15 @@ class MiniSeedFactory(TimeseriesFactory):
     locationCode: str
         the location code for the given edge server, overrides type
         in get_timeseries/put_timeseries
+    convert_channels: array
+        channels to convert from volt/bin to nT, see #_convert_timeseries().
+    concurrency: int
+        number of channels to request at the same time.
+    write_async: bool
+        when True, put_timeseries returns after queueing data,
+        which is sent in the background; close() must be called
+        after the last put_timeseries, or queued data may be lost.
+        when False (default), put_timeseries returns after data is sent.
 
     See Also
     --------
@@ -75,6 +106,8 @@ class MiniSeedFactory(TimeseriesFactory):
         observatoryMetadata=None,
         locationCode=None,
         convert_channels=None,
+        concurrency=1,
+        write_async=False,
     ):
         TimeseriesFactory.__init__(self, observatory, channels, type, interval)
 
@@ -86,7 +119,11 @@ class MiniSeedFactory(TimeseriesFactory):
         self.port = port
         self.write_port = write_port
         self.convert_channels = convert_channels or []
+        self.concurrency = concurrency
+        self.write_async = write_async
         self.write_client = MiniSeedInputClient(self.host, self.write_port)
+        self._sncl_table = None
+        self._sncl_location = None
 
     def get_timeseries(
         self,
@@ -140,18 +177,31 @@ class MiniSeedFactory(TimeseriesFactory):
         try:
             # send stdout to stderr
             sys.stdout = sys.stderr
-            # get the timeseries
+            # get the timeseries, requesting channels at the same time
+            convert = [c for c in channels if c in self.convert_channels]
+            read = [c for c in channels if c not in self.convert_channels]
+            by_channel = dict(
+                zip(
+                    read,
+                    Util.map_concurrent(
+                        lambda channel: self._get_timeseries(
+                            starttime, endtime, observatory, channel, type, interval
+                        ),
+                        read,
+                        self.concurrency,
+                    ),
+                )
+            )
+            if convert:
+                # converted channels share one fetch of their components
+                converted = self._convert_channels(
+                    starttime, endtime, observatory, convert, type, interval
+                )
+                for channel in convert:
+                    by_channel[channel] = converted.select(channel=channel)
             timeseries = obspy.core.Stream()
             for channel in channels:
-                if channel in self.convert_channels:
-                    data = self._convert_timeseries(
-                        starttime, endtime, observatory, channel, type, interval
-                    )
-                else:
-                    data = self._get_timeseries(
-                        starttime, endtime, observatory, channel, type, interval
-                    )
-                timeseries += data
+                timeseries += by_channel[channel]
         finally:
             # restore stdout
             sys.stdout = original_stdout
@@ -189,6 +239,11 @@ class MiniSeedFactory(TimeseriesFactory):
         Streams sent to timeseries are expected to have a single trace per
             channel and that trace should have an ndarray, with nan's
             representing gaps.
+
+        The write socket stays open between calls, use close() to close it.
+        When write_async is True, data is sent in the background.  Each call
+            waits for data from the previous call to be sent, and raises any
+            error sending it.  close() waits for the last call.
         """
         stats = timeseries[0].stats
         observatory = observatory or stats.station or self.observatory
@@ -206,15 +261,36 @@ class MiniSeedFactory(TimeseriesFactory):
                     'Missing channel "%s" for output, available channels %s'
                     % (channel, str(TimeseriesUtility.get_channels(timeseries)))
                 )
+        # wait for previous call, and report errors sending it
+        self.write_client.flush()
         for channel in channels:
             self._put_channel(
                 timeseries, observatory, channel, type, interval, starttime, endtime
             )
-        # close socket
+        if not self.write_async:
+            self.write_client.flush()
+
+    def close(self):
+        """Wait for data to be sent, then close the write socket.
+
+        Required after the last put_timeseries when write_async is True.
+
+        Raises
+        ------
+        Exception
+            if data could not be sent.
+        """
         self.write_client.close()
 
     def get_calculated_timeseries(
-        self, starttime, endtime, observatory, channel, type, interval, components
+        self,
+        starttime,
+        endtime,
+        observatory,
+        channel,
+        type,
+        interval,
+        components,
     ):
         """Calculate a single channel using multiple component channels.
 
@@ -243,37 +319,90 @@ class MiniSeedFactory(TimeseriesFactory):
         obspy.core.trace
             timeseries trace of the converted channel data
         """
-        # sum channels
-        stats = None
-        converted = None
-        for component in components:
-            # load component
-            data = self._get_timeseries(
-                starttime, endtime, observatory, component["channel"], type, interval
-            )[0]
-            # convert to nT
-            nt = data.data * component["scale"] + component["offset"]
-            # add to converted
-            if converted is None:
-                converted = nt
-                stats = obspy.core.Stats(data.stats)
-            else:
-                converted += nt
-        # set channel parameter to U, V, or W
-        stats.channel = channel
-        # create empty trace with adapted stats
-        out = TimeseriesUtility.create_empty_trace(
-            stats.starttime,
-            stats.endtime,
-            stats.station,
-            stats.channel,
-            stats.data_type,
-            stats.data_interval,
-            stats.network,
-            stats.station,
-            stats.location,
+        return self._calculate_channels(
+            starttime,
+            endtime,
+            observatory,
+            type,
+            interval,
+            {channel: components},
+        )[0]
+
+    def _calculate_channels(
+        self, starttime, endtime, observatory, type, interval, calculated
+    ):
+        """Calculate several channels from one load of their components.
+
+        Each channel is the sum of its scaled and offset components,
+        calculated for all channels at once as a matrix product.
+
+        Parameters
+        ----------
+        starttime: obspy.core.UTCDateTime
+            the starttime of the requested data
+        endtime: obspy.core.UTCDateTime
+            the endtime of the requested data
+        observatory : str
+            observatory code
+        type : str
+            data type {definitive, quasi-definitive, variation}
+        interval : str
+            interval length {'day', 'hour', 'minute', 'second', 'tenhertz'}
+        calculated : dict
+            maps each channel to calculate to a list of components,
+            see #get_calculated_timeseries().
+
+        Returns
+        -------
+        obspy.core.Stream
+            one trace for each calculated channel, in order.
+        """
+        channels = list(calculated.keys())
+        component_channels = []
+        for components in calculated.values():
+            for component in components:
+                if component["channel"] not in component_channels:
+                    component_channels.append(component["channel"])
+        traces = self._get_components(
+            starttime,
+            endtime,
+            observatory,
+            component_channels,
+            type,
+            interval,
         )
-        out.data = converted
+        data = numpy.array([trace.data for trace in traces])
+        # scale for each channel and component, and offset for each channel
+        scales = numpy.zeros((len(channels), len(component_channels)))
+        used = numpy.zeros(scales.shape, dtype=bool)
+        offsets = numpy.zeros((len(channels), 1))
+        for i, channel in enumerate(channels):
+            for component in calculated[channel]:
+                j = component_channels.index(component["channel"])
+                scales[i, j] += component["scale"]
+                used[i, j] = True
+                offsets[i] += component["offset"]
+        # gaps in any used component are gaps in the channel
+        gaps = numpy.isnan(data)
+        converted = scales.dot(numpy.where(gaps, 0, data)) + offsets
+        converted[used.dot(gaps)] = numpy.nan
+        out = obspy.core.Stream()
+        stats = traces[0].stats
+        for channel, values in zip(channels, converted):
+            # create empty trace with adapted stats
+            trace = TimeseriesUtility.create_empty_trace(
+                stats.starttime,
+                stats.endtime,
+                stats.station,
+                channel,
+                stats.data_type,
+                stats.data_interval,
+                stats.network,
+                stats.station,
+                stats.location,
+            )
+            trace.data = values
+            out += trace
         return out
 
     def _convert_stream_to_masked(self, timeseries, channel):
@@ -295,6 +424,73 @@ class MiniSeedFactory(TimeseriesFactory):
             trace.data = numpy.ma.masked_invalid(trace.data)
         return stream
 
+    def get_edge_sncls(self, items):
+        """Get edge SNCL codes for many channels.
+
+        Translations are memoized, so each is only calculated once.
+
+        Parameters
+        ----------
+        items : array_like
+            tuples of (observatory, channel, type, interval).
+
+        Returns
+        -------
+        list<tuple>
+            (network, station, location, channel) for each item.
+        """
+        return self._get_sncl_table().get_sncls(items)
+
+    def parse_edge_sncls(self, sncls):
+        """Get channels for many edge SNCL codes.
+
+        Parameters
+        ----------
+        sncls : array_like
+            tuples of (network, station, location, channel).
+
+        Returns
+        -------
+        list<tuple>
+            (observatory, channel, type, interval) for each SNCL.
+
+        Raises
+        ------
+        SNCLException
+            when a SNCL does not match a known channel, type and interval.
+        """
+        return self._get_sncl_table().parse_sncls(sncls)
+
+    def _get_edge_sncl(self, observatory, channel, type, interval):
+        """get memoized edge network, station, location and channel.
+
+        See _get_edge_network, _get_edge_station, _get_edge_location and
+        _get_edge_channel.
+
+        Returns
+        -------
+        tuple
+            (network, station, location, channel)
+        """
+        return self._get_sncl_table().get_sncl(observatory, channel, type, interval)
+
+    def _get_sncl_table(self):
+        """Get SNCL translation table, which depends on locationCode."""
+        if self._sncl_table is None or self._sncl_location != self.locationCode:
+            self._sncl_location = self.locationCode
+            self._sncl_table = SNCLTable(
+                lambda *args: (
+                    self._get_edge_network(*args),
+                    self._get_edge_station(*args),
+                    self._get_edge_location(*args),
+                    self._get_edge_channel(*args),
+                ),
+                elements=SNCL_ELEMENTS,
+                types=SNCL_TYPES,
+                intervals=SNCL_INTERVALS,
+            )
+        return self._sncl_table
+
     def _get_edge_channel(self, observatory, channel, type, interval):
         """get edge channel.
 
@@ -524,10 +720,9 @@ class MiniSeedFactory(TimeseriesFactory):
         obspy.core.trace
             timeseries trace of the requested channel data
         """
-        station = self._get_edge_station(observatory, channel, type, interval)
-        location = self._get_edge_location(observatory, channel, type, interval)
-        network = self._get_edge_network(observatory, channel, type, interval)
-        edge_channel = self._get_edge_channel(observatory, channel, type, interval)
+        network, station, location, edge_channel = self._get_edge_sncl(
+            observatory, channel, type, interval
+        )
         data = self.client.get_waveforms(
             network, station, location, edge_channel, starttime, endtime
         )
@@ -552,8 +747,25 @@ class MiniSeedFactory(TimeseriesFactory):
     ):
         """Generate a single channel using multiple components.
 
-        Finds metadata, then calls _get_converted_timeseries for actual
-        conversion.
+        See #_convert_channels().
+
+        Returns
+        -------
+        obspy.core.trace
+            timeseries trace of the requested channel data
+        """
+        return self._convert_channels(
+            starttime, endtime, observatory, [channel], type, interval
+        )
+
+    def _convert_channels(
+        self, starttime, endtime, observatory, channels, type, interval
+    ):
+        """Generate channels using multiple components.
+
+        Finds metadata, then calls _calculate_channels for actual
+        conversion.  Components used by more than one channel are only
+        loaded once.
 
         Parameters
         ----------
@@ -563,8 +775,8 @@ class MiniSeedFactory(TimeseriesFactory):
             the endtime of the requested data
         observatory : str
             observatory code
-        channel : str
-            single character channel {H, E, D, Z, F}
+        channels : array_like
+            channels to convert {U, V, W}
         type : str
             data type {definitive, quasi-definitive, variation}
         interval : str
@@ -572,8 +784,8 @@ class MiniSeedFactory(TimeseriesFactory):
 
         Returns
         -------
-        obspy.core.trace
-            timeseries trace of the requested channel data
+        obspy.core.Stream
+            timeseries traces of the requested channel data
         """
         out = obspy.core.Stream()
         metadata = get_instrument(observatory, starttime, endtime)
@@ -583,8 +795,13 @@ class MiniSeedFactory(TimeseriesFactory):
             entry_starttime = entry["start_time"]
             instrument = entry["instrument"]
             instrument_channels = instrument["channels"]
-            if channel not in instrument_channels:
-                # no idea how to convert
+            calculated = dict(
+                (channel, instrument_channels[channel])
+                for channel in channels
+                # no idea how to convert others
+                if channel in instrument_channels
+            )
+            if not calculated:
                 continue
             # determine metadata overlap with request
             start = (
@@ -598,17 +815,63 @@ class MiniSeedFactory(TimeseriesFactory):
                 else entry_endtime
             )
             # now convert
-            out += self.get_calculated_timeseries(
-                start,
-                end,
-                observatory,
-                channel,
-                type,
-                interval,
-                instrument_channels[channel],
+            out += self._calculate_channels(
+                start, end, observatory, type, interval, calculated
             )
         return out
 
+    def _get_components(
+        self, starttime, endtime, observatory, channels, type, interval
+    ):
+        """Load component channels, requesting channels at the same time.
+
+        Channels that translate to the same edge SNCL are only requested once.
+
+        Parameters
+        ----------
+        starttime: obspy.core.UTCDateTime
+            the starttime of the requested data
+        endtime: obspy.core.UTCDateTime
+            the endtime of the requested data
+        observatory : str
+            observatory code
+        channels : array_like
+            component channels to load.
+        type : str
+            data type {definitive, quasi-definitive, variation}
+        interval : str
+            interval length {'day', 'hour', 'minute', 'second', 'tenhertz'}
+
+        Returns
+        -------
+        list<obspy.core.Trace>
+            one trace for each channel, spanning starttime to endtime,
+            with nan representing gaps.
+        """
+        sncls = self.get_edge_sncls(
+            [(observatory, channel, type, interval) for channel in channels]
+        )
+        # first channel for each sncl, in order
+        load = collections.OrderedDict()
+        for sncl, channel in zip(sncls, channels):
+            load.setdefault(sncl, channel)
+        traces = {}
+        for sncl, data in zip(
+            load,
+            Util.map_concurrent(
+                lambda sncl: self._get_timeseries(
+                    starttime, endtime, observatory, load[sncl], type, interval
+                ),
+                load,
+                self.concurrency,
+            ),
+        ):
+            trace = data[0]
+            trace.data = numpy.ma.filled(trace.data.astype(numpy.float64), numpy.nan)
+            trace.trim(starttime, endtime, pad=True, fill_value=numpy.nan)
+            traces[sncl] = trace
+        return [traces[sncl] for sncl in sncls]
+
     def _post_process(self, timeseries, starttime, endtime, channels):
         """Post process a timeseries stream after the raw data is
                 is fetched from querymom. Specifically changes
@@ -666,10 +929,9 @@ class MiniSeedFactory(TimeseriesFactory):
         to_write = to_write.split()
         to_write = TimeseriesUtility.unmask_stream(to_write)
         # relabel channels from internal to edge conventions
-        station = self._get_edge_station(observatory, channel, type, interval)
-        location = self._get_edge_location(observatory, channel, type, interval)
-        network = self._get_edge_network(observatory, channel, type, interval)
-        edge_channel = self._get_edge_channel(observatory, channel, type, interval)
+        network, station, location, edge_channel = self._get_edge_sncl(
+            observatory, channel, type, interval
+        )
         for trace in to_write:
             trace.stats.station = station
             trace.stats.location = location
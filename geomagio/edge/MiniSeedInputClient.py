@@ -1,14 +1,19 @@
 from __future__ import absolute_import, print_function
 import io
+import queue
 import socket
 import sys
+import threading
+import time
 
 
 class MiniSeedInputClient(object):
     """Client to write MiniSeed formatted data to Edge.
 
-    Connects on first call to send().
-    Use close() to disconnect.
+    Data is converted to MiniSeed records when send() is called,
+    and sent by a background thread, which combines records from
+    multiple calls and reconnects when there are errors.
+    Use close() to wait for queued data to be sent, and disconnect.
 
     Parameters
     ----------
@@ -16,61 +21,203 @@ class MiniSeedInputClient(object):
         MiniSeedServer hostname
     port: int
         MiniSeedServer port
+    reclen: int
+        MiniSeed record length in bytes, usually 512 or 4096.
+    queue_size: int
+        maximum number of send() calls waiting to be sent,
+        send() blocks when the queue is full.
+    max_attempts: int
+        number of times to try connecting and sending a batch of records.
+    backoff: float
+        seconds to wait after the first failure,
+        doubled after each additional failure.
+    max_backoff: float
+        maximum seconds to wait between attempts.
     """
 
-    def __init__(self, host, port=2061):
+    def __init__(
+        self,
+        host,
+        port=2061,
+        reclen=512,
+        queue_size=100,
+        max_attempts=5,
+        backoff=1,
+        max_backoff=30,
+    ):
         self.host = host
         self.port = port
+        self.reclen = reclen
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
         self.socket = None
+        self.stats = {"bytes": 0, "records": 0, "sends": 0, "seconds": 0.0}
+        self._error = None
+        self._queue = None
+        self._thread = None
 
     def close(self):
-        """Close socket if open."""
-        if self.socket is not None:
-            try:
-                self.socket.close()
-            finally:
-                self.socket = None
+        """Wait for queued data to be sent, then close socket if open.
 
-    def connect(self, max_attempts=2):
+        Raises
+        ------
+        Exception
+            if queued data could not be sent.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+            self._close_socket()
+            self._error = None
+
+    def connect(self, max_attempts=None):
         """Connect to socket if not already open.
 
         Parameters
         ----------
         max_attempts: int
             number of times to try connecting when there are failures.
-            default 2.
+            default self.max_attempts.
         """
         if self.socket is not None:
             return
-        s = None
+        max_attempts = max_attempts or self.max_attempts
         attempts = 0
         while True:
             attempts += 1
             try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.connect(self.host, self.port)
+                self.socket = socket.create_connection((self.host, self.port))
                 break
             except socket.error as e:
                 if attempts >= max_attempts:
                     raise
                 print("Unable to connect (%s), trying again" % e, file=sys.stderr)
-        self.socket = s
+                time.sleep(self._get_backoff(attempts))
+
+    def flush(self):
+        """Wait for queued data to be sent.
+
+        Raises
+        ------
+        Exception
+            if queued data could not be sent.
+        """
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_error()
+
+    def get_stats(self):
+        """Get statistics about data sent.
+
+        Returns
+        -------
+        dict
+            total "bytes", "records", socket "sends", and "seconds" sending,
+            and "bytes_per_second" while sending.
+        """
+        stats = dict(self.stats)
+        stats["bytes_per_second"] = (
+            stats["seconds"] and stats["bytes"] / stats["seconds"] or 0
+        )
+        return stats
 
     def send(self, stream):
         """Send traces to EDGE in miniseed format.
 
-        All traces in stream will be converted to MiniSeed, and sent as-is.
+        All traces in stream will be converted to MiniSeed, and queued to be
+        sent as-is.
 
         Parameters
         ----------
         stream: obspy.core.Stream
             stream with trace(s) to send.
+
+        Raises
+        ------
+        Exception
+            if previously queued data could not be sent.
         """
-        # connect if needed
-        if self.socket is None:
-            self.connect()
+        self._raise_error()
         # convert stream to miniseed
         buf = io.BytesIO()
-        stream.write(buf, format="MSEED")
-        # send data
-        self.socket.sendall(buf)
+        stream.write(buf, format="MSEED", reclen=self.reclen)
+        # start sending in background if needed
+        if self._thread is None:
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        # blocks when queue is full
+        self._queue.put(buf.getvalue())
+
+    def _close_socket(self):
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            finally:
+                self.socket = None
+
+    def _get_backoff(self, attempts):
+        """Get seconds to wait after a number of failed attempts."""
+        return min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+
+    def _raise_error(self):
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+
+    def _run(self):
+        """Send queued data, until None is queued."""
+        while True:
+            batch = [self._queue.get()]
+            # combine records waiting in queue
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            data = b"".join(b for b in batch if b is not None)
+            try:
+                # after an error, queued data is discarded until reported
+                if data and self._error is None:
+                    self._send(data)
+            except Exception as e:
+                self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def _send(self, data):
+        """Send data, reconnecting when there are errors.
+
+        Parameters
+        ----------
+        data: bytes
+            miniseed records to send.
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            start = time.time()
+            try:
+                self.connect(max_attempts=1)
+                self.socket.sendall(data)
+                break
+            except socket.error as e:
+                self._close_socket()
+                if attempts >= self.max_attempts:
+                    raise
+                print("Unable to send (%s), reconnecting" % e, file=sys.stderr)
+                time.sleep(self._get_backoff(attempts))
+        self.stats["bytes"] += len(data)
+        self.stats["records"] += len(data) // self.reclen
+        self.stats["sends"] += 1
+        self.stats["seconds"] += time.time() - start
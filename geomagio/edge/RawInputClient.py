@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 from builtins import range, str
 
+import numpy
 import socket  # noqa
 import struct
 import sys
@@ -33,6 +34,27 @@ PACKSTR = "!1H1h12s4h4B3i"
 TAGSTR = "!1H1h12s6i"
 PACKETHEAD = 0xA1B2
 
+"""
+PACKETHEADER: numpy structured dtype equivalent to PACKSTR, used to encode
+    many data packets at once.
+"""
+PACKETHEADER = [
+    ("head", ">u2"),
+    ("nsamp", ">i2"),
+    ("seedname", "S12"),
+    ("yr", ">i2"),
+    ("doy", ">i2"),
+    ("ratemantissa", ">i2"),
+    ("ratedivisor", ">i2"),
+    ("activity", "u1"),
+    ("ioclock", "u1"),
+    ("quality", "u1"),
+    ("timingquality", "u1"),
+    ("secs", ">i4"),
+    ("usecs", ">i4"),
+    ("seq", ">i4"),
+]
+
 """
 TAG, FORCEOUT: Flags that indicate to edge that a "data" packet has a specific
     function. Goes in the nsamp position of the packet header.
@@ -170,9 +192,9 @@ class RawInputClient:
         -----
         Edge only takes a short as the max number of samples it takes at one
         time. For ease of calculation, we break a trace into managable chunks
-        according to interval type.
+        according to interval type.  All chunks are encoded at once, and
+        sent using one call to _send.
         """
-        totalsamps = len(trace.data)
         starttime = trace.stats.starttime
 
         if interval == "second":
@@ -194,17 +216,15 @@ class RawInputClient:
         else:
             raise TimeseriesFactoryException("Unsupported interval for RawInputClient")
 
-        for i in range(0, totalsamps, nsamp):
-            if totalsamps - i < nsamp:
-                endsample = totalsamps
-            else:
-                endsample = i + nsamp
-            nsamp = endsample - i
-            endtime = starttime + (nsamp - 1) * timeoffset
-            trace_send = trace.slice(starttime, endtime)
-            buf = self._get_data(trace_send.data, starttime, samplerate)
-            self._send(buf)
-            starttime += nsamp * timeoffset
+        if len(trace.data) == 0:
+            return
+        sequence = self.sequence
+        buf, count = self._get_packets(
+            trace.data, starttime, samplerate, nsamp, timeoffset
+        )
+        self._send(buf)
+        # one sequence number per packet
+        self.sequence = sequence + count
 
     def _send(self, buf):
         """Send a block of data to the Edge/CWB combination.
@@ -233,7 +253,7 @@ class RawInputClient:
             self.socket.sendall(buf)
             self.sequence += 1
         except socket.error as v:
-            error = "Socket error %d" % v[0]
+            error = "Socket error %s" % v
             sys.stderr.write(error)
             raise TimeseriesFactoryException(error)
 
@@ -366,6 +386,80 @@ class RawInputClient:
 
         return buf
 
+    def _get_packets(self, samples, time, rate, nsamp, timeoffset):
+        """Encode samples as data packets, without a python loop per packet.
+
+        PARAMETERS
+        ----------
+        samples: array like
+            An int array with the samples
+        time: UTCDateTime
+            time of the first sample
+        rate: int
+            The data rate in Hertz
+        nsamp: int
+            maximum number of samples per packet
+        timeoffset: int
+            number of seconds between samples
+
+        RETURNS
+        -------
+        tuple: (buf, count)
+            buf: bytes
+                packets, each encoded the same as _get_data,
+                using sequence numbers starting at self.sequence
+            count: int
+                number of packets
+        """
+        if nsamp > MAXINPUTSIZE:
+            raise TimeseriesFactoryException(
+                "Edge input limited to 32767 integers per packet."
+            )
+        samples = numpy.asarray(samples, dtype=">i4")
+        totalsamps = len(samples)
+        count = -(-totalsamps // nsamp)
+        yr, doy, secs, usecs = self._get_time_values(time)
+        ratemantissa, ratedivisor = self._get_mantissa_divisor(rate)
+        # start of each packet, relative to the first day
+        packetsecs = secs + numpy.arange(count, dtype=numpy.int64) * (
+            nsamp * timeoffset
+        )
+        days = (
+            numpy.datetime64("%04d-01-01" % yr, "D") + (doy - 1) + packetsecs // 86400
+        )
+        years = days.astype("datetime64[Y]")
+        # full packets, and a shorter last packet when samples remain
+        full = totalsamps // nsamp
+        sizes = [(0, full, nsamp), (full, count, totalsamps - full * nsamp)]
+        buf = b""
+        for start, end, size in sizes:
+            if start == end:
+                continue
+            packets = numpy.zeros(
+                end - start, dtype=PACKETHEADER + [("data", ">i4", (size,))]
+            )
+            packets["head"] = PACKETHEAD
+            packets["nsamp"] = size
+            packets["seedname"] = self.seedname
+            packets["yr"] = years[start:end].astype(numpy.int64) + 1970
+            packets["doy"] = (days[start:end] - years[start:end]).astype(
+                numpy.int64
+            ) + 1
+            packets["ratemantissa"] = ratemantissa
+            packets["ratedivisor"] = ratedivisor
+            packets["activity"] = self.activity
+            packets["ioclock"] = self.ioclock
+            packets["quality"] = self.quality
+            packets["timingquality"] = self.timingquality
+            packets["secs"] = packetsecs[start:end] % 86400
+            packets["usecs"] = usecs
+            packets["seq"] = self.sequence + numpy.arange(start, end)
+            packets["data"] = samples[
+                start * nsamp : start * nsamp + (end - start) * size
+            ].reshape(end - start, size)
+            buf += packets.tobytes()
+        return buf, count
+
     def _get_mantissa_divisor(self, rate):
         """
         PARAMETERS
@@ -461,7 +555,7 @@ class RawInputClient:
                 done = True
             except socket.error as v:
                 sys.stderr.write("Could not connect to socket, trying again")
-                sys.stderr.write("sockect error %d" % v[0])
+                sys.stderr.write("sockect error %s" % v)
                 sleep(1)
             if trys > 2:
                 raise TimeseriesFactoryException("Could not open socket")
@@ -0,0 +1,462 @@
+"""Write-ahead spool for edge output factories."""
+from __future__ import absolute_import, print_function
+
+import collections
+import errno
+import glob
+import json
+import os
+import sys
+import threading
+
+import numpy
+import obspy.core
+from obspy.core import UTCDateTime
+
+from .. import TimeseriesUtility
+from ..TimeseriesFactory import TimeseriesFactory
+
+
+class SpoolFactory(TimeseriesFactory):
+    """Write timeseries to a local spool, then replay the spool to a factory.
+
+    Each put_timeseries call is written to the spool as a numbered segment,
+    then all pending segments are written to the wrapped factory in order.
+    When the wrapped factory fails, for example when Edge is unreachable,
+    segments stay in the spool until a later put_timeseries or flush.
+
+    Parameters
+    ----------
+    factory: geomagio.TimeseriesFactory
+        wrapped factory, usually EdgeFactory or MiniSeedFactory.
+    directory: str
+        directory for spool segments.
+    flush_interval: float
+        when set, seconds between attempts to flush the spool
+        from a background thread.
+
+    Notes
+    -----
+    Each segment is a numpy ".npz" file with data for each trace,
+    and a ".json" file with put_timeseries arguments and trace metadata.
+    The ".json" file is written last, so segments without one are ignored.
+    Segment numbers are reserved by exclusively creating the ".npz" file,
+    so processes that share a spool directory do not replace each others
+    segments.
+
+    Segment headers are read once, when the factory is created,
+    and kept in memory with segments written by this factory.
+    Segment data is only read when it is written or requested.
+
+    Pending segments whose data is completely replaced by a later segment
+    are removed without being written.
+
+    get_timeseries overlays pending data on data read from the wrapped
+    factory, so pending output is not recalculated.
+    """
+
+    def __init__(self, factory, directory, flush_interval=None):
+        TimeseriesFactory.__init__(
+            self,
+            observatory=factory.observatory,
+            channels=factory.channels,
+            type=factory.type,
+            interval=factory.interval,
+        )
+        self.factory = factory
+        self.directory = directory
+        self.flush_interval = flush_interval
+        # protects segment index, not held while writing to factory
+        self._lock = threading.RLock()
+        # only one flush writes to factory at a time
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        # pending segment headers, by path, in order
+        self._segments = collections.OrderedDict(
+            (path, self._read_header(path)) for path in self._get_segments()
+        )
+        # number of last segment reserved by this factory
+        self._number = int(os.path.basename(next(reversed(self._segments), "0")))
+        if flush_interval:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stop background flushing, and close the wrapped factory."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.factory.close()
+
+    def flush(self, blocking=True):
+        """Write pending segments to the wrapped factory, in order.
+
+        Stops at the first segment that cannot be written,
+        so later segments are never written before earlier segments.
+        Segments are removed after the wrapped factory is closed,
+        which waits for data that is sent in the background.
+
+        Segments spooled while flushing are written by the next flush.
+
+        Parameters
+        ----------
+        blocking: bool
+            when False, return immediately if another thread is flushing.
+
+        Returns
+        -------
+        int
+            number of segments written.
+
+        Raises
+        ------
+        Exception
+            when a segment cannot be written.
+        """
+        if not self._flush_lock.acquire(blocking):
+            return 0
+        try:
+            with self._lock:
+                segments = list(self._segments)
+            written = []
+            try:
+                for path in segments:
+                    try:
+                        header, timeseries = self._read_segment(path)
+                    except FileNotFoundError:
+                        # replaced, or written by another process
+                        with self._lock:
+                            self._segments.pop(path, None)
+                        continue
+                    self.factory.put_timeseries(
+                        timeseries=timeseries,
+                        starttime=UTCDateTime(header["starttime"]),
+                        endtime=UTCDateTime(header["endtime"]),
+                        observatory=header["observatory"],
+                        channels=header["channels"],
+                        type=header["type"],
+                        interval=header["interval"],
+                    )
+                    written.append(path)
+            finally:
+                # remove segments that were written, even if a later one failed
+                if written:
+                    self.factory.close()
+                    with self._lock:
+                        for path in written:
+                            self._remove_segment(path)
+            return len(written)
+        finally:
+            self._flush_lock.release()
+
+    def get_pending(self):
+        """Get the number of segments that have not been written.
+
+        Returns
+        -------
+        int
+            number of pending segments.
+        """
+        with self._lock:
+            return len(self._segments)
+
+    def get_timeseries(
+        self,
+        starttime,
+        endtime,
+        observatory=None,
+        channels=None,
+        type=None,
+        interval=None,
+    ):
+        """Get timeseries from the wrapped factory, with pending data.
+
+        See TimeseriesFactory.get_timeseries.
+        """
+        observatory = observatory or self.observatory
+        type = type or self.type
+        interval = interval or self.interval
+        timeseries = self.factory.get_timeseries(
+            starttime=starttime,
+            endtime=endtime,
+            observatory=observatory,
+            channels=channels,
+            type=type,
+            interval=interval,
+        )
+        with self._lock:
+            for path in self._get_overlapping(
+                observatory, type, interval, starttime, endtime
+            ):
+                try:
+                    header, spooled = self._read_segment(path)
+                except FileNotFoundError:
+                    # written by another process that shares the spool
+                    continue
+                for trace in timeseries:
+                    for spooled_trace in spooled.select(channel=trace.stats.channel):
+                        _overlay_trace(trace, spooled_trace)
+        return timeseries
+
+    def put_timeseries(
+        self,
+        timeseries,
+        starttime=None,
+        endtime=None,
+        observatory=None,
+        channels=None,
+        type=None,
+        interval=None,
+    ):
+        """Spool timeseries, then try to flush the spool.
+
+        Errors writing to the wrapped factory are reported on stderr,
+        and data stays in the spool.
+
+        See TimeseriesFactory.put_timeseries.
+        """
+        stats = timeseries[0].stats
+        if starttime is None or endtime is None:
+            starttime, endtime = TimeseriesUtility.get_stream_start_end_times(
+                timeseries
+            )
+        # resolve arguments now, so replay does not depend on defaults
+        header = {
+            "observatory": observatory or stats.station or self.observatory,
+            "channels": list(
+                channels
+                or self.channels
+                or [trace.stats.channel for trace in timeseries]
+            ),
+            "type": type or self.type or stats.data_type,
+            "interval": interval or self.interval or stats.data_interval,
+            "starttime": str(starttime),
+            "endtime": str(endtime),
+        }
+        # only spool data that will be written
+        timeseries = obspy.core.Stream(
+            [t for t in timeseries if t.stats.channel in header["channels"]]
+        ).slice(starttime, endtime)
+        with self._lock:
+            self._write_segment(header, timeseries)
+        try:
+            # another thread flushing writes this segment next time
+            self.flush(blocking=False)
+        except Exception as e:
+            print(
+                "Unable to flush spool, %d segments pending (%s)"
+                % (self.get_pending(), e),
+                file=sys.stderr,
+            )
+
+    def _compact(self, header, timeseries):
+        """Remove pending segments that are replaced by a new segment.
+
+        Parameters
+        ----------
+        header: dict
+            new segment header.
+        timeseries: obspy.core.Stream
+            new segment data.
+        """
+        for path in self._get_overlapping(
+            header["observatory"],
+            header["type"],
+            header["interval"],
+            UTCDateTime(header["starttime"]),
+            UTCDateTime(header["endtime"]),
+        ):
+            try:
+                pending_header, pending = self._read_segment(path)
+            except FileNotFoundError:
+                # written by another process that shares the spool
+                self._segments.pop(path, None)
+                continue
+            if _is_superseded(pending_header, pending, header, timeseries):
+                self._remove_segment(path)
+
+    def _get_overlapping(self, observatory, type, interval, starttime, endtime):
+        """Get paths of pending segments that overlap a time range, in order.
+
+        Returns
+        -------
+        list<str>
+            paths of segments with the same observatory, type and interval,
+            that include data between starttime and endtime.
+        """
+        return [
+            path
+            for path, header in self._segments.items()
+            if header["observatory"] == observatory
+            and header["type"] == type
+            and header["interval"] == interval
+            and UTCDateTime(header["starttime"]) <= endtime
+            and UTCDateTime(header["endtime"]) >= starttime
+        ]
+
+    def _get_segments(self):
+        """Get paths of complete segments in the spool directory, in order."""
+        return sorted(
+            path[: -len(".json")]
+            for path in glob.glob(os.path.join(self.directory, "*.json"))
+        )
+
+    def _read_header(self, path):
+        """Read a segment header.
+
+        Returns
+        -------
+        dict
+            segment header.
+        """
+        with open(path + ".json") as f:
+            return json.load(f)
+
+    def _read_segment(self, path):
+        """Read a segment.
+
+        Returns
+        -------
+        tuple
+            (header dict, obspy.core.Stream)
+        """
+        header = self._read_header(path)
+        timeseries = obspy.core.Stream()
+        with numpy.load(path + ".npz") as data:
+            for i, stats in enumerate(header["traces"]):
+                stats = dict(stats)
+                stats["starttime"] = UTCDateTime(stats["starttime"])
+                timeseries += obspy.core.Trace(data["trace%d" % i], stats)
+        return header, timeseries
+
+    def _remove_segment(self, path):
+        """Remove a segment, header first so partial removal is ignored."""
+        self._segments.pop(path, None)
+        for extension in [".json", ".npz"]:
+            try:
+                os.remove(path + extension)
+            except FileNotFoundError:
+                # removed by another process that shares the spool
+                pass
+
+    def _run(self):
+        """Flush spool until stopped."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # keep data in spool, and try again later
+                pass
+
+    def _reserve_segment(self):
+        """Create an empty ".npz" file, numbered after existing segments.
+
+        Returns
+        -------
+        tuple
+            (segment path, open ".npz" file)
+        """
+        while True:
+            self._number += 1
+            path = os.path.join(self.directory, "%012d" % self._number)
+            try:
+                fd = os.open(path + ".npz", os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+                return path, os.fdopen(fd, "wb")
+            except OSError as e:
+                # reserved by another process, or an interrupted write
+                if e.errno != errno.EEXIST:
+                    raise
+
+    def _write_segment(self, header, timeseries):
+        """Append a segment after existing segments.
+
+        Pending segments that are replaced by the new segment are removed.
+        """
+        header = dict(header)
+        header["traces"] = [
+            {
+                "network": trace.stats.network,
+                "station": trace.stats.station,
+                "location": trace.stats.location,
+                "channel": trace.stats.channel,
+                "starttime": str(trace.stats.starttime),
+                "delta": trace.stats.delta,
+            }
+            for trace in timeseries
+        ]
+        path, f = self._reserve_segment()
+        with f:
+            numpy.savez(
+                f,
+                **{
+                    "trace%d"
+                    % i: numpy.ma.filled(trace.data.astype(numpy.float64), numpy.nan)
+                    for i, trace in enumerate(timeseries)
+                }
+            )
+        with open(path + ".json.tmp", "w") as f:
+            json.dump(header, f)
+        os.replace(path + ".json.tmp", path + ".json")
+        self._compact(header, timeseries)
+        self._segments[path] = header
+
+
+def _is_superseded(header, timeseries, later_header, later_timeseries):
+    """Whether a later segment writes all data in a segment.
+
+    Parameters
+    ----------
+    header: dict
+        segment header.
+    timeseries: obspy.core.Stream
+        segment data.
+    later_header: dict
+        later segment header.
+    later_timeseries: obspy.core.Stream
+        later segment data.
+    """
+    for key in ["observatory", "type", "interval"]:
+        if header[key] != later_header[key]:
+            return False
+    for trace in timeseries:
+        covered = numpy.isnan(trace.data)
+        for later_trace in later_timeseries.select(channel=trace.stats.channel):
+            if later_trace.stats.delta != trace.stats.delta:
+                continue
+            covered = covered | ~numpy.isnan(_get_overlay(trace, later_trace))
+        if not covered.all():
+            return False
+    return True
+
+
+def _get_overlay(trace, other):
+    """Get values from another trace at the same times as trace.
+
+    Returns
+    -------
+    numpy.array
+        values from other, or numpy.nan where other has no sample.
+    """
+    values = numpy.full(len(trace.data), numpy.nan)
+    offset = int(
+        round((other.stats.starttime - trace.stats.starttime) / trace.stats.delta)
+    )
+    start = max(0, offset)
+    end = min(len(trace.data), offset + len(other.data))
+    if start < end:
+        values[start:end] = other.data[start - offset : end - offset]
+    return values
+
+
+def _overlay_trace(trace, other):
+    """Replace trace values with values from another trace, except gaps."""
+    if other.stats.delta != trace.stats.delta:
+        return
+    values = _get_overlay(trace, other)
+    replace = ~numpy.isnan(values)
+    if replace.any():
+        trace.data = numpy.where(replace, values, trace.data)
@@ -0,0 +1,97 @@
+"""Incremental reads of recent data for waveform clients."""
+from __future__ import absolute_import
+
+import obspy.core
+
+
+class TailBuffer(object):
+    """Keep recent waveforms in memory, and only request new samples.
+
+    For each network, station, location and channel, keeps the most
+    recently requested window and a high-water mark, the time of the last
+    sample received.  When a request starts within the buffer, only samples
+    after the high-water mark are requested from the client.
+
+    Most useful in a long running process, such as Controller --daemon,
+    that requests a sliding --realtime window.
+
+    Parameters
+    ----------
+    client: object
+        client with a get_waveforms method, usually
+        obspy.clients.earthworm.Client or obspy.clients.neic.Client.
+    overlap: float
+        seconds before the high-water mark to request again,
+        for servers that may receive samples out of order.
+
+    Notes
+    -----
+    Replace a factory client to add incremental reads:
+
+        factory = EdgeFactory()
+        factory.client = TailBuffer(factory.client)
+    """
+
+    def __init__(self, client, overlap=0):
+        self.client = client
+        self.overlap = overlap
+        # buffers by sncl, each a tuple (buffer start, stream, high-water mark)
+        self._buffers = {}
+
+    def get_waveforms(self, network, station, location, channel, starttime, endtime):
+        """Get waveforms, only requesting samples that are not buffered.
+
+        Parameters
+        ----------
+        network: str
+            network code.
+        station: str
+            station code.
+        location: str
+            location code.
+        channel: str
+            channel code.
+        starttime: obspy.core.UTCDateTime
+            time of first sample.
+        endtime: obspy.core.UTCDateTime
+            time of last sample.
+
+        Returns
+        -------
+        obspy.core.Stream
+            requested data, which may include gaps.
+        """
+        sncl = (network, station, location, channel)
+        buffer_start, stream, high_water = self._buffers.get(sncl, (None, None, None))
+        if buffer_start is None or high_water is None or starttime < buffer_start:
+            # nothing usable buffered, request entire window
+            buffer_start = starttime
+            stream = self._request(sncl, starttime, endtime)
+        elif endtime > high_water:
+            delta = stream[0].stats.delta
+            stream += self._request(
+                sncl, max(starttime, high_water + delta - self.overlap), endtime
+            )
+            stream.merge(method=1)
+        # the oldest data will not be requested again
+        if starttime > buffer_start:
+            buffer_start = starttime
+            stream.trim(starttime=buffer_start)
+        self._buffers[sncl] = (buffer_start, stream, self._get_high_water(stream))
+        return stream.slice(starttime, endtime).split().copy()
+
+    def _get_high_water(self, stream):
+        """Get time of last sample in a stream, or None if empty."""
+        if len(stream) == 0:
+            return None
+        return max(trace.stats.endtime for trace in stream)
+
+    def _request(self, sncl, starttime, endtime):
+        """Request waveforms from client."""
+        try:
+            stream = self.client.get_waveforms(*sncl, starttime, endtime)
+        except TypeError:
+            # earthworm client fails if no data is returned
+            stream = obspy.core.Stream()
+        stream.merge(method=1)
+        return stream
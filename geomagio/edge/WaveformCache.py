@@ -0,0 +1,329 @@
+"""Read-through disk cache for waveform clients."""
+from __future__ import absolute_import
+
+import json
+import os
+import threading
+
+import numpy
+import obspy.core
+from obspy.core import UTCDateTime
+
+
+class WaveformCache(object):
+    """Cache waveforms from a client on local disk.
+
+    Data are stored as one miniseed file per network, station, location,
+    channel and day, with a JSON file listing the time ranges that were
+    requested from the client.  Covered time ranges are read from disk,
+    and only uncovered time ranges are requested from the client.
+
+    Parameters
+    ----------
+    client: object
+        client with a get_waveforms method, usually
+        obspy.clients.earthworm.Client or obspy.clients.neic.Client.
+    directory: str
+        directory for cache files.
+    max_size: int
+        maximum size of cache files in bytes.
+        least recently used days are removed when exceeded.
+    settle_time: float
+        seconds before data is considered complete.
+        more recent data is always requested from the client,
+        and is not cached.
+
+    Notes
+    -----
+    Replace a factory client to add caching:
+
+        factory = EdgeFactory()
+        factory.client = WaveformCache(factory.client, "/tmp/edge-cache")
+    """
+
+    def __init__(self, client, directory, max_size=1024 ** 3, settle_time=600):
+        self.client = client
+        self.directory = directory
+        self.max_size = max_size
+        self.settle_time = settle_time
+        self._lock = threading.Lock()
+        # total size of cache files, None until first counted
+        self._size = None
+
+    def get_waveforms(self, network, station, location, channel, starttime, endtime):
+        """Get waveforms, using cached data when available.
+
+        Parameters
+        ----------
+        network: str
+            network code.
+        station: str
+            station code.
+        location: str
+            location code.
+        channel: str
+            channel code.
+        starttime: obspy.core.UTCDateTime
+            time of first sample.
+        endtime: obspy.core.UTCDateTime
+            time of last sample.
+
+        Returns
+        -------
+        obspy.core.Stream
+            requested data, which may include gaps.
+        """
+        sncl = (network, station, location, channel)
+        settled = UTCDateTime() - self.settle_time
+        with self._lock:
+            cached, covered = self._read(sncl, starttime, endtime)
+        fetched = obspy.core.Stream()
+        for start, end in get_uncovered(starttime, endtime, covered):
+            try:
+                data = self.client.get_waveforms(
+                    network, station, location, channel, start, end
+                )
+            except TypeError:
+                # earthworm client fails if no data is returned
+                data = obspy.core.Stream()
+            fetched += data
+            if start < settled:
+                with self._lock:
+                    self._write(sncl, data, start, min(end, settled))
+        if fetched:
+            with self._lock:
+                self._evict()
+        stream = merge_stream(cached + fetched)
+        stream.trim(starttime, endtime)
+        return stream.split()
+
+    def _get_days(self, starttime, endtime):
+        """Get days that overlap an interval.
+
+        Returns
+        -------
+        list<tuple>
+            (day start, day end) for each day.
+        """
+        day = UTCDateTime(starttime.year, starttime.month, starttime.day)
+        days = []
+        while day <= endtime:
+            days.append((day, day + 86400))
+            day += 86400
+        return days
+
+    def _get_path(self, sncl, day):
+        """Get path to miniseed file for a day.
+
+        The coverage file uses the same path with a ".json" extension.
+        """
+        return os.path.join(
+            self.directory, ".".join(sncl), day.strftime("%Y%m%d") + ".mseed"
+        )
+
+    def _read(self, sncl, starttime, endtime):
+        """Read cached data.
+
+        Returns
+        -------
+        tuple
+            (cached stream, list of covered (start, end) time ranges)
+        """
+        stream = obspy.core.Stream()
+        covered = []
+        for day, _ in self._get_days(starttime, endtime):
+            path = self._get_path(sncl, day)
+            day_covered = self._read_coverage(path)
+            if not day_covered:
+                continue
+            try:
+                # empty files are days without data
+                if os.path.getsize(path) > 0:
+                    stream += obspy.core.read(
+                        path, format="MSEED", starttime=starttime, endtime=endtime
+                    )
+            except Exception:
+                # missing or unreadable, request again
+                continue
+            covered.extend(day_covered)
+            # mark as recently used
+            os.utime(path)
+        return stream, merge_ranges(covered)
+
+    def _read_coverage(self, path):
+        """Read time ranges covered by a day file."""
+        try:
+            with open(path + ".json") as f:
+                return [
+                    (UTCDateTime(start), UTCDateTime(end))
+                    for start, end in json.load(f)
+                ]
+        except Exception:
+            return []
+
+    def _write(self, sncl, stream, starttime, endtime):
+        """Add data to the cache.
+
+        Parameters
+        ----------
+        sncl: tuple
+            network, station, location and channel codes.
+        stream: obspy.core.Stream
+            data returned by the client.
+        starttime: obspy.core.UTCDateTime
+            start of range requested from the client.
+        endtime: obspy.core.UTCDateTime
+            end of range now covered by the cache.
+        """
+        for day, next_day in self._get_days(starttime, endtime):
+            path = self._get_path(sncl, day)
+            day_start = max(starttime, day)
+            day_end = min(endtime, next_day)
+            day_stream = stream.slice(day_start, day_end)
+            covered = self._read_coverage(path)
+            if not covered or not os.path.exists(path):
+                covered = []
+            elif os.path.getsize(path) > 0:
+                day_stream += obspy.core.read(path, format="MSEED")
+            day_stream = merge_stream(day_stream).split()
+            for trace in day_stream:
+                if trace.data.dtype == numpy.int64:
+                    trace.data = trace.data.astype(numpy.int32)
+            covered = merge_ranges(covered + [(day_start, day_end)])
+            directory = os.path.dirname(path)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            # write to temporary files, so readers never see partial files
+            if len(day_stream) > 0:
+                day_stream.write(path + ".tmp", format="MSEED")
+            else:
+                # empty file, no data was available
+                open(path + ".tmp", "wb").close()
+            with open(path + ".json.tmp", "w") as f:
+                json.dump([(str(start), str(end)) for start, end in covered], f)
+            size = self._get_size(path + ".tmp", path + ".json.tmp")
+            replaced = self._get_size(path, path + ".json")
+            os.replace(path + ".tmp", path)
+            os.replace(path + ".json.tmp", path + ".json")
+            if self._size is not None:
+                self._size += size - replaced
+
+    def _evict(self):
+        """Remove least recently used day files until under max_size.
+
+        The cache directory is only listed when the total size is not known,
+        or is over max_size.
+        """
+        if self._size is not None and self._size <= self.max_size:
+            return
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".mseed"):
+                    continue
+                path = os.path.join(root, name)
+                size = self._get_size(path, path + ".json")
+                files.append((os.stat(path).st_mtime, path, size))
+                total += size
+        for _, path, size in sorted(files):
+            if total <= self.max_size:
+                break
+            for remove in [path + ".json", path]:
+                if os.path.exists(remove):
+                    os.remove(remove)
+            total -= size
+        self._size = total
+
+    def _get_size(self, *paths):
+        """Get total size of files, counting missing files as empty."""
+        size = 0
+        for path in paths:
+            try:
+                size += os.stat(path).st_size
+            except OSError:
+                pass
+        return size
+
+
+def get_uncovered(starttime, endtime, covered):
+    """Get parts of an interval that are not covered.
+
+    Parameters
+    ----------
+    starttime: obspy.core.UTCDateTime
+        start of interval.
+    endtime: obspy.core.UTCDateTime
+        end of interval.
+    covered: list<tuple>
+        sorted, non-overlapping (start, end) time ranges.
+
+    Returns
+    -------
+    list<tuple>
+        (start, end) time ranges within interval that are not covered.
+    """
+    if starttime == endtime:
+        for covered_start, covered_end in covered:
+            if covered_start <= starttime <= covered_end:
+                return []
+        return [(starttime, endtime)]
+    uncovered = []
+    start = starttime
+    for covered_start, covered_end in covered:
+        if covered_end < start:
+            continue
+        if covered_start > endtime:
+            break
+        if covered_start > start:
+            uncovered.append((start, covered_start))
+        start = max(start, covered_end)
+    if start < endtime:
+        uncovered.append((start, endtime))
+    return uncovered
+
+
+def merge_stream(stream):
+    """Merge traces, converting to a common data type first.
+
+    Cached data may use a different data type than the client returns.
+
+    Parameters
+    ----------
+    stream: obspy.core.Stream
+        stream to merge, modified in place.
+
+    Returns
+    -------
+    obspy.core.Stream
+        merged stream, with masked arrays where there are gaps.
+    """
+    dtypes = set(trace.data.dtype for trace in stream)
+    if len(dtypes) > 1:
+        dtype = numpy.result_type(*dtypes)
+        for trace in stream:
+            trace.data = trace.data.astype(dtype)
+    stream.merge(method=1)
+    return stream
+
+
+def merge_ranges(ranges):
+    """Merge overlapping and adjacent time ranges.
+
+    Parameters
+    ----------
+    ranges: list<tuple>
+        (start, end) time ranges.
+
+    Returns
+    -------
+    list<tuple>
+        sorted, non-overlapping (start, end) time ranges.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
@@ -5,6 +5,19 @@ from __future__ import absolute_import
 from .EdgeFactory import EdgeFactory
 from .LocationCode import LocationCode
 from .MiniSeedFactory import MiniSeedFactory
+from .MiniSeedInputClient import MiniSeedInputClient
 from .RawInputClient import RawInputClient
+from .SpoolFactory import SpoolFactory
+from .TailBuffer import TailBuffer
+from .WaveformCache import WaveformCache
 
-__all__ = ["EdgeFactory", "LocationCode", "MiniSeedFactory", "RawInputClient"]
+__all__ = [
+    "EdgeFactory",
+    "LocationCode",
+    "MiniSeedFactory",
+    "MiniSeedInputClient",
+    "RawInputClient",
+    "SpoolFactory",
+    "TailBuffer",
+    "WaveformCache",
+]
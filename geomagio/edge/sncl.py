@@ -5,6 +5,8 @@ Network
 Channel
 Location
 """
+from functools import lru_cache
+import itertools
 
 # components that map directly to channel suffixes
 CHANNEL_FROM_COMPONENT = {
@@ -20,7 +22,7 @@ CHANNEL_FROM_COMPONENT = {
     "K": "XK",
 }
 # reverse lookup of component from channel
-COMPONENT_FROM_CHANNEL = dict((v, k) for (k, v) in CHANNEL_FROM_COMPONENT.iteritems())
+COMPONENT_FROM_CHANNEL = dict((v, k) for (k, v) in CHANNEL_FROM_COMPONENT.items())
 
 
 class SNCLException(Exception):
@@ -84,6 +86,37 @@ def get_scnl(
     }
 
 
+def get_sncls(items, network="NT"):
+    """Generate SNCL codes for many sets of data attributes.
+
+    Parameters
+    ----------
+    items : array_like
+        tuples of (observatory, component, data_type, interval).
+    network : str
+        default 'NT'
+        network observatories are a part of.
+
+    Raises
+    ------
+    SNCLException : when unable to generate a SNCL
+
+    Returns
+    -------
+    list<dict> : one dictionary per item, see get_scnl.
+    """
+    return [
+        get_scnl(
+            observatory=observatory,
+            component=component,
+            data_type=data_type,
+            interval=interval,
+            network=network,
+        )
+        for observatory, component, data_type, interval in items
+    ]
+
+
 def parse_sncl(sncl):
     """Parse a SNCL code into data attributes.
 
@@ -122,6 +155,143 @@ def parse_sncl(sncl):
     }
 
 
+def parse_sncls(sncls):
+    """Parse many SNCL codes into data attributes.
+
+    Parameters
+    ----------
+    sncls : array_like
+        dictionaries with SNCL codes, see parse_sncl.
+
+    Raises
+    ------
+    SNCLException : when unable to parse a SNCL
+
+    Returns
+    -------
+    list<dict> : one dictionary per SNCL, see parse_sncl.
+    """
+    return [parse_sncl(sncl) for sncl in sncls]
+
+
+class SNCLTable(object):
+    """Memoized translation between data attributes and SNCL codes.
+
+    Translations are calculated once, then looked up.  Reverse lookups use
+    a table calculated from all combinations of known elements,
+    types and intervals.
+
+    Parameters
+    ----------
+    get_sncl : callable
+        function(observatory, element, type, interval) that returns
+        a tuple of (network, station, location, channel) codes.
+        the station code should be the observatory code.
+    elements : array_like
+        known elements, used for reverse lookups.
+    types : array_like
+        known data types, used for reverse lookups.
+    intervals : array_like
+        known intervals, used for reverse lookups.
+    """
+
+    def __init__(self, get_sncl, elements=(), types=(), intervals=()):
+        self._get_sncl = get_sncl
+        self.elements = elements
+        self.types = types
+        self.intervals = intervals
+        self._sncls = {}
+        self._attributes = None
+
+    def get_sncl(self, observatory, element, type, interval):
+        """Get SNCL codes for data attributes.
+
+        Returns
+        -------
+        tuple : (network, station, location, channel)
+        """
+        key = (observatory, element, type, interval)
+        sncl = self._sncls.get(key)
+        if sncl is None:
+            sncl = self._get_sncl(*key)
+            self._sncls[key] = sncl
+        return sncl
+
+    def get_sncls(self, items):
+        """Get SNCL codes for many sets of data attributes.
+
+        Parameters
+        ----------
+        items : array_like
+            tuples of (observatory, element, type, interval).
+
+        Returns
+        -------
+        list<tuple> : (network, station, location, channel) for each item.
+        """
+        return [self.get_sncl(*item) for item in items]
+
+    def parse_sncl(self, network, station, location, channel):
+        """Get data attributes for SNCL codes.
+
+        Raises
+        ------
+        SNCLException : when SNCL does not match a known element, type and
+            interval.
+
+        Returns
+        -------
+        tuple : (observatory, element, type, interval)
+        """
+        if self._attributes is None:
+            self._attributes = self._get_attributes()
+        try:
+            return (station,) + self._attributes[(network, location, channel)]
+        except KeyError:
+            raise SNCLException(
+                "Unexpected SNCL {}".format(
+                    ".".join([station, network, channel, location])
+                )
+            )
+
+    def parse_sncls(self, sncls):
+        """Get data attributes for many SNCL codes.
+
+        Parameters
+        ----------
+        sncls : array_like
+            tuples of (network, station, location, channel).
+
+        Returns
+        -------
+        list<tuple> : (observatory, element, type, interval) for each SNCL.
+        """
+        return [self.parse_sncl(*sncl) for sncl in sncls]
+
+    def _get_attributes(self):
+        """Calculate reverse lookup table.
+
+        When more than one set of attributes use the same SNCL,
+        the first known element, type and interval are used.
+        """
+        attributes = {}
+        for element, type, interval in itertools.product(
+            self.elements, self.types, self.intervals
+        ):
+            try:
+                network, _, location, channel = self.get_sncl(
+                    "", element, type, interval
+                )
+            except Exception:
+                # not a valid combination
+                continue
+            attributes.setdefault(
+                (network, location, channel), (element, type, interval)
+            )
+        return attributes
+
+
+@lru_cache(maxsize=None)
 def __get_channel(component, interval):
     channel_start = __get_channel_start(interval)
     # check for direct component mappings
@@ -154,17 +324,21 @@ def __get_channel_end(component):
     channel_end = component_parts[0]
     if len(component_parts) > 1:
         component_suffix = component_parts[1]
-        if component_suffix == "-Bin":
+        if component_suffix == "Bin":
             channel_middle = "Y"
-        elif component_suffix == "-Temp":
+        elif component_suffix == "Temp":
             channel_middle = "K"
-        elif component_suffix == "-Volt":
+        elif component_suffix == "Volt":
             channel_middle = "E"
+        elif component_suffix in ("Dist", "Sat", "SQ", "SV"):
+            # suffixes that modify location, see __get_location_end
+            pass
         else:
             raise SNCLException("Unexpected component {}".format(component))
     return channel_middle + channel_end
 
 
+@lru_cache(maxsize=None)
 def __get_location(component, data_type):
     location_start = __get_location_start(data_type)
     location_end = __get_location_end(component)
@@ -195,6 +369,7 @@ def __get_location_end(component):
     return "0"
 
 
+@lru_cache(maxsize=None)
 def __parse_component(channel, location):
     channel_end = channel[1:]
     if channel_end in COMPONENT_FROM_CHANNEL:
@@ -4,6 +4,8 @@
 import numpy
 from datetime import datetime
 
+from .. import FixedWidth
+
 # values that represent missing data points in IAGA2002
 EIGHTS = numpy.float64("88888")
 NINES = numpy.float64("99999")
@@ -11,6 +13,11 @@ NINES = numpy.float64("99999")
 # placeholder channel name used when less than 4 channels are being written.
 EMPTY_CHANNEL = "NUL"
 
+# data line columns, as (start, end)
+TIME_COLUMNS = (0, 23)
+TIME_SEPARATORS = {4: "-", 7: "-", 10: " ", 13: ":", 16: ":", 19: "."}
+VALUE_COLUMNS = [(31, 40), (41, 50), (51, 60), (61, 70)]
+
 
 class IAGA2002Parser(object):
     """IAGA2002 parser.
@@ -26,8 +33,8 @@ class IAGA2002Parser(object):
         parsed comments.
     channels : array
         parsed channel names.
-    times : array
-        parsed timeseries times.
+    times : numpy.array
+        parsed timeseries times, as ``numpy.datetime64`` in milliseconds.
     data : dict
         keys are channel names (order listed in ``self.channels``).
         values are ``numpy.array`` of timeseries values, array values are
@@ -43,7 +50,7 @@ class IAGA2002Parser(object):
         self.comments = []
         # array of channel names
         self.channels = []
-        # timestamps of data (datetime.datetime)
+        # timestamps of data (numpy.datetime64)
         self.times = []
         # dictionary of data (channel : numpy.array<float64>)
         self.data = {}
@@ -61,20 +68,27 @@ class IAGA2002Parser(object):
         # create parsing time and data arrays
         self._parsedata = ([], [], [], [], [])
 
-        parsing_headers = True
-        lines = data.splitlines()
-        for line in lines:
-            if parsing_headers:
-                if line.startswith(" ") and line.endswith("|"):
-                    # still in headers
-                    if line.startswith(" #"):
-                        self._parse_comment(line)
-                    else:
-                        self._parse_header(line)
+        # parse headers one line at a time
+        position = 0
+        while position < len(data):
+            end = data.find("\n", position)
+            if end == -1:
+                end = len(data)
+            line = data[position:end].rstrip("\r")
+            position = end + 1
+            if line.startswith(" ") and line.endswith("|"):
+                # still in headers
+                if line.startswith(" #"):
+                    self._parse_comment(line)
                 else:
-                    parsing_headers = False
-                    self._parse_channels(line)
+                    self._parse_header(line)
             else:
+                self._parse_channels(line)
+                break
+        # then data all at once
+        data = data[position:]
+        if not self._parse_data_block(data):
+            for line in data.splitlines():
                 self._parse_data(line)
         self._post_process()
 
@@ -138,6 +152,48 @@ class IAGA2002Parser(object):
         self.channels.append(line[50:60].strip().replace(iaga_code, ""))
         self.channels.append(line[60:69].strip().replace(iaga_code, ""))
 
+    def _parse_data_block(self, data):
+        """Parse all data lines at once, as fixed width columns.
+
+        Lines are decoded into a 2d array of bytes, and each column is
+        converted as a whole array.
+
+        Parameters
+        ----------
+        data : str
+            data lines.
+
+        Returns
+        -------
+        bool
+            whether lines were parsed, False when lines are not uniformly
+            formatted and should be parsed one at a time.
+        """
+        columns = FixedWidth.get_lines(data, VALUE_COLUMNS[-1][1])
+        if columns is None:
+            return False
+        for index, separator in TIME_SEPARATORS.items():
+            if not (columns[:, index] == ord(separator)).all():
+                return False
+        start, end = TIME_COLUMNS
+        try:
+            times = (
+                numpy.ascontiguousarray(columns[:, start:end])
+                .view("S%d" % (end - start))
+                .ravel()
+                .astype("datetime64[ms]")
+            )
+        except ValueError:
+            return False
+        # parse all value columns at once
+        values = FixedWidth.parse_decimals(
+            numpy.concatenate([columns[:, start:end] for start, end in VALUE_COLUMNS])
+        )
+        if values is None:
+            return False
+        self._parsedata = tuple([times] + numpy.split(values, len(VALUE_COLUMNS)))
+        return True
+
     def _parse_data(self, line):
         """Parse one data point in the timeseries.
 
@@ -174,7 +230,7 @@ class IAGA2002Parser(object):
         """
         self.comments = self._merge_comments(self.comments)
         self.parse_comments()
-        self.times = self._parsedata[0]
+        self.times = numpy.array(self._parsedata[0], dtype="datetime64[ms]")
         for channel, data in zip(self.channels, self._parsedata[1:]):
             # ignore "empty" channels
             if channel == EMPTY_CHANNEL:
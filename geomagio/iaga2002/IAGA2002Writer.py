@@ -6,11 +6,14 @@ from datetime import datetime
 import numpy
 from os import linesep
 import textwrap
-from .. import ChannelConverter, TimeseriesUtility
+from .. import ChannelConverter, FixedWidth, TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..Util import create_empty_trace
 from . import IAGA2002Parser
 
+# number of data lines formatted and written at a time
+CHUNK_SIZE = 10000
+
 
 class IAGA2002Writer(object):
     """IAGA2002 writer."""
@@ -47,7 +50,7 @@ class IAGA2002Writer(object):
         out.write(self._format_headers(stats, channels).encode("utf8"))
         out.write(self._format_comments(stats).encode("utf8"))
         out.write(self._format_channels(channels, stats.station).encode("utf8"))
-        out.write(self._format_data(timeseries, channels).encode("utf8"))
+        self._write_data(out, timeseries, channels)
 
     def _format_headers(self, stats, channels):
         """format headers for IAGA2002 file
@@ -225,21 +228,90 @@ class IAGA2002Writer(object):
         channels : sequence
             list and order of channel values to output.
         """
-        buf = []
+        out = BytesIO()
+        self._write_data(out, timeseries, channels)
+        return out.getvalue().decode("utf8")
+
+    def _write_data(self, out, timeseries, channels):
+        """Write all data lines, CHUNK_SIZE lines at a time.
+
+        Parameters
+        ----------
+        out : file object
+            file object to be written to.
+        timeseries : obspy.core.Stream
+            stream containing traces with channel listed in channels
+        channels : sequence
+            list and order of channel values to output.
+        """
         if timeseries.select(channel="D"):
             d = timeseries.select(channel="D")
             d[0].data = ChannelConverter.get_minutes_from_radians(d[0].data)
         traces = [timeseries.select(channel=c)[0] for c in channels]
+        length = len(traces[0].data)
+        for start in range(0, length, CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, length)
+            out.write(self._format_lines(traces, start, end))
+
+    def _format_lines(self, traces, start, end):
+        """Format data lines, formatting each column at once.
+
+        Parameters
+        ----------
+        traces : sequence
+            traces to output, in order.
+        start : int
+            index of first line.
+        end : int
+            index after last line.
+
+        Returns
+        -------
+        bytes
+            formatted lines.
+        """
         starttime = float(traces[0].stats.starttime)
         delta = traces[0].stats.delta
-        for i in range(len(traces[0].data)):
-            buf.append(
+        columns = []
+        for trace in traces:
+            values = numpy.array(trace.data[start:end], dtype=numpy.float64)
+            values[numpy.isnan(values)] = self.empty_value
+            columns += [" ", FixedWidth.format_decimals(values, 9, 2)]
+        if any(column is None for column in columns):
+            # values that do not fit, format one line at a time
+            return "".join(
                 self._format_values(
                     datetime.utcfromtimestamp(starttime + i * delta),
                     (t.data[i] for t in traces),
                 )
-            )
-        return "".join(buf)
+                for i in range(start, end)
+            ).encode("utf8")
+        fields = FixedWidth.get_time_fields(
+            FixedWidth.get_sample_times(starttime, delta, start, end)
+        )
+        return FixedWidth.join_columns(
+            end - start,
+            [
+                FixedWidth.format_digits(fields["year"], 4),
+                "-",
+                FixedWidth.format_digits(fields["month"], 2),
+                "-",
+                FixedWidth.format_digits(fields["day"], 2),
+                " ",
+                FixedWidth.format_digits(fields["hour"], 2),
+                ":",
+                FixedWidth.format_digits(fields["minute"], 2),
+                ":",
+                FixedWidth.format_digits(fields["second"], 2),
+                ".",
+                FixedWidth.format_digits(fields["microsecond"] // 1000, 3),
+                " ",
+                FixedWidth.format_digits(fields["day_of_year"], 3),
+                "   ",
+            ]
+            + columns
+            + [linesep],
+        )
 
     def _format_values(self, time, values):
         """Format one line of data values.
@@ -5,9 +5,14 @@ from io import BytesIO
 from datetime import datetime
 import json
 import numpy as np
-from .. import ChannelConverter, TimeseriesUtility
+from .. import ChannelConverter, FixedWidth, TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 
+# number of samples formatted and written at a time
+CHUNK_SIZE = 10000
+# compact separators, matching json.dumps output of the whole document
+SEPARATORS = (",", ":")
+
 
 class IMFJSONWriter(object):
     """JSON writer."""
@@ -31,23 +36,78 @@ class IMFJSONWriter(object):
         TimeseriesFactoryException
             if there is a missing channel.
         """
-        file_dict = OrderedDict()
+        for chunk in self.iter_chunks(timeseries, channels, url=url):
+            out.write(chunk)
+
+    def iter_chunks(self, timeseries, channels, url=None):
+        """Get json document as chunks of bytes.
+
+        Header and metadata are formatted once, then times and values
+        are formatted CHUNK_SIZE samples at a time, so a document can be
+        streamed without being built in memory.
+
+        Parameters
+        ----------
+        timeseries: obspy.core.stream
+            timeseries object with data to be written
+        channels: array_like
+            channels to be written from timeseries object
+        url: str
+            string with the requested url
+
+        Returns
+        -------
+        generator
+            bytes that together are the json document.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if there is a missing channel.
+        """
         for channel in channels:
             if timeseries.select(channel=channel).count() == 0:
                 raise TimeseriesFactoryException(
                     'Missing channel "%s" for output, available channels %s'
                     % (channel, str(TimeseriesUtility.get_channels(timeseries)))
                 )
+        return self._iter_chunks(timeseries, channels, url)
+
+    def _iter_chunks(self, timeseries, channels, url):
+        """Generate chunks for iter_chunks."""
         stats = timeseries[0].stats
+        file_dict = OrderedDict()
         file_dict["type"] = "Timeseries"
         file_dict["metadata"] = self._format_metadata(stats, channels)
         file_dict["metadata"]["url"] = url
-        file_dict["times"] = self._format_times(timeseries, channels)
-        file_dict["values"] = self._format_data(timeseries, channels, stats)
-        formatted_timeseries = json.dumps(
-            file_dict, ensure_ascii=True, separators=(",", ":")
-        ).encode("utf8")
-        out.write(formatted_timeseries)
+        # open objects by removing closing brace
+        yield self._dumps(file_dict)[:-1] + b',"times":['
+        traces = [timeseries.select(channel=c)[0] for c in channels]
+        starttime = float(traces[0].stats.starttime)
+        delta = traces[0].stats.delta
+        length = len(traces[0].data)
+        for start in range(0, length, CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, length)
+            chunk = self._format_time_strings(starttime, delta, start, end)
+            yield chunk if start == 0 else b"," + chunk
+        yield b'],"values":['
+        for i, (channel, trace) in enumerate(zip(channels, traces)):
+            value_dict = self._format_value_metadata(channel, trace, stats)
+            header = self._dumps(value_dict)[:-1] + b',"values":['
+            yield header if i == 0 else b"," + header
+            length = len(trace.data)
+            for start in range(0, length, CHUNK_SIZE):
+                end = min(start + CHUNK_SIZE, length)
+                chunk = self._format_value_strings(
+                    self._get_values(channel, trace, start, end)
+                )
+                yield chunk if start == 0 else b"," + chunk
+            yield b"]}"
+        yield b"]}"
+
+    def _dumps(self, obj):
+        """Encode an object as compact json bytes."""
+        return json.dumps(obj, ensure_ascii=True, separators=SEPARATORS).encode("utf8")
 
     def _format_data(self, timeseries, channels, stats):
         """Format all data lines.
@@ -68,37 +128,104 @@ class IMFJSONWriter(object):
         """
         values = []
         for c in channels:
-            value_dict = OrderedDict()
             trace = timeseries.select(channel=c)[0]
-            value_dict["id"] = c
-            value_dict["metadata"] = OrderedDict()
-            metadata = value_dict["metadata"]
-            metadata["element"] = c
-            metadata["network"] = stats.network
-            metadata["station"] = stats.station
-            edge_channel = trace.stats.channel
-            metadata["channel"] = edge_channel
-            if stats.location == "":
-                if stats.data_type == "variation" or stats.data_type == "reported":
-                    stats.location = "R0"
-                elif stats.data_type == "adjusted" or stats.data_type == "provisional":
-                    stats.location = "A0"
-                elif stats.data_type == "quasi-definitive":
-                    stats.location = "Q0"
-                elif stats.data_type == "definitive":
-                    stats.location = "D0"
-            metadata["location"] = stats.location
+            value_dict = self._format_value_metadata(c, trace, stats)
+            series = self._get_values(c, trace, 0, len(trace.data))
+            # None for gaps, which json serializes as null
+            serialized = series.astype(object)
+            serialized[np.isnan(series)] = None
+            value_dict["values"] = serialized.tolist()
             values += [value_dict]
-            series = np.copy(trace.data)
-            if c == "D":
-                series = ChannelConverter.get_minutes_from_radians(series)
-            # Converting numpy array to list required for JSON serialization
-            series = series.tolist()
-            series = [None if str(x) == "nan" else x for x in series]
-            value_dict["values"] = series
-            # TODO: Add flag metadata
         return values
 
+    def _format_value_metadata(self, channel, trace, stats):
+        """Format id and metadata for one channel of values.
+
+        Parameters
+        ----------
+        channel : str
+            channel being output.
+        trace : obspy.core.Trace
+            trace with values for channel.
+        stats: obspy.core.trace.stats
+            holds the observatory metadata
+
+        Returns
+        -------
+        OrderedDict
+            a dictionary with "id" and "metadata" keys.
+        """
+        value_dict = OrderedDict()
+        value_dict["id"] = channel
+        value_dict["metadata"] = OrderedDict()
+        metadata = value_dict["metadata"]
+        metadata["element"] = channel
+        metadata["network"] = stats.network
+        metadata["station"] = stats.station
+        edge_channel = trace.stats.channel
+        metadata["channel"] = edge_channel
+        if stats.location == "":
+            if stats.data_type == "variation" or stats.data_type == "reported":
+                stats.location = "R0"
+            elif stats.data_type == "adjusted" or stats.data_type == "provisional":
+                stats.location = "A0"
+            elif stats.data_type == "quasi-definitive":
+                stats.location = "Q0"
+            elif stats.data_type == "definitive":
+                stats.location = "D0"
+        metadata["location"] = stats.location
+        # TODO: Add flag metadata
+        return value_dict
+
+    def _get_values(self, channel, trace, start, end):
+        """Get values to output for one channel.
+
+        Parameters
+        ----------
+        channel : str
+            channel being output, "D" is converted from radians to minutes.
+        trace : obspy.core.Trace
+            trace with values for channel.
+        start : int
+            index of first value.
+        end : int
+            index after last value.
+
+        Returns
+        -------
+        numpy.array
+            values, with numpy.nan for gaps.
+        """
+        series = trace.data[start:end]
+        if isinstance(series, np.ma.MaskedArray):
+            series = np.ma.filled(series.astype(np.float64), np.nan)
+        if channel == "D":
+            series = ChannelConverter.get_minutes_from_radians(series)
+        return series
+
+    def _format_value_strings(self, values):
+        """Format values as comma separated json numbers.
+
+        Parameters
+        ----------
+        values : numpy.array
+            values to format, numpy.nan for gaps.
+
+        Returns
+        -------
+        bytes
+            formatted values, with null for gaps.
+
+        Notes
+        -----
+        Values are formatted using repr, like json.dumps.
+        Gaps are replaced in the formatted text, instead of per value.
+        """
+        formatted = ",".join(map(repr, values.tolist()))
+        if values.dtype.kind == "f":
+            formatted = formatted.replace("nan", "null").replace("inf", "Infinity")
+        return formatted.encode("ascii")
+
     def _format_metadata(self, stats, channels):
         """Format metadata for json file and update dictionary
 
@@ -184,6 +311,49 @@ class IMFJSONWriter(object):
             )
         return times
 
+    def _format_time_strings(self, starttime, delta, start, end):
+        """Format times as comma separated json strings.
+
+        Parameters
+        ----------
+        starttime : float
+            epoch time of first sample.
+        delta : float
+            seconds between samples.
+        start : int
+            index of first time.
+        end : int
+            index after last time.
+
+        Returns
+        -------
+        bytes
+            formatted times, each formatted like _format_time_string.
+        """
+        fields = FixedWidth.get_time_fields(
+            FixedWidth.get_sample_times(starttime, delta, start, end)
+        )
+        return FixedWidth.join_columns(
+            end - start,
+            [
+                '"',
+                FixedWidth.format_digits(fields["year"], 4),
+                "-",
+                FixedWidth.format_digits(fields["month"], 2),
+                "-",
+                FixedWidth.format_digits(fields["day"], 2),
+                "T",
+                FixedWidth.format_digits(fields["hour"], 2),
+                ":",
+                FixedWidth.format_digits(fields["minute"], 2),
+                ":",
+                FixedWidth.format_digits(fields["second"], 2),
+                ".",
+                FixedWidth.format_digits(fields["microsecond"] // 1000, 3),
+                'Z",',
+            ],
+        )[:-1]
+
     def _format_time_string(self, time):
         """Format one datetime object.
 
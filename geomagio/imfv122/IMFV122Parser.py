@@ -21,8 +21,8 @@ class IMFV122Parser(object):
         parsed IMFV122 metadata.
     channels : array
         parsed channel names.
-    times : array
-        parsed timeseries times.
+    times : numpy.array
+        parsed timeseries times, as epoch seconds.
     data : dict
         keys are channel names (order listed in ``self.channels``).
         values are ``numpy.array`` of timeseries values, array values are
@@ -35,11 +35,11 @@ class IMFV122Parser(object):
         self.metadata = {"network": "NT", "station": observatory}
         # array of channel names
         self.channels = []
-        # timestamps of data (datetime.datetime)
+        # timestamps of data (epoch seconds)
         self.times = []
         # dictionary of data (channel : numpy.array<float64>)
         self.data = {}
-        # temporary storage for data being parsed
+        # temporary storage for data being parsed, one array per data block
         self._parsedata = ([], [], [], [], [])
 
     def parse(self, data):
@@ -52,11 +52,13 @@ class IMFV122Parser(object):
         """
         station = data[0:3]
         lines = data.splitlines()
-        for line in lines:
-            if line.startswith(station):
-                self._parse_header(line)
-            else:
-                self._parse_data(line)
+        headers = [i for i, line in enumerate(lines) if line.startswith(station)]
+        # data lines between headers are parsed as one block
+        for start, end in zip([-1] + headers, headers + [len(lines)]):
+            if start >= 0:
+                self._parse_header(lines[start])
+            if start + 1 < end:
+                self._parse_data_block(lines[start + 1 : end])
         self._post_process()
 
     def _parse_header(self, line):
@@ -103,35 +105,46 @@ class IMFV122Parser(object):
         self._nexttime = UTCDateTime(year=year, julday=julday, hour=hour, minute=minute)
 
     def _parse_data(self, line):
-        """Parse one data point in the timeseries.
+        """Parse one data line in the timeseries.
+
+        See _parse_data_block.
+        """
+        self._parse_data_block([line])
+
+    def _parse_data_block(self, lines):
+        """Parse data lines that follow one header.
+
+        Each line has two samples of four channel values.
+        Adds an array of times, and an array of values for each channel,
+        to ``self._parsedata``.
 
-        Adds time to ``self.times``.
-        Adds channel values to ``self.data``.
+        Raises
+        ------
+        ValueError
+            if lines do not have eight values each.
         """
-        (d11, d21, d31, d41, d12, d22, d32, d42) = line.split()
+        values = [line.split() for line in lines]
+        if any(len(line_values) != 8 for line_values in values):
+            raise ValueError("Expected 8 values per data line")
+        values = numpy.array(values, dtype=numpy.float64).reshape(-1, 4)
+        count = len(values)
         t, d1, d2, d3, d4 = self._parsedata
-        t.append(self._nexttime)
-        d1.append(d11)
-        d2.append(d21)
-        d3.append(d31)
-        d4.append(d41)
-        self._nexttime = self._nexttime + self._delta
-        t.append(self._nexttime)
-        d1.append(d12)
-        d2.append(d22)
-        d3.append(d32)
-        d4.append(d42)
-        self._nexttime = self._nexttime + self._delta
+        t.append(self._nexttime.timestamp + numpy.arange(count) * self._delta)
+        d1.append(values[:, 0])
+        d2.append(values[:, 1])
+        d3.append(values[:, 2])
+        d4.append(values[:, 3])
+        self._nexttime = self._nexttime + count * self._delta
 
     def _post_process(self):
         """Post processing after data is parsed.
 
-        Converts data to numpy arrays.
+        Joins data blocks.
         Replaces empty values with ``numpy.nan``.
         """
-        self.times = self._parsedata[0]
+        self.times = numpy.concatenate(self._parsedata[0])
         for channel, data in zip(self.channels, self._parsedata[1:]):
-            data = numpy.array(data, dtype=numpy.float64)
+            data = numpy.concatenate(data)
             data[data == EIGHTS] = numpy.nan
             data[data == NINES] = numpy.nan
             if channel == "D":
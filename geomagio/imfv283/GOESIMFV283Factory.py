@@ -2,10 +2,13 @@
 from __future__ import absolute_import, print_function, unicode_literals
 
 from .IMFV283Factory import IMFV283Factory
+from .GOESMessageCache import GOESMessageCache
 import subprocess
 import sys
+import threading
 from obspy.core import Stream
 import os
+from .. import Util
 
 
 class GOESIMFV283Factory(IMFV283Factory):
@@ -21,10 +24,22 @@ class GOESIMFV283Factory(IMFV283Factory):
     getdcpmessages: String
         The path and filename to be executed. ie ./opendcs/bin/getDcpMessages
     server: string array
-        An array of server names to retrive data from. Currently only using
-        first server.
+        An array of server names to retrive data from. Later servers are
+        only used when earlier servers cannot be reached.
     user: String
         The goes user.
+    cache_directory: String
+        When set, messages are cached in this directory, and only
+        transmission time ranges that have not been retrieved are
+        requested from the server.
+    cache_settle: float
+        Seconds before a transmission time range is considered complete,
+        more recent ranges are requested again.
+    concurrency: int
+        Number of observatories to retrieve at the same time.
+    server_concurrency: int
+        Maximum number of getdcpmessages processes per server
+        at the same time.
 
     Notes
     -----
@@ -36,6 +51,13 @@ class GOESIMFV283Factory(IMFV283Factory):
     which can easily be 20 minutes off the time of the data. To compensate we
     ask for 30 minutes before and after the range requested.
 
+    get_timeseries accepts a list of observatories, which are retrieved
+    in parallel.  When caching, a request for one of the configured
+    observatories also retrieves the other configured observatories that
+    have settled ranges missing from the cache, so later requests for the
+    others are read from the cache.  Ranges within the settle time are only
+    retrieved for requested observatories.
+
     See Also
     --------
     IMFV283Factory
@@ -49,6 +71,10 @@ class GOESIMFV283Factory(IMFV283Factory):
         password=None,
         server=None,
         user=None,
+        cache_directory=None,
+        cache_settle=600,
+        concurrency=1,
+        server_concurrency=1,
         **kwargs
     ):
         IMFV283Factory.__init__(self, None, **kwargs)
@@ -58,6 +84,13 @@ class GOESIMFV283Factory(IMFV283Factory):
         self.user = user
         self.password = password
         self.javaerror = b"FATAL"
+        self.cache = cache_directory and GOESMessageCache(
+            cache_directory, settle_time=cache_settle
+        )
+        self.concurrency = concurrency
+        self.server_concurrency = server_concurrency
+        self._server_semaphores = {}
+        self._server_lock = threading.Lock()
 
     def get_timeseries(
         self,
@@ -75,27 +108,82 @@ class GOESIMFV283Factory(IMFV283Factory):
         """
         observatory = observatory or self.observatory
         channels = channels or self.channels
-        self.criteria_file_name = observatory + ".sc"
+        if isinstance(observatory, str):
+            observatories = [observatory]
+        else:
+            observatories = list(observatory)
+        retrieve = observatories
+        if self.cache and isinstance(self.observatory, (list, tuple)):
+            if set(observatories) <= set(self.observatory):
+                start, end = self._get_transmission_range(starttime, endtime)
+                retrieve = observatories + [
+                    obs
+                    for obs in self.observatory
+                    if obs not in observatories
+                    and self.cache.get_uncovered(obs, start, end, settled=True)
+                ]
+        outputs = Util.map_concurrent(
+            lambda obs: self._retrieve_goes_messages(starttime, endtime, obs),
+            retrieve,
+            self.concurrency,
+        )
         timeseries = Stream()
-        output = self._retrieve_goes_messages(starttime, endtime, observatory)
-        timeseries += self.parse_string(output)
+        timeseries += self.parse_string(
+            b"\n".join(
+                output for obs, output in zip(retrieve, outputs) if obs in observatories
+            )
+        )
         # merge channel traces for multiple days
         timeseries.merge()
         # trim to requested start/end time
         timeseries.trim(starttime, endtime)
+        timeseries = Stream(
+            [trace for trace in timeseries if trace.stats.station in observatories]
+        )
         # output the number of points we read for logging
-        if len(timeseries):
-            print(
-                "Read %s points from %s" % (timeseries[0].stats.npts, observatory),
-                file=sys.stderr,
-            )
+        for obs in observatories:
+            obs_timeseries = timeseries.select(station=obs)
+            if len(obs_timeseries):
+                print(
+                    "Read %s points from %s" % (obs_timeseries[0].stats.npts, obs),
+                    file=sys.stderr,
+                )
 
         self._post_process(timeseries)
-        if observatory is not None:
-            timeseries = timeseries.select(station=observatory)
-
         return timeseries
 
+    def get_timeseries_observatories(
+        self,
+        starttime,
+        endtime,
+        observatories,
+        channels=None,
+        type=None,
+        interval=None,
+    ):
+        """Get timeseries for several observatories, in parallel.
+
+        See get_timeseries.
+        """
+        return self.get_timeseries(
+            starttime=starttime,
+            endtime=endtime,
+            observatory=list(observatories),
+            channels=channels,
+            type=type,
+            interval=interval,
+        )
+
+    def _get_transmission_range(self, starttime, endtime):
+        """Get range of transmission times that may include data.
+
+        Returns
+        -------
+        tuple
+            (start, end) transmission times.
+        """
+        return starttime - 2200, endtime + 1800
+
     def _post_process(self, timeseries):
         """And metadata to the timeseries traces.
 
@@ -122,6 +210,45 @@ class GOESIMFV283Factory(IMFV283Factory):
         observatory: str
             observatory code.
 
+        Notes
+        -----
+        When caching, only transmission time ranges that have not been
+        retrieved are requested from the server.
+
+        Returns
+        -------
+        bytes
+            Messages from getDcpMessages, one per line.
+        """
+        start, end = self._get_transmission_range(starttime, endtime)
+        if not self.cache:
+            return b"\n".join(self._get_messages(start, end, observatory) or [])
+        for uncovered_start, uncovered_end in self.cache.get_uncovered(
+            observatory, start, end
+        ):
+            messages = self._get_messages(uncovered_start, uncovered_end, observatory)
+            if messages is None:
+                # no server was reached, retrieve again next time
+                continue
+            self.cache.put_messages(
+                observatory, messages, uncovered_start, uncovered_end
+            )
+        return b"\n".join(self.cache.get_messages(observatory, start, end))
+
+    def _get_messages(self, start, end, observatory):
+        """Run getdcpmessages, and read messages as they are output.
+
+        Servers are tried in order, until one can be reached.
+
+        Parameters
+        ----------
+        start: obspy.core.UTCDateTime
+            earliest time messages were received by the server.
+        end: obspy.core.UTCDateTime
+            latest time messages were received by the server.
+        observatory: str
+            observatory code.
+
         Notes
         -----
         See page 37-38
@@ -138,39 +265,62 @@ class GOESIMFV283Factory(IMFV283Factory):
 
         Returns
         -------
-        String
-            Messages from getDcpMessages
+        list<bytes>
+            one entry per message, read as getDcpMessages outputs them,
+            or None if no server could be reached.
         """
-        self._fill_criteria_file(starttime, endtime, observatory)
+        criteria_file = self._fill_criteria_file(start, end, observatory)
 
+        messages = None
         for server in self.server:
             print(server, file=sys.stderr)
-            proc = subprocess.Popen(
-                [
-                    self.getdcpmessages,
-                    "-h",
-                    server,
-                    "-u",
-                    self.user,
-                    "-P",
-                    self.password,
-                    "-f",
-                    self.directory + "/" + self.criteria_file_name,
-                    "-t",
-                    "60",
-                    "-n",
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            (output, error) = proc.communicate()
+            with self._get_server_semaphore(server):
+                proc = subprocess.Popen(
+                    [
+                        self.getdcpmessages,
+                        "-h",
+                        server,
+                        "-u",
+                        self.user,
+                        "-P",
+                        self.password,
+                        "-f",
+                        criteria_file,
+                        "-t",
+                        "60",
+                        "-n",
+                    ],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+                # read stderr separately, so neither pipe fills up
+                errors = []
+                error_thread = threading.Thread(
+                    target=lambda: errors.append(proc.stderr.read())
+                )
+                error_thread.start()
+                messages = [line.rstrip(b"\r\n") for line in proc.stdout]
+                messages = [message for message in messages if message]
+                proc.wait()
+                error_thread.join()
+            error = errors[0]
             print(error, file=sys.stderr)
             if error.find(self.javaerror) >= 0:
                 print("Error: could not connect to %s" % server, file=sys.stderr)
+                messages = None
                 continue
             break
 
-        return output
+        return messages
+
+    def _get_server_semaphore(self, server):
+        """Get semaphore that limits processes for a server."""
+        with self._server_lock:
+            if server not in self._server_semaphores:
+                self._server_semaphores[server] = threading.BoundedSemaphore(
+                    self.server_concurrency
+                )
+            return self._server_semaphores[server]
 
     def _fill_criteria_file(self, starttime, endtime, observatory):
         """Set Criteria Filename
@@ -194,16 +344,13 @@ class GOESIMFV283Factory(IMFV283Factory):
             ASCENDING_TIME: Do Not sort messages into ascending time.
             RT_SETTLE_DELAY: Do wait to prevent duplicate messages.
         """
-        start = starttime - 2200
-        end = endtime + 1800
-
-        criteria_file = self.directory + "/" + self.criteria_file_name
+        criteria_file = self.directory + "/" + observatory + ".sc"
         buf = []
         buf.append("#\n# LRGS Search Criteria\n#\n")
         buf.append("DAPS_SINCE: ")
-        buf.append(start.datetime.strftime("%y/%j %H:%M:%S\n"))
+        buf.append(starttime.datetime.strftime("%y/%j %H:%M:%S\n"))
         buf.append("DAPS_UNTIL: ")
-        buf.append(end.datetime.strftime("%y/%j %H:%M:%S\n"))
+        buf.append(endtime.datetime.strftime("%y/%j %H:%M:%S\n"))
         buf.append("NETWORK_LIST: " + observatory.lower() + ".nl\n")
         buf.append("DAPS_STATUS: N\n")
         buf.append("RETRANSMITTED: N\n")
@@ -214,4 +361,4 @@ class GOESIMFV283Factory(IMFV283Factory):
             os.makedirs(criteria_dir)
         with open(criteria_file, "wb") as fh:
             fh.write("".join(buf).encode())
-            fh.close()
+        return criteria_file
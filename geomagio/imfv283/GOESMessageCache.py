@@ -0,0 +1,221 @@
+"""Disk cache for GOES messages."""
+from __future__ import absolute_import
+
+import json
+import os
+import threading
+
+from obspy.core import UTCDateTime
+
+from ..edge.WaveformCache import get_uncovered, merge_ranges
+from .IMFV283Parser import HEADER_SIZE
+
+
+class GOESMessageCache(object):
+    """Cache GOES messages on local disk.
+
+    Messages are stored as one file per observatory and day of transmission,
+    with one message per line, and a JSON file listing the transmission
+    time ranges that were retrieved.  Messages are keyed by observatory
+    and transmission time, so retrieving a range again does not add
+    duplicate messages.
+
+    Parameters
+    ----------
+    directory: str
+        directory for cache files.
+    settle_time: float
+        seconds before a transmission time range is considered complete.
+        more recent ranges are retrieved again.
+    """
+
+    def __init__(self, directory, settle_time=600):
+        self.directory = directory
+        self.settle_time = settle_time
+        self._lock = threading.Lock()
+
+    def get_messages(self, observatory, starttime, endtime):
+        """Get cached messages.
+
+        Parameters
+        ----------
+        observatory: str
+            observatory code.
+        starttime: obspy.core.UTCDateTime
+            earliest transmission time.
+        endtime: obspy.core.UTCDateTime
+            latest transmission time.
+
+        Returns
+        -------
+        list<bytes>
+            messages, in order of transmission time.
+        """
+        messages = []
+        with self._lock:
+            for day in self._get_days(starttime, endtime):
+                for _, message in sorted(
+                    self._read_messages(self._get_path(observatory, day)).items()
+                ):
+                    time = get_transmission_time(message)
+                    if starttime <= time <= endtime:
+                        messages.append(message)
+        return messages
+
+    def get_uncovered(self, observatory, starttime, endtime, settled=False):
+        """Get transmission time ranges that have not been retrieved.
+
+        Parameters
+        ----------
+        observatory: str
+            observatory code.
+        starttime: obspy.core.UTCDateTime
+            earliest transmission time.
+        endtime: obspy.core.UTCDateTime
+            latest transmission time.
+        settled: bool
+            when True, ignore ranges within twice the settle time.
+            recent ranges are retrieved again by every request,
+            and are marked as covered up to the settle time at that request.
+
+        Returns
+        -------
+        list<tuple>
+            (start, end) time ranges to retrieve.
+        """
+        if settled:
+            endtime = min(endtime, UTCDateTime() - 2 * self.settle_time)
+            if endtime < starttime:
+                return []
+        covered = []
+        with self._lock:
+            for day in self._get_days(starttime, endtime):
+                covered.extend(self._read_coverage(self._get_path(observatory, day)))
+        return get_uncovered(starttime, endtime, merge_ranges(covered))
+
+    def put_messages(self, observatory, messages, starttime, endtime):
+        """Add retrieved messages to the cache.
+
+        Parameters
+        ----------
+        observatory: str
+            observatory code.
+        messages: list<bytes>
+            messages retrieved for the range,
+            lines without a transmission time are ignored.
+        starttime: obspy.core.UTCDateTime
+            start of retrieved range.
+        endtime: obspy.core.UTCDateTime
+            end of retrieved range.
+            only the part before the settle time is marked as covered.
+        """
+        endtime = min(endtime, UTCDateTime() - self.settle_time)
+        # keyed by start of day in nanoseconds, UTCDateTime is not hashable
+        by_day = {}
+        for message in messages:
+            try:
+                time = get_transmission_time(message)
+            except ValueError:
+                continue
+            day = UTCDateTime(time.year, time.month, time.day)
+            by_day.setdefault(day.ns, []).append(message)
+        days = set(by_day)
+        if starttime < endtime:
+            days.update(day.ns for day in self._get_days(starttime, endtime))
+        with self._lock:
+            for day in sorted(days):
+                day_messages = by_day.get(day, [])
+                day = UTCDateTime(ns=day)
+                path = self._get_path(observatory, day)
+                cached = self._read_messages(path)
+                for message in day_messages:
+                    cached[message[8:19]] = message
+                covered = self._read_coverage(path)
+                if starttime < endtime:
+                    day_start = max(starttime, day)
+                    day_end = min(endtime, day + 86400)
+                    if day_start < day_end:
+                        covered = merge_ranges(covered + [(day_start, day_end)])
+                self._write(path, cached, covered)
+
+    def _get_days(self, starttime, endtime):
+        """Get start of each day that overlaps an interval."""
+        day = UTCDateTime(starttime.year, starttime.month, starttime.day)
+        days = []
+        while day <= endtime:
+            days.append(day)
+            day += 86400
+        return days
+
+    def _get_path(self, observatory, day):
+        """Get path to message file for a day.
+
+        The coverage file uses the same path with a ".json" extension.
+        """
+        return os.path.join(
+            self.directory, observatory, day.strftime("%Y%m%d") + ".msg"
+        )
+
+    def _read_coverage(self, path):
+        """Read time ranges covered by a day file."""
+        try:
+            with open(path + ".json") as f:
+                return [
+                    (UTCDateTime(start), UTCDateTime(end))
+                    for start, end in json.load(f)
+                ]
+        except Exception:
+            return []
+
+    def _read_messages(self, path):
+        """Read messages in a day file.
+
+        Returns
+        -------
+        dict
+            messages keyed by transmission time.
+        """
+        try:
+            with open(path, "rb") as f:
+                return {line[8:19]: line for line in f.read().splitlines() if line}
+        except Exception:
+            return {}
+
+    def _write(self, path, messages, covered):
+        """Write a day file and its coverage file."""
+        directory = os.path.dirname(path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        # write to temporary files, so readers never see partial files
+        with open(path + ".tmp", "wb") as f:
+            for _, message in sorted(messages.items()):
+                f.write(message + b"\n")
+        with open(path + ".json.tmp", "w") as f:
+            json.dump([(str(start), str(end)) for start, end in covered], f)
+        os.replace(path + ".tmp", path)
+        os.replace(path + ".json.tmp", path + ".json")
+
+
+def get_transmission_time(message):
+    """Get transmission time of a GOES message.
+
+    Parameters
+    ----------
+    message: bytes
+        message, starting with the message header.
+
+    Returns
+    -------
+    obspy.core.UTCDateTime
+        transmission time.
+
+    Raises
+    ------
+    ValueError
+        if message does not have a transmission time.
+    """
+    transmission = message[8:19]
+    if len(message) <= HEADER_SIZE or not transmission.isdigit():
+        raise ValueError("Invalid message header")
+    # same as IMFV283Parser._estimate_data_time
+    return UTCDateTime(b"20" + transmission[0:5] + b"T" + transmission[5:])
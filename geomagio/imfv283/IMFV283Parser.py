@@ -18,6 +18,25 @@ MSG_SIZE_100B = 190
 MSG_SIZE_300B = 191
 BIAS = 8192
 SHIFT = 1048576
+# number of 3 byte "pairs" in a ness block, each is 2 bytes of goes data
+NESS_PAIRS = 63
+# number of ness pairs in the goes header, swapped using "swap_hdr"
+NESS_HEADER_PAIRS = 12
+# goes data block, multi-byte values are big-endian
+GOES_DTYPE = numpy.dtype(
+    [
+        # day of year and minute of day, 12 bits each
+        ("time", "u1", 3),
+        ("offset", "u1", 4),
+        # orientation code and scale bits
+        ("flags", "u1"),
+        ("unused", "V22"),
+        # 12 samples of 4 channels
+        ("data", ">u2", (12, 4)),
+    ]
+)
+# flags bits that double the scale of each channel
+SCALE_BITS = [0x20, 0x10, 0x8, 0x4]
 
 # Documentation list the second channel as D, but we know that for
 # USGS, it's actually E. Since only USGS and Canada (YXZF) use GOES
@@ -71,6 +90,7 @@ class IMFV283Parser(object):
         data : str
             IMFV283 formatted file contents.
         """
+        messages = []
         lines = data.splitlines()
         for line in lines:
             # if line isn't at least 37 characters, there's no need to proceed.
@@ -87,16 +107,97 @@ class IMFV283Parser(object):
                     sys.stderr.write("Incorrect data Length \n")
                     continue
 
-                goes_data = self._process_ness_block(
-                    line, imfv283_codes.OBSERVATORIES[msg_header["obs"]], data_len
-                )
+                domsat = imfv283_codes.OBSERVATORIES[msg_header["obs"]]
+                if len(line) < self._get_data_offset(data_len) + 3 * NESS_PAIRS:
+                    raise IndexError("ness block too short")
+                messages.append((line, msg_header, domsat))
+            except (KeyError, IndexError, ValueError):
+                sys.stderr.write("Incorrect data line ")
+                sys.stderr.write(str(line))
+        if not messages:
+            return
 
-                goes_header = self._parse_goes_header(goes_data)
-                data = self._get_data(goes_header, goes_data)
-                self._post_process(data, msg_header, goes_header)
+        goes_headers, values = self._decode_messages(messages)
+        blocks = []
+        for (line, msg_header, _), goes_header, message_values in zip(
+            messages, goes_headers, values
+        ):
+            try:
+                channels = CHANNELS[goes_header["orient"]]
+                goes_time = self._get_data_time(msg_header, goes_header)
             except (KeyError, IndexError, ValueError):
                 sys.stderr.write("Incorrect data line ")
                 sys.stderr.write(str(line))
+                continue
+            if goes_time is not None:
+                blocks.append(
+                    (msg_header["obs"], tuple(channels), goes_time, message_values)
+                )
+        self._post_process(blocks)
+
+    def _decode_messages(self, messages):
+        """Decode a batch of messages at once.
+
+        Ness blocks are converted to goes data blocks, which are viewed as
+        an array of GOES_DTYPE, so each field is decoded for all messages
+        in one pass.
+
+        Parameters
+        ----------
+        messages : list
+            tuples of (msg, msg_header, domsat) for each message, where
+            msg is long enough to contain a ness block.
+
+        Returns
+        -------
+        goes_headers : list
+            goes header for each message, see _parse_goes_header.
+        values : numpy.array
+            values in nanotesla, with shape (messages, 12 samples, 4 channels),
+            and ``numpy.nan`` for missing values.
+        """
+        blocks = []
+        for msg, msg_header, _ in messages:
+            offset = self._get_data_offset(msg_header["data_len"])
+            blocks.append(bytes(msg[offset : offset + 3 * NESS_PAIRS]))
+        ness = numpy.frombuffer(b"".join(blocks), dtype=numpy.uint8).reshape(
+            -1, NESS_PAIRS, 3
+        )
+        byte1 = ness[:, :, 0]
+        byte2 = ness[:, :, 1]
+        byte3 = ness[:, :, 2]
+        goes_value1 = (byte3 & 0x3F) + ((byte2 & 0x3) * 0x40)
+        goes_value2 = ((byte2 // 0x4) & 0xF) + ((byte1 & 0xF) * 0x10)
+        # swap the bytes depending on domsat information.
+        swap = numpy.empty(goes_value1.shape, dtype=bool)
+        swap[:, :NESS_HEADER_PAIRS] = [[m[2]["swap_hdr"]] for m in messages]
+        swap[:, NESS_HEADER_PAIRS:] = [[m[2]["swap_data"]] for m in messages]
+        goes_block = numpy.empty(goes_value1.shape + (2,), dtype=numpy.uint8)
+        goes_block[:, :, 0] = numpy.where(swap, goes_value2, goes_value1)
+        goes_block[:, :, 1] = numpy.where(swap, goes_value1, goes_value2)
+        goes = goes_block.reshape(len(messages), -1).view(GOES_DTYPE).ravel()
+        # see _parse_goes_header
+        time = goes["time"].astype(numpy.int64)
+        days = ((time[:, 1] & 0xF) << 8) + time[:, 0]
+        minutes = (time[:, 2] << 4) + ((time[:, 1] & 0xF0) >> 4)
+        orients = goes["flags"] / 0x40
+        scale = numpy.where(goes["flags"][:, numpy.newaxis] & SCALE_BITS, 2, 1)
+        offset = goes["offset"].astype(numpy.int64)
+        # Data values need to be scaled, offset and shifted into the
+        # correct 10th nanotesla value.
+        # For our convenience we convert to nanotesla values.
+        values = goes["data"].astype(numpy.float64)
+        values[values == DEAD_VALUE] = numpy.nan
+        values = numpy.multiply(values, scale[:, numpy.newaxis, :])
+        values = numpy.add(values, (offset * BIAS - SHIFT)[:, numpy.newaxis, :])
+        values = numpy.divide(values, 10.0)
+        goes_headers = [
+            {"day": day, "minute": minute, "orient": orient}
+            for day, minute, orient in zip(
+                days.tolist(), minutes.tolist(), orients.tolist()
+            )
+        ]
+        return goes_headers, values
 
     def _estimate_data_time(self, transmission, doy, minute, max_transmit_delay=1800):
         """Get data start time for a GOES data packet.
@@ -161,41 +262,6 @@ class IMFV283Parser(object):
         # otherwise return reported data_time
         return (data_time, transmit_time, False)
 
-    def _get_data(self, header, data):
-        """get data from data packet
-
-        Parameters
-        ----------
-        header : dict
-            contains the header information for the data packet
-        data : bytearray
-            contains the encoded channel data
-        Returns
-        -------
-        dict
-            dictionary of channel data arrays.
-        """
-        parse_data = {}
-        channels = CHANNELS[header["orient"]]
-        for channel in channels:
-            parse_data[channel] = []
-
-        bytecount = 30
-        for cnt in range(0, 12):
-            # get data in 2 byte pairs as integers.
-            d1 = 0x100 * data[bytecount] + data[bytecount + 1]
-            d2 = 0x100 * data[bytecount + 2] + data[bytecount + 3]
-            d3 = 0x100 * data[bytecount + 4] + data[bytecount + 5]
-            d4 = 0x100 * data[bytecount + 6] + data[bytecount + 7]
-            bytecount += 8
-
-            parse_data[channels[0]].append(d1)
-            parse_data[channels[1]].append(d2)
-            parse_data[channels[2]].append(d3)
-            parse_data[channels[3]].append(d4)
-
-        return parse_data
-
     def _get_data_offset(self, data_len):
         """get the data offset for the ness blocks
 
@@ -288,18 +354,21 @@ class IMFV283Parser(object):
         header["data_len"] = int(msg[32:37])
         return header
 
-    def _post_process(self, data, msg_header, goes_header):
-        """process parsed data
+    def _get_data_time(self, msg_header, goes_header):
+        """Get time of first sample in a message.
 
         Parameters
         ----------
-        data: dict
-            parsed data by channel
         msg_header: dict
             parsed header of the message
         goes_header: dict
             parsed header of the goes data
 
+        Returns
+        -------
+        UTCDateTime
+            time of first sample,
+            or None if data is too old to be used.
         """
         (goes_time, msg_time, corrected) = self._estimate_data_time(
             msg_header["transmission_time"], goes_header["day"], goes_header["minute"]
@@ -313,30 +382,51 @@ class IMFV283Parser(object):
             )
         if (msg_time - goes_time) > (24 * 60):
             sys.stderr.write("data over twice as old as the message\n")
-            return
+            return None
+        return goes_time
+
+    def _post_process(self, blocks):
+        """Add traces for parsed data to ``self.stream``.
+
+        Consecutive blocks from the same observatory are joined,
+        so there is one trace per channel for each run of consecutive
+        messages, instead of for each message.
 
-        scale = goes_header["scale"]
-        offset = goes_header["offset"]
-        orientation = goes_header["orient"]
-        for channel, loc in zip(CHANNELS[orientation], range(0, 4)):
-            stats = obspy.core.Stats()
-            stats.channel = channel
-            stats.sampling_rate = 0.0166666666667
-            stats.starttime = goes_time
-            stats.npts = 12
-            stats.station = msg_header["obs"]
-
-            numpy_data = numpy.array(data[channel], dtype=numpy.float64)
-            numpy_data[numpy_data == DEAD_VALUE] = numpy.nan
-            # Data values need to be scaled, offset and shifted into the
-            # correct 10th nanotesla value.
-            # For our convenience we convert to nanotesla values.
-            numpy_data = numpy.multiply(numpy_data, scale[loc])
-            numpy_data = numpy.add(numpy_data, offset[loc] * BIAS - SHIFT)
-            numpy_data = numpy.divide(numpy_data, 10.0)
-
-            trace = obspy.core.Trace(numpy_data, stats)
-            self.stream += trace
+        Parameters
+        ----------
+        blocks: list
+            tuples of (observatory, channels, time of first sample, values)
+            for each message, where values are in nanotesla with shape
+            (12 samples, 4 channels).
+        """
+        runs = []
+        for observatory, channels, starttime, values in sorted(
+            blocks, key=lambda block: (block[0], block[1], block[2].ns)
+        ):
+            if runs:
+                run_observatory, run_channels, run_starttime, run_values = runs[-1]
+                run_samples = sum(len(v) for v in run_values)
+                if (
+                    observatory == run_observatory
+                    and channels == run_channels
+                    and starttime == run_starttime + run_samples * 60
+                ):
+                    run_values.append(values)
+                    continue
+            runs.append((observatory, channels, starttime, [values]))
+
+        for observatory, channels, starttime, values in runs:
+            values = numpy.concatenate(values)
+            for channel, loc in zip(channels, range(0, 4)):
+                stats = obspy.core.Stats()
+                stats.channel = channel
+                stats.sampling_rate = 0.0166666666667
+                stats.starttime = starttime
+                stats.npts = len(values)
+                stats.station = observatory
+
+                trace = obspy.core.Trace(values[:, loc].copy(), stats)
+                self.stream += trace
 
     def _process_ness_block(self, msg, domsat, data_len):
         """process the "ness" block of data into an IMFV283 data block.
@@ -2,11 +2,15 @@
 
 
 import numpy
+from .. import FixedWidth
 
 # values that represent missing data points in PCDCP
 NINES = numpy.int("9999999")
 NINES_RAW = numpy.int("99999990")
 NINES_DEG = numpy.int("9999")
+# width of value columns, by width of time column,
+# for minute (4) and second (5) files
+VALUE_WIDTHS = {4: 8, 5: 9}
 
 
 class PCDCPParser(object):
@@ -60,13 +64,11 @@ class PCDCPParser(object):
         """
         self._set_channels()
 
-        parsing_header = True
-        lines = data.splitlines()
-        for line in lines:
-            if parsing_header:
-                self._parse_header(line)
-                parsing_header = False
-            else:
+        header, _, data = data.partition("\n")
+        if header:
+            self._parse_header(header.rstrip("\r"))
+        if not self._parse_data_block(data):
+            for line in data.splitlines():
                 self._parse_data(line)
         self._post_process()
 
@@ -86,6 +88,56 @@ class PCDCPParser(object):
 
         return
 
+    def _parse_data_block(self, data):
+        """Parse all data lines at once, as fixed width columns.
+
+        Lines are decoded into a 2d array of bytes, and each column is
+        converted as a whole array.
+
+        Parameters
+        ----------
+        data : str
+            data lines.
+
+        Returns
+        -------
+        bool
+            whether lines were parsed, False when lines are not uniformly
+            formatted and should be parsed one at a time.
+        """
+        columns = FixedWidth.get_lines(data)
+        if columns is None:
+            return False
+        time_width = bytes(columns[0]).find(b" ")
+        value_width = VALUE_WIDTHS.get(time_width)
+        if value_width is None or columns.shape[1] != time_width + 4 * (
+            value_width + 1
+        ):
+            return False
+        # each value is preceded by one space
+        if not (columns[:, time_width :: value_width + 1] == ord(" ")).all():
+            return False
+        times = (
+            numpy.ascontiguousarray(columns[:, :time_width])
+            .view("S%d" % time_width)
+            .ravel()
+            .astype(str)
+            .tolist()
+        )
+        # parse all value columns at once
+        values = FixedWidth.parse_decimals(
+            numpy.concatenate(
+                [
+                    columns[:, start : start + value_width + 1]
+                    for start in range(time_width, columns.shape[1], value_width + 1)
+                ]
+            )
+        )
+        if values is None:
+            return False
+        self._parsedata = tuple([times] + numpy.split(values, 4))
+        return True
+
     def _parse_data(self, line):
         """Parse one data point in the timeseries.
 
@@ -5,9 +5,8 @@ import numpy
 from . import PCDCPParser
 from io import BytesIO
 from datetime import datetime
-from .. import ChannelConverter, TimeseriesUtility
+from .. import ChannelConverter, FixedWidth, TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
-from obspy.core import Stream
 
 
 class PCDCPWriter(object):
@@ -42,8 +41,7 @@ class PCDCPWriter(object):
             self.empty_value = PCDCPParser.NINES_RAW
 
         out.write(str(self._format_header(stats, channels)).encode())
-
-        out.write(str(self._format_data(timeseries, channels, stats)).encode())
+        self._write_data(out, timeseries, channels, stats)
 
     def _format_header(self, stats, channels):
         """format headers for PCDCP file
@@ -111,73 +109,136 @@ class PCDCPWriter(object):
         str
             A string formatted to be the data lines in a PCDCP file.
         """
-        buf = []
+        out = BytesIO()
+        self._write_data(out, timeseries, channels, stats)
+        return out.getvalue().decode()
 
-        # create new stream
-        timeseriesLocal = Stream()
-        # Use a copy of the trace so that we don't modify the original.
-        for trace in timeseries:
-            traceLocal = trace.copy()
-            if traceLocal.stats.channel == "D":
-                traceLocal.data = ChannelConverter.get_minutes_from_radians(
-                    traceLocal.data
-                )
+    def _write_data(self, out, timeseries, channels, stats):
+        """Write all data lines, one day of lines at a time.
+
+        Parameters
+        ----------
+            out : file object
+                File object to be written to.
+            timeseries : obspy.core.Stream
+                Stream containing traces with channel listed in channels
+            channels : sequence
+                List and order of channel values to output.
+        """
+        traces = [timeseries.select(channel=c)[0] for c in channels]
+        length = len(traces[0].data)
+        lines_per_day = max(1, int(round(86400 / traces[0].stats.delta)))
+        for start in range(0, length, lines_per_day):
+            end = min(start + lines_per_day, length)
+            out.write(self._format_lines(traces, start, end, stats))
 
-            # TODO - we should look into multiplying the trace all at once
-            # like this, but this gives an error on Windows at the moment.
-            # traceLocal.data = \
-            #     numpy.round(numpy.multiply(traceLocal.data, 100)).astype(int)
+    def _format_lines(self, traces, start, end, stats):
+        """Format data lines, formatting each column at once.
 
-            timeseriesLocal.append(traceLocal)
+        Parameters
+        ----------
+            traces : sequence
+                Traces to output, in order.
+            start : int
+                Index of first line.
+            end : int
+                Index after last line.
 
-        traces = [timeseriesLocal.select(channel=c)[0] for c in channels]
+        Returns
+        -------
+        bytes
+            Formatted lines.
+        """
+        time_width, data_width, data_multiplier, time_multipliers = self._get_format(
+            stats
+        )
         starttime = float(traces[0].stats.starttime)
         delta = traces[0].stats.delta
-
-        for i in range(len(traces[0].data)):
-            buf.append(
+        traces_values = []
+        columns = []
+        for trace in traces:
+            values = numpy.array(trace.data[start:end], dtype=numpy.float64)
+            if trace.stats.channel == "D":
+                values = ChannelConverter.get_minutes_from_radians(values)
+            traces_values.append(values)
+            empty = numpy.isnan(values)
+            # adding zero avoids formatting negative zero as "-0"
+            values = numpy.round(values * data_multiplier) + 0.0
+            values[empty] = self.empty_value
+            columns += [" ", FixedWidth.format_decimals(values, data_width, 0)]
+        if any(column is None for column in columns):
+            # values that do not fit, format one line at a time
+            return "".join(
                 self._format_values(
                     datetime.utcfromtimestamp(starttime + i * delta),
-                    (t.data[i] for t in traces),
+                    (values[i - start] for values in traces_values),
                     stats,
                 )
-            )
-
-        return "".join(buf)
+                for i in range(start, end)
+            ).encode()
+        fields = FixedWidth.get_time_fields(
+            FixedWidth.get_sample_times(starttime, delta, start, end)
+        )
+        times = sum(
+            fields[field] * multiplier
+            for field, multiplier in zip(("hour", "minute", "second"), time_multipliers)
+        )
+        return FixedWidth.join_columns(
+            end - start,
+            [FixedWidth.format_digits(times, time_width)] + columns + ["\n"],
+        )
 
-    def _format_values(self, time, values, stats):
-        """Format one line of data values.
+    def _get_format(self, stats):
+        """Get data line format.
 
         Parameters
         ----------
-            time : datetime
-                Timestamp for values.
-            values : sequence
-                List and order of channel values to output.
-                If value is NaN, self.empty_value is output in its place.
+            stats : obspy.core.trace.stats
+                Used to choose 1-sec or 1-min format.
 
         Returns
         -------
-        unicode
-            Formatted line containing values.
+        tuple
+            (time width, data width, data multiplier,
+            (hour, minute, second) multipliers for time)
         """
         # 1-sec and 1-min data have different formats.
         # Won't work if input is IAGA2002: stats missing data_interval.
         time_width = 4
         data_width = 8
         data_multiplier = 100
-        hr_multiplier = 60
-        mn_multiplier = 1
-        sc_multiplier = 0
+        time_multipliers = (60, 1, 0)
         if stats.delta == 1:
             time_width = 5
             data_width = 9
             data_multiplier = 1000
-            hr_multiplier = 3600
-            mn_multiplier = 60
-            sc_multiplier = 1
+            time_multipliers = (3600, 60, 1)
         if self.temperatures:
             data_multiplier = 10
+        return time_width, data_width, data_multiplier, time_multipliers
+
+    def _format_values(self, time, values, stats):
+        """Format one line of data values.
+
+        Parameters
+        ----------
+            time : datetime
+                Timestamp for values.
+            values : sequence
+                List and order of channel values to output.
+                If value is NaN, self.empty_value is output in its place.
+
+        Returns
+        -------
+        unicode
+            Formatted line containing values.
+        """
+        (
+            time_width,
+            data_width,
+            data_multiplier,
+            (hr_multiplier, mn_multiplier, sc_multiplier),
+        ) = self._get_format(stats)
 
         tt = time.timetuple()
 
@@ -3,9 +3,8 @@ from builtins import range
 import numpy
 from io import BytesIO
 from datetime import datetime
-from .. import TimeseriesUtility
+from .. import FixedWidth, TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
-from obspy.core import Stream
 
 
 class TEMPWriter(object):
@@ -33,8 +32,8 @@ class TEMPWriter(object):
                     % (channel, str(TimeseriesUtility.get_channels(timeseries)))
                 )
         stats = timeseries[0].stats
-        out.write(self._format_header(stats))
-        out.write(self._format_data(timeseries, channels))
+        out.write(self._format_header(stats).encode())
+        self._write_data(out, timeseries, channels)
 
     def _format_header(self, stats):
         """format headers for temp/volt file
@@ -84,34 +83,74 @@ class TEMPWriter(object):
         str
             A string formatted to be the data lines in a temp/volt file.
         """
-        buf = []
+        out = BytesIO()
+        self._write_data(out, timeseries, channels)
+        return out.getvalue().decode()
 
-        # create new stream
-        timeseriesLocal = Stream()
-        # Use a copy of the trace so that we don't modify the original.
-        for trace in timeseries:
-            traceLocal = trace.copy()
+    def _write_data(self, out, timeseries, channels):
+        """Write all data lines, one day of lines at a time.
 
-            # TODO - we should look into multiplying the trace all at once
-            # like this, but this gives an error on Windows at the moment.
-            # traceLocal.data = \
-            #     numpy.round(numpy.multiply(traceLocal.data, 100)).astype(int)
+        Parameters
+        ----------
+            out : file object
+                File object to be written to.
+            timeseries : obspy.core.Stream
+                Stream containing traces with channel listed in channels
+            channels : sequence
+                List and order of channel values to output.
+        """
+        traces = [timeseries.select(channel=c)[0] for c in channels]
+        length = len(traces[0].data)
+        lines_per_day = max(1, int(round(86400 / traces[0].stats.delta)))
+        for start in range(0, length, lines_per_day):
+            end = min(start + lines_per_day, length)
+            out.write(self._format_lines(traces, start, end))
 
-            timeseriesLocal.append(traceLocal)
+    def _format_lines(self, traces, start, end):
+        """Format data lines, formatting each column at once.
 
-        traces = [timeseriesLocal.select(channel=c)[0] for c in channels]
+        Parameters
+        ----------
+            traces : sequence
+                Traces to output, in order.
+            start : int
+                Index of first line.
+            end : int
+                Index after last line.
+
+        Returns
+        -------
+        bytes
+            Formatted lines.
+        """
         starttime = float(traces[0].stats.starttime)
         delta = traces[0].stats.delta
-
-        for i in range(len(traces[0].data)):
-            buf.append(
+        columns = []
+        for trace in traces:
+            values = numpy.array(trace.data[start:end], dtype=numpy.float64)
+            empty = numpy.isnan(values)
+            # adding zero avoids formatting negative zero as "-0"
+            values = numpy.round(values * 10) + 0.0
+            values[empty] = self.empty_value
+            columns += [" ", FixedWidth.format_decimals(values, 5, 0)]
+        if any(column is None for column in columns):
+            # values that do not fit, format one line at a time
+            return "".join(
                 self._format_values(
                     datetime.utcfromtimestamp(starttime + i * delta),
                     (t.data[i] for t in traces),
                 )
-            )
-
-        return "".join(buf)
+                for i in range(start, end)
+            ).encode()
+        fields = FixedWidth.get_time_fields(
+            FixedWidth.get_sample_times(starttime, delta, start, end)
+        )
+        return FixedWidth.join_columns(
+            end - start,
+            [FixedWidth.format_digits(fields["hour"] * 60 + fields["minute"], 4)]
+            + columns
+            + ["\n"],
+        )
 
     def _format_values(self, time, values):
         """Format one line of data values.
@@ -3,9 +3,8 @@ from builtins import range
 import numpy
 from io import BytesIO
 from datetime import datetime
-from .. import ChannelConverter, TimeseriesUtility
+from .. import ChannelConverter, FixedWidth, TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
-from obspy.core import Stream
 
 
 class VBFWriter(object):
@@ -34,9 +33,8 @@ class VBFWriter(object):
                 )
         stats = timeseries[0].stats
 
-        out.write(self._format_header(stats))
-
-        out.write(self._format_data(timeseries, channels))
+        out.write(self._format_header(stats).encode())
+        self._write_data(out, timeseries, channels)
 
     def _format_header(self, stats):
         """format headers for VBF file
@@ -86,38 +84,83 @@ class VBFWriter(object):
         str
             A string formatted to be the data lines in a VBF file.
         """
-        buf = []
+        out = BytesIO()
+        self._write_data(out, timeseries, channels)
+        return out.getvalue().decode()
 
-        # create new stream
-        timeseriesLocal = Stream()
-        # Use a copy of the trace so that we don't modify the original.
-        for trace in timeseries:
-            traceLocal = trace.copy()
-            if traceLocal.stats.channel == "D":
-                traceLocal.data = ChannelConverter.get_minutes_from_radians(
-                    traceLocal.data
-                )
+    def _write_data(self, out, timeseries, channels):
+        """Write all data lines, one day of lines at a time.
+
+        Parameters
+        ----------
+            out : file object
+                File object to be written to.
+            timeseries : obspy.core.Stream
+                Stream containing traces with channel listed in channels
+            channels : sequence
+                List and order of channel values to output.
+        """
+        traces = [timeseries.select(channel=c)[0] for c in channels]
+        length = len(traces[0].data)
+        lines_per_day = max(1, int(round(86400 / traces[0].stats.delta)))
+        for start in range(0, length, lines_per_day):
+            end = min(start + lines_per_day, length)
+            out.write(self._format_lines(traces, start, end))
+
+    def _format_lines(self, traces, start, end):
+        """Format data lines, formatting each column at once.
 
-            # TODO - we should look into multiplying the trace all at once
-            # like this, but this gives an error on Windows at the moment.
-            # traceLocal.data = \
-            #     numpy.round(numpy.multiply(traceLocal.data, 100)).astype(int)
+        Channels alternate between volts and bins, see _format_values.
 
-            timeseriesLocal.append(traceLocal)
+        Parameters
+        ----------
+            traces : sequence
+                Traces to output, in order.
+            start : int
+                Index of first line.
+            end : int
+                Index after last line.
 
-        traces = [timeseriesLocal.select(channel=c)[0] for c in channels]
+        Returns
+        -------
+        bytes
+            Formatted lines.
+        """
         starttime = float(traces[0].stats.starttime)
         delta = traces[0].stats.delta
-
-        for i in range(len(traces[0].data)):
-            buf.append(
+        traces_values = []
+        columns = []
+        for idx, trace in enumerate(traces):
+            values = numpy.array(trace.data[start:end], dtype=numpy.float64)
+            if trace.stats.channel == "D":
+                values = ChannelConverter.get_minutes_from_radians(values)
+            traces_values.append(values)
+            empty = numpy.isnan(values)
+            if idx % 2 == 0:
+                values = values / 1000.0
+                values[empty] = 99.999999
+                columns += [" ", FixedWidth.format_decimals(values, 10, 6)]
+            else:
+                # adding zero avoids formatting negative zero as "-0"
+                values = numpy.trunc(values) + 0.0
+                values[empty] = 999
+                columns += [" ", FixedWidth.format_decimals(values, 4, 0)]
+        if any(column is None for column in columns):
+            # values that do not fit, format one line at a time
+            return "".join(
                 self._format_values(
                     datetime.utcfromtimestamp(starttime + i * delta),
-                    (t.data[i] for t in traces),
+                    (values[i - start] for values in traces_values),
                 )
-            )
-
-        return "".join(buf)
+                for i in range(start, end)
+            ).encode()
+        fields = FixedWidth.get_time_fields(
+            FixedWidth.get_sample_times(starttime, delta, start, end)
+        )
+        times = fields["hour"] * 3600 + fields["minute"] * 60 + fields["second"]
+        return FixedWidth.join_columns(
+            end - start, [FixedWidth.format_digits(times, 5)] + columns + ["\n"]
+        )
 
     def _format_values(self, time, values):
         """Format one line of data values.
@@ -24,6 +24,9 @@ setuptools.setup(
     ],
     use_pipfile=True,
     entry_points={
-        "console_scripts": ["magproc-prepfiles=geomagio.processing.magproc:main"],
+        "console_scripts": [
+            "geomag-benchmark=geomagio.benchmark.Benchmark:main",
+            "magproc-prepfiles=geomagio.processing.magproc:main",
+        ],
     },
 )
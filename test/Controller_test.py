@@ -1,12 +1,24 @@
 #! /usr/bin/env python
-from geomagio import Controller, TimeseriesFactory
-from geomagio.algorithm import Algorithm
+from geomagio import Controller, TimeseriesFactory, TimeseriesUtility
+from geomagio.algorithm import (
+    Algorithm,
+    algorithms,
+    DbDtAlgorithm,
+    PipelineAlgorithm,
+)
 
 # needed to read outputs generated by Controller and test data
 from geomagio.iaga2002 import IAGA2002Factory
 
 # needed to emulate geomag.py script
-from geomagio.Controller import _main, parse_args
+from geomagio.Controller import (
+    _main,
+    get_algorithm_names,
+    get_next_tick,
+    main,
+    parse_args,
+    run_observatories,
+)
 
 # needed to copy SqDistAlgorithm statefile
 from shutil import copy
@@ -14,8 +26,64 @@ from shutil import copy
 # needed to determine a valid (and writable) temp folder
 from tempfile import gettempdir
 
+import subprocess
+import sys
+import time
+import numpy
+import pytest
 from numpy.testing import assert_allclose, assert_equal
-from obspy.core import UTCDateTime
+from obspy.core import Stream, UTCDateTime
+
+
+class MockFactory(TimeseriesFactory):
+    """In memory factory that records get and put calls."""
+
+    def __init__(self, timeseries=None):
+        TimeseriesFactory.__init__(self)
+        self.timeseries = timeseries or Stream()
+        self.get_calls = []
+        self.get_observatories_calls = []
+        self.put_calls = []
+
+    def get_timeseries(
+        self,
+        starttime,
+        endtime,
+        observatory=None,
+        channels=None,
+        type=None,
+        interval=None,
+    ):
+        self.get_calls.append((starttime, endtime))
+        timeseries = Stream()
+        for channel in channels or self.channels:
+            timeseries += self.timeseries.select(channel=channel).copy()
+        timeseries.trim(
+            starttime=starttime,
+            endtime=endtime,
+            nearest_sample=False,
+            pad=True,
+            fill_value=numpy.nan,
+        )
+        return timeseries
+
+    def get_timeseries_observatories(self, starttime, endtime, observatories, **kwargs):
+        self.get_observatories_calls.append(list(observatories))
+        return TimeseriesFactory.get_timeseries_observatories(
+            self, starttime, endtime, observatories, **kwargs
+        )
+
+    def put_timeseries(
+        self,
+        timeseries,
+        starttime=None,
+        endtime=None,
+        channels=None,
+        type=None,
+        interval=None,
+    ):
+        self.put_calls.append((starttime, endtime))
+        self.timeseries = TimeseriesUtility.merge_streams(self.timeseries, timeseries)
 
 
 def test_controller():
@@ -33,6 +101,310 @@ def test_controller():
     assert_equal(isinstance(controller._algorithm, Algorithm), True)
 
 
+def test_controller_input_observatories():
+    """Controller_test.test_controller_input_observatories()
+
+    Observatories with the same input interval are requested together.
+    """
+    factory = MockFactory()
+    controller = Controller(factory, MockFactory(), Algorithm())
+    starttime = UTCDateTime("2020-01-01T00:00:00Z")
+    controller._get_input_timeseries(["BOU", "BRW"], ["H"], starttime, starttime + 3600)
+    assert_equal(factory.get_observatories_calls, [["BOU", "BRW"]])
+    assert_equal(len(factory.get_calls), 2)
+
+
+def test_controller_run_chunks():
+    """Controller_test.test_controller_run_chunks()
+
+    Chunked output should match output from processing the entire interval,
+    even when the algorithm needs input from outside each chunk.
+    """
+    input_timeseries = IAGA2002Factory(
+        urlTemplate="file://etc/iaga2002/{OBS}/OneMinute/{obs}{date:%Y%m%d}vmin.min",
+        urlInterval=86400,
+        observatory="BOU",
+        channels=["H", "Z"],
+    ).get_timeseries(
+        starttime=UTCDateTime("2014-11-01T00:00:00Z"),
+        endtime=UTCDateTime("2014-11-01T05:59:00Z"),
+    )
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--observatory",
+            "BOU",
+            "--inchannels",
+            "H",
+            "Z",
+            "--outchannels",
+            "H_DT",
+            "Z_DT",
+            "--starttime",
+            "2014-11-01T01:00:00Z",
+            "--endtime",
+            "2014-11-01T05:59:00Z",
+            "--output",
+            "iaga2002",
+            "--chunk-size",
+            "3600",
+        ]
+    )
+    expected_factory = MockFactory()
+    Controller(
+        MockFactory(input_timeseries),
+        expected_factory,
+        DbDtAlgorithm(period=60),
+    ).run(args)
+    actual_factory = MockFactory()
+    Controller(
+        MockFactory(input_timeseries),
+        actual_factory,
+        DbDtAlgorithm(period=60),
+    ).run_chunks(args)
+    # one put per chunk
+    assert_equal(len(expected_factory.put_calls), 1)
+    assert_equal(
+        actual_factory.put_calls,
+        [
+            (
+                UTCDateTime("2014-11-01T%02d:00:00Z" % hour),
+                UTCDateTime("2014-11-01T%02d:59:00Z" % hour),
+            )
+            for hour in range(1, 6)
+        ],
+    )
+    for channel in ["H_DT", "Z_DT"]:
+        expected = expected_factory.timeseries.select(channel=channel)[0]
+        actual = actual_factory.timeseries.select(channel=channel)[0]
+        assert_equal(actual.stats.starttime, expected.stats.starttime)
+        assert_equal(actual.stats.npts, 300)
+        assert_allclose(actual.data, expected.data)
+
+
+def test_controller_metrics():
+    """Controller_test.test_controller_metrics()
+
+    Controller records time and samples for each stage,
+    and requests and bytes for each factory.
+    """
+    input_timeseries = IAGA2002Factory(
+        urlTemplate="file://etc/iaga2002/{OBS}/OneMinute/{obs}{date:%Y%m%d}vmin.min",
+        urlInterval=86400,
+        observatory="BOU",
+        channels=["H", "Z"],
+    ).get_timeseries(
+        starttime=UTCDateTime("2014-11-01T00:00:00Z"),
+        endtime=UTCDateTime("2014-11-01T01:59:00Z"),
+    )
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--observatory",
+            "BOU",
+            "--inchannels",
+            "H",
+            "Z",
+            "--starttime",
+            "2014-11-01T01:00:00Z",
+            "--endtime",
+            "2014-11-01T01:59:00Z",
+            "--output",
+            "iaga2002",
+            "--rename-output-channel",
+            "H_DT_DT",
+            "H_DDT",
+        ]
+    )
+    controller = Controller(
+        MockFactory(input_timeseries),
+        MockFactory(),
+        PipelineAlgorithm([DbDtAlgorithm(period=60), DbDtAlgorithm(period=60)]),
+    )
+    controller.run(args)
+    metrics = controller.metrics
+    assert_equal(metrics.get("stage_count", stage="input"), 1)
+    assert_equal(metrics.get("stage_count", stage="rename"), 1)
+    assert_equal(metrics.get("stage_count", stage="trim"), 1)
+    assert_equal(metrics.get("stage_count", stage="output"), 1)
+    # each pipeline algorithm is recorded
+    assert_equal(
+        metrics.get("stage_count", stage="process", algorithm="DbDtAlgorithm"), 2
+    )
+    # two channels, with two extra minutes of input for two derivatives
+    assert_equal(metrics.get("stage_samples", stage="input"), 124)
+    assert_equal(metrics.get("stage_samples", stage="output"), 120)
+    assert_equal(
+        metrics.get("factory_requests", factory="MockFactory", operation="get"), 1
+    )
+    assert_equal(
+        metrics.get("factory_bytes", factory="MockFactory", operation="put"), 960
+    )
+
+
+def test_controller_run_as_update():
+    """Controller_test.test_controller_run_as_update()
+
+    Gaps are found by stepping back one interval at a time,
+    then nearby gaps are filled using one input read and one output write,
+    without replacing existing output between gaps.
+    """
+    input_timeseries = IAGA2002Factory(
+        urlTemplate="file://etc/iaga2002/{OBS}/OneMinute/{obs}{date:%Y%m%d}vmin.min",
+        urlInterval=86400,
+        observatory="BOU",
+        channels=["H", "Z"],
+    ).get_timeseries(
+        starttime=UTCDateTime("2014-11-01T00:00:00Z"),
+        endtime=UTCDateTime("2014-11-01T02:59:00Z"),
+    )
+    # existing output differs from input, with gaps
+    # [01:50, 02:10] and [02:30, 02:31]
+    output_timeseries = input_timeseries.copy()
+    for trace in output_timeseries:
+        trace.data = trace.data + 1000
+        trace.data[110:131] = numpy.nan
+        trace.data[150:152] = numpy.nan
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--observatory",
+            "BOU",
+            "--inchannels",
+            "H",
+            "Z",
+            "--starttime",
+            "2014-11-01T02:00:00Z",
+            "--endtime",
+            "2014-11-01T02:59:00Z",
+            "--output",
+            "iaga2002",
+            "--update",
+        ]
+    )
+    args.output_observatory = args.observatory
+    input_factory = MockFactory(input_timeseries)
+    output_factory = MockFactory(output_timeseries)
+    Controller(input_factory, output_factory, Algorithm()).run_as_update(args)
+    # interval starts with a fillable gap, so previous interval is also checked
+    assert_equal(len(output_factory.get_calls), 2)
+    # one read to check start gap, and
+    # gaps in both intervals are close, so one read and write
+    assert_equal(len(input_factory.get_calls), 2)
+    assert_equal(
+        output_factory.put_calls,
+        [(UTCDateTime("2014-11-01T01:50:00Z"), UTCDateTime("2014-11-01T02:31:00Z"))],
+    )
+    for channel in ["H", "Z"]:
+        expected = input_timeseries.select(channel=channel)[0].data
+        actual = output_factory.timeseries.select(channel=channel)[0].data
+        # gaps are filled
+        assert_allclose(actual[110:131], expected[110:131])
+        assert_allclose(actual[150:152], expected[150:152])
+        # existing data is not replaced
+        assert_allclose(actual[:110], expected[:110] + 1000)
+        assert_allclose(actual[131:150], expected[131:150] + 1000)
+        assert_allclose(actual[152:], expected[152:] + 1000)
+
+
+def test_controller_run_as_update_empty():
+    """Controller_test.test_controller_run_as_update_empty()
+
+    Without input, the interval cannot be filled,
+    so previous intervals are not checked.
+    """
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--observatory",
+            "BOU",
+            "--inchannels",
+            "H",
+            "Z",
+            "--starttime",
+            "2014-11-01T02:00:00Z",
+            "--endtime",
+            "2014-11-01T02:59:00Z",
+            "--output",
+            "iaga2002",
+            "--update",
+        ]
+    )
+    args.output_observatory = args.observatory
+    input_factory = MockFactory()
+    output_factory = MockFactory()
+    Controller(input_factory, output_factory, Algorithm()).run_as_update(args)
+    assert_equal(
+        output_factory.get_calls,
+        [(UTCDateTime("2014-11-01T02:00:00Z"), UTCDateTime("2014-11-01T02:59:00Z"))],
+    )
+    assert_equal(output_factory.put_calls, [])
+
+
+def test_controller_run_as_update_limit():
+    """Controller_test.test_controller_run_as_update_limit()
+
+    With an update limit, output for all intervals is read at once.
+    """
+    input_timeseries = IAGA2002Factory(
+        urlTemplate="file://etc/iaga2002/{OBS}/OneMinute/{obs}{date:%Y%m%d}vmin.min",
+        urlInterval=86400,
+        observatory="BOU",
+        channels=["H", "Z"],
+    ).get_timeseries(
+        starttime=UTCDateTime("2014-11-01T00:00:00Z"),
+        endtime=UTCDateTime("2014-11-01T02:59:00Z"),
+    )
+    # existing output differs from input, with gaps
+    # [01:50, 02:10] and [02:30, 02:31]
+    output_timeseries = input_timeseries.copy()
+    for trace in output_timeseries:
+        trace.data = trace.data + 1000
+        trace.data[110:131] = numpy.nan
+        trace.data[150:152] = numpy.nan
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--observatory",
+            "BOU",
+            "--inchannels",
+            "H",
+            "Z",
+            "--starttime",
+            "2014-11-01T02:00:00Z",
+            "--endtime",
+            "2014-11-01T02:59:00Z",
+            "--output",
+            "iaga2002",
+            "--update",
+            "--update-limit",
+            "3",
+        ]
+    )
+    args.output_observatory = args.observatory
+    input_factory = MockFactory(input_timeseries)
+    output_factory = MockFactory(output_timeseries)
+    Controller(input_factory, output_factory, Algorithm()).run_as_update(args)
+    # all three intervals read at once
+    assert_equal(
+        output_factory.get_calls[0],
+        (UTCDateTime("2014-11-01T00:02:00Z"), UTCDateTime("2014-11-01T02:59:00Z")),
+    )
+    assert_equal(len(output_factory.get_calls), 1)
+    # one read to check start gap, and
+    # gaps in both intervals are close, so one read and write
+    assert_equal(len(input_factory.get_calls), 2)
+    assert_equal(
+        output_factory.put_calls,
+        [(UTCDateTime("2014-11-01T01:50:00Z"), UTCDateTime("2014-11-01T02:31:00Z"))],
+    )
+
+
 def test_controller_update_sqdist():
     """Controller_test.test_controller_update_sqdist().
 
@@ -211,3 +583,156 @@ def test_controller_update_sqdist():
     )
     expected = expected_factory.get_timeseries(starttime=starttime1, endtime=endtime6)
     assert_allclose(actual, expected)
+
+
+def test_parse_args_algorithms():
+    """Controller_test.test_parse_args_algorithms()
+
+    Only selected algorithms add arguments,
+    unless arguments for other algorithms are used.
+    """
+    common = ["--input", "iaga2002", "--output", "iaga2002", "--observatory", "BOU"]
+    assert_equal(get_algorithm_names(common), ["identity"])
+    assert_equal(
+        get_algorithm_names(common + ["--algorithm", "xyz", "dbdt"]), ["dbdt", "xyz"]
+    )
+    assert_equal(len(get_algorithm_names(common + ["--help"])), len(algorithms))
+    args = parse_args(common + ["--algorithm", "xyz"])
+    assert_equal(args.xyz_from, "obs")
+    assert_equal(hasattr(args, "sqdist_alpha"), False)
+    args = parse_args(common + ["--algorithm", "xyz", "--sqdist-alpha", "0.5"])
+    assert_equal(args.sqdist_alpha, 0.5)
+    with pytest.raises(SystemExit):
+        parse_args(common + ["--not-an-argument"])
+
+
+def test_import_controller():
+    """Controller_test.test_import_controller()
+
+    Edge factories and plotting are not imported until they are used.
+    """
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import sys, geomagio.Controller; print(sorted(sys.modules))",
+        ]
+    ).decode()
+    for module in ["geomagio.edge", "geomagio.edge.EdgeFactory", "matplotlib"]:
+        assert_equal("'{}'".format(module) in output, False)
+
+
+def test_run_observatories():
+    """Controller_test.test_run_observatories()
+
+    Process multiple observatories in parallel using --observatory-foreach
+    and --jobs, and verify each observatory is processed separately.
+    """
+    tmp_dir = gettempdir()
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--input-url",
+            "file://etc/iaga2002/{OBS}/OneMinute/{obs}{date:%Y%m%d}vmin.min",
+            "--observatory",
+            "BOU",
+            "XXX",
+            "--observatory-foreach",
+            "--jobs",
+            "2",
+            "--inchannels",
+            "H",
+            "D",
+            "Z",
+            "F",
+            "--interval",
+            "minute",
+            "--starttime",
+            "2014-11-01T00:00:00Z",
+            "--endtime",
+            "2014-11-01T00:59:00Z",
+            "--output",
+            "iaga2002",
+            "--output-url",
+            "file://" + tmp_dir + "/{obs}{date:%Y%m%d}_jobs_{t}{i}.{i}",
+        ]
+    )
+    args.output_observatory = args.observatory
+    results = run_observatories(args)
+    # results are reported per observatory, in order
+    assert_equal([obs for obs, _ in results], ["BOU", "XXX"])
+    assert_equal([e for _, e in results], [None, None])
+    # args are not modified by workers
+    assert_equal(args.observatory, ["BOU", "XXX"])
+    actual = IAGA2002Factory(
+        urlTemplate="file://" + tmp_dir + "/{obs}{date:%Y%m%d}_jobs_{t}{i}.{i}",
+        urlInterval=86400,
+        observatory="BOU",
+        channels=["H", "D", "Z", "F"],
+    ).get_timeseries(
+        starttime=UTCDateTime("2014-11-01T00:00:00Z"),
+        endtime=UTCDateTime("2014-11-01T00:59:00Z"),
+    )
+    assert_equal(len(actual), 4)
+    assert_equal(actual[0].stats.npts, 60)
+
+
+def test_get_next_tick():
+    """Controller_test.test_get_next_tick()"""
+    assert_equal(get_next_tick(120, 60), 180)
+    assert_equal(get_next_tick(121.5, 60), 180)
+    assert_equal(get_next_tick(179.9, 60), 180)
+    assert_equal(get_next_tick(5, 10), 10)
+
+
+def test_run_daemon(monkeypatch):
+    """Controller_test.test_run_daemon()
+
+    Daemon mode should reuse the same controller for each run,
+    and wait until the next aligned tick between runs.
+    """
+    runs = []
+    sleeps = []
+
+    class StopDaemon(Exception):
+        pass
+
+    def fake_run(self, options, input_timeseries=None):
+        runs.append((self, options.starttime, options.endtime))
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise StopDaemon()
+
+    monkeypatch.setattr(Controller, "run", fake_run)
+    monkeypatch.setattr(time, "sleep", fake_sleep)
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--input-url",
+            "file://etc/iaga2002/{OBS}/OneMinute/{obs}{date:%Y%m%d}vmin.min",
+            "--observatory",
+            "BOU",
+            "--output",
+            "iaga2002",
+            "--output-url",
+            "file://" + gettempdir() + "/{obs}{date:%Y%m%d}_daemon_{t}{i}.{i}",
+            "--realtime",
+            "600",
+            "--daemon",
+            "--daemon-interval",
+            "60",
+        ]
+    )
+    with pytest.raises(StopDaemon):
+        main(args)
+    assert_equal(len(runs), 2)
+    # controller is created once
+    assert_equal(runs[0][0] is runs[1][0], True)
+    for _, starttime, endtime in runs:
+        assert_equal(endtime - starttime, 600)
+    for seconds in sleeps:
+        assert_equal(0 <= seconds <= 60, True)
@@ -0,0 +1,100 @@
+"""Tests for FixedWidth.py"""
+from datetime import datetime
+
+import numpy
+from numpy.testing import assert_equal
+
+from geomagio import FixedWidth
+
+
+def _get_strings(chars):
+    return [bytes(row).decode("ascii") for row in chars]
+
+
+def test_format_decimals():
+    """FixedWidth_test.test_format_decimals()"""
+    values = numpy.concatenate(
+        [
+            numpy.random.RandomState(0).uniform(-99999, 999999, 1000),
+            # negative zero, halfway values, and rounding to more digits
+            [0, -0.0, -0.001, 0.125, 2.675, 1.005, 99.995, -9999.999, 999999.99],
+        ]
+    )
+    assert_equal(
+        _get_strings(FixedWidth.format_decimals(values, 9, 2)),
+        ["%9.2f" % value for value in values],
+    )
+    assert_equal(
+        _get_strings(FixedWidth.format_decimals([1.5, 2.5, -12], 4, 0)),
+        ["   2", "   2", " -12"],
+    )
+    # values that do not fit
+    assert_equal(FixedWidth.format_decimals([1000000], 9, 2), None)
+    assert_equal(FixedWidth.format_decimals([-100000], 9, 2), None)
+    assert_equal(FixedWidth.format_decimals([-99999.999], 9, 2), None)
+    assert_equal(FixedWidth.format_decimals([numpy.nan], 9, 2), None)
+
+
+def test_format_digits():
+    """FixedWidth_test.test_format_digits()"""
+    assert_equal(
+        _get_strings(FixedWidth.format_digits([0, 7, 123], 3)), ["000", "007", "123"]
+    )
+
+
+def test_get_lines():
+    """FixedWidth_test.test_get_lines()"""
+    for data in ["ab\ncd\n", "ab\r\ncd", "ab\ncd\n"]:
+        assert_equal(_get_strings(FixedWidth.get_lines(data)), ["ab", "cd"])
+    # shorter lines are padded
+    assert_equal(_get_strings(FixedWidth.get_lines("abc\nd\n", 4)), ["abc ", "d   "])
+    assert_equal(FixedWidth.get_lines(""), None)
+    assert_equal(FixedWidth.get_lines("°\n"), None)
+
+
+def test_get_sample_times():
+    """FixedWidth_test.test_get_sample_times()"""
+    starttime = 1577836800.3
+    times = FixedWidth.get_sample_times(starttime, 0.1, 5, 100)
+    assert_equal(
+        times.tolist(),
+        [datetime.utcfromtimestamp(starttime + i * 0.1) for i in range(5, 100)],
+    )
+    fields = FixedWidth.get_time_fields(times[-1:])
+    assert_equal(
+        [fields[key][0] for key in ["year", "month", "day", "day_of_year"]],
+        [2020, 1, 1, 1],
+    )
+    assert_equal(
+        [fields[key][0] for key in ["hour", "minute", "second", "microsecond"]],
+        [0, 0, 10, 200000],
+    )
+
+
+def test_join_columns():
+    """FixedWidth_test.test_join_columns()"""
+    assert_equal(
+        FixedWidth.join_columns(
+            2,
+            [
+                FixedWidth.format_digits([1, 2], 2),
+                " ",
+                FixedWidth.format_digits([3, 4], 1),
+                "\n",
+            ],
+        ),
+        b"01 3\n02 4\n",
+    )
+
+
+def test_parse_decimals():
+    """FixedWidth_test.test_parse_decimals()"""
+    values = ["  -12.50", "99999.00", "    0.01", "   -0.00"]
+    chars = FixedWidth.get_lines("\n".join(values))
+    assert_equal(FixedWidth.parse_decimals(chars), [float(v) for v in values])
+    assert_equal(
+        FixedWidth.parse_decimals(FixedWidth.get_lines("  12\n  -3")), [12, -3]
+    )
+    # not plain decimals, or decimal points that are not aligned
+    for data in ["1.5e+01", " 1 2.0", "--1.0", "1-2.0", "   ", "1.25\n12.5"]:
+        assert_equal(FixedWidth.parse_decimals(FixedWidth.get_lines(data)), None)
@@ -0,0 +1,78 @@
+"""Tests for Metrics.py"""
+import json
+import os
+from tempfile import mkdtemp
+
+from numpy.testing import assert_equal
+
+from geomagio.Metrics import Metrics
+
+
+def test_increment():
+    """Metrics_test.test_increment()
+
+    Values with the same name and labels are added together.
+    """
+    metrics = Metrics()
+    metrics.increment("requests")
+    metrics.increment("requests", 2)
+    metrics.increment("requests", factory="EdgeFactory")
+    assert_equal(metrics.get("requests"), 3)
+    assert_equal(metrics.get("requests", factory="EdgeFactory"), 1)
+    assert_equal(metrics.get("requests", factory="MiniSeedFactory"), 0)
+
+
+def test_timer():
+    """Metrics_test.test_timer()
+
+    Timer records seconds and count, even when an exception is raised.
+    """
+    metrics = Metrics()
+    with metrics.timer("stage", stage="input"):
+        pass
+    try:
+        with metrics.timer("stage", stage="input"):
+            raise ValueError()
+    except ValueError:
+        pass
+    assert_equal(metrics.get("stage_count", stage="input"), 2)
+    assert_equal(metrics.get("stage_seconds", stage="input") >= 0, True)
+
+
+def test_write_file():
+    """Metrics_test.test_write_file()
+
+    json appends one line per call, prometheus replaces the file.
+    """
+    metrics = Metrics(labels={"observatory": "BOU"})
+    metrics.increment("stage_samples", 10, stage="input")
+    metrics.increment("factory_requests", 1, factory="EdgeFactory")
+    metrics.increment("stage_samples", 5, stage="output")
+    directory = mkdtemp()
+    json_file = os.path.join(directory, "metrics.json")
+    metrics.write_file(json_file)
+    metrics.write_file(json_file)
+    with open(json_file) as f:
+        lines = f.readlines()
+    assert_equal(len(lines), 2)
+    assert_equal(
+        json.loads(lines[0])["metrics"][0],
+        {
+            "name": "stage_samples",
+            "labels": {"observatory": "BOU", "stage": "input"},
+            "value": 10,
+        },
+    )
+    prom_file = os.path.join(directory, "metrics.prom")
+    metrics.write_file(prom_file, format="prometheus")
+    metrics.write_file(prom_file, format="prometheus")
+    with open(prom_file) as f:
+        assert_equal(
+            f.read(),
+            "# TYPE geomag_stage_samples gauge\n"
+            'geomag_stage_samples{observatory="BOU",stage="input"} 10\n'
+            'geomag_stage_samples{observatory="BOU",stage="output"} 5\n'
+            "# TYPE geomag_factory_requests gauge\n"
+            'geomag_factory_requests{factory="EdgeFactory",observatory="BOU"} 1\n',
+        )
+    assert_equal(sorted(os.listdir(directory)), ["metrics.json", "metrics.prom"])
@@ -0,0 +1,24 @@
+"""Tests for Registry.py"""
+from numpy.testing import assert_equal
+import pytest
+
+from geomagio.edge import EdgeFactory
+from geomagio.Registry import Registry
+
+
+def test_registry():
+    """Registry_test.test_registry()
+
+    Modules are not imported until a name is used.
+    """
+    registry = Registry(
+        {"edge": "geomagio.edge:EdgeFactory", "missing": "geomagio.missing:Missing"}
+    )
+    assert_equal(list(registry), ["edge", "missing"])
+    assert_equal("missing" in registry, True)
+    assert_equal(registry.get_path("missing"), "geomagio.missing:Missing")
+    assert_equal(registry["edge"], EdgeFactory)
+    with pytest.raises(ImportError):
+        registry["missing"]
+    with pytest.raises(KeyError):
+        registry["other"]
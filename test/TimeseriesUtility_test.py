@@ -100,6 +100,22 @@ def test_create_empty_trace():
     assert_equal(short_trace.stats.endtime, short_trace.stats.starttime)
 
 
+def test_fill_outside_gaps():
+    """TimeseriesUtility_test.test_fill_outside_gaps()"""
+    starttime = UTCDateTime("2018-01-01")
+    trace = _create_trace([1, 2, 3, 4, 5, 6, 7], "H", starttime)
+    timeseries = Stream(trace)
+    gaps = [
+        [starttime + 60, starttime + 120, starttime + 180],
+        [starttime + 300, starttime + 300, starttime + 360],
+    ]
+    TimeseriesUtility.fill_outside_gaps(timeseries, gaps)
+    assert_array_equal(
+        timeseries[0].data,
+        [numpy.nan, 2, 3, numpy.nan, numpy.nan, 6, numpy.nan],
+    )
+
+
 def test_get_stream_gaps():
     """TimeseriesUtility_test.test_get_stream_gaps()
 
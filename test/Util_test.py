@@ -69,3 +69,16 @@ def test_get_interval__trim():
     endtime = UTCDateTime("2015-01-02T00:00:00Z")
     intervals = Util.get_intervals(starttime, endtime, trim=True)
     assert_equal(intervals[0]["start"], starttime)
+
+
+def test_map_concurrent():
+    """Util_test.test_map_concurrent()"""
+    items = [3, 1, 2]
+    assert_equal(Util.map_concurrent(lambda x: x * 2, items), [6, 2, 4])
+    assert_equal(Util.map_concurrent(lambda x: x * 2, items, 3), [6, 2, 4])
+    # exceptions are raised
+    try:
+        Util.map_concurrent(lambda x: 1 / (x - 1), items, 3)
+        assert False, "expected exception"
+    except ZeroDivisionError:
+        pass
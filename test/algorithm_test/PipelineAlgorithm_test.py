@@ -0,0 +1,105 @@
+from numpy.testing import assert_almost_equal, assert_equal
+from obspy import UTCDateTime
+
+from geomagio.algorithm import (
+    DbDtAlgorithm,
+    FilterAlgorithm,
+    PipelineAlgorithm,
+    XYZAlgorithm,
+)
+from geomagio.Controller import get_algorithm, parse_args
+import geomagio.iaga2002 as i2
+
+
+def test_process():
+    """algorithm_test.PipelineAlgorithm_test.test_process()
+
+    Pipeline output should match running each algorithm in order.
+    """
+    with open("etc/iaga2002/BOU/OneMinute/bou20141101vmin.min") as f:
+        hdzf = i2.IAGA2002Factory().parse_string(f.read())
+    pipeline = PipelineAlgorithm(
+        [XYZAlgorithm(informat="obsd", outformat="geo"), DbDtAlgorithm(period=60)]
+    )
+    result = pipeline.process(hdzf)
+    expected = DbDtAlgorithm(period=60).process(
+        XYZAlgorithm(informat="obsd", outformat="geo").process(hdzf)
+    )
+    for channel in ["X_DT", "Y_DT", "Z_DT", "F_DT"]:
+        assert_almost_equal(
+            result.select(channel=channel)[0].data,
+            expected.select(channel=channel)[0].data,
+        )
+    assert_equal(pipeline.get_input_channels(), ["H", "D", "Z", "F"])
+    assert_equal(pipeline.get_next_starttime(), None)
+
+
+def test_get_input_interval():
+    """algorithm_test.PipelineAlgorithm_test.test_get_input_interval()
+
+    Input interval is chained from the last algorithm to the first.
+    """
+    pipeline = PipelineAlgorithm(
+        [
+            FilterAlgorithm(input_sample_period=1.0, output_sample_period=60.0),
+            DbDtAlgorithm(period=60),
+        ]
+    )
+    start, end = pipeline.get_input_interval(
+        start=UTCDateTime("2020-05-01T01:00:00Z"),
+        end=UTCDateTime("2020-05-01T01:59:00Z"),
+    )
+    # dbdt needs the previous minute,
+    # and the filter needs 45 seconds around each minute
+    assert_equal(start, UTCDateTime("2020-05-01T00:58:15Z"))
+    assert_equal(end, UTCDateTime("2020-05-01T01:59:45Z"))
+
+
+def test_configure():
+    """algorithm_test.PipelineAlgorithm_test.test_configure()
+
+    Each algorithm receives the previous algorithm output channels,
+    and only the last algorithm uses --outchannels.
+    """
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--output",
+            "iaga2002",
+            "--observatory",
+            "BOU",
+            "--algorithm",
+            "xyz",
+            "filter",
+            "dbdt",
+            "--xyz-from",
+            "obs",
+            "--xyz-to",
+            "geo",
+            "--inchannels",
+            "H",
+            "E",
+            "Z",
+            "F",
+            "--outchannels",
+            "X_DT",
+            "Y_DT",
+            "--input-interval",
+            "second",
+            "--interval",
+            "minute",
+        ]
+    )
+    pipeline = get_algorithm(args)
+    assert_equal(isinstance(pipeline, PipelineAlgorithm), True)
+    xyz, filter, dbdt = pipeline.algorithms
+    assert_equal(filter.get_input_channels(), ["X", "Y", "Z", "F"])
+    assert_equal(filter.get_output_channels(), ["X", "Y", "Z", "F"])
+    assert_equal(filter.input_sample_period, 1.0)
+    assert_equal(filter.output_sample_period, 60.0)
+    assert_equal(dbdt.period, 60)
+    assert_equal(pipeline.get_input_channels(), ["H", "E", "Z", "F"])
+    # a single algorithm is not wrapped
+    args.algorithm = ["xyz"]
+    assert_equal(isinstance(get_algorithm(args), XYZAlgorithm), True)
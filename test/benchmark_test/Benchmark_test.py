@@ -0,0 +1,26 @@
+from numpy.testing import assert_equal
+
+from geomagio.benchmark import BENCHMARKS, compare_results, run_benchmarks
+
+
+def test_run_benchmarks():
+    """benchmark_test.Benchmark_test.test_run_benchmarks()
+
+    Every benchmark runs, using a small amount of data.
+    """
+    results = run_benchmarks(scale=0.001, repeat=1)
+    assert_equal(list(results["results"]), list(BENCHMARKS))
+    assert_equal(results["environment"]["scale"], 0.001)
+    for result in results["results"].values():
+        assert_equal(result["samples"] > 0, True)
+        assert_equal(result["seconds"] >= 0, True)
+
+
+def test_compare_results():
+    """benchmark_test.Benchmark_test.test_compare_results()
+
+    Ratios are only calculated for benchmarks in both results.
+    """
+    baseline = {"results": {"a": {"seconds": 2.0}, "b": {"seconds": 1.0}}}
+    current = {"results": {"a": {"seconds": 3.0}, "c": {"seconds": 1.0}}}
+    assert_equal(compare_results(baseline, current), {"a": 1.5})
@@ -0,0 +1,103 @@
+import numpy
+from numpy.testing import assert_almost_equal, assert_equal
+from obspy.core import UTCDateTime
+
+from geomagio.benchmark import EdgeServer, get_synthetic_stream
+from geomagio.edge import EdgeFactory, MiniSeedFactory
+
+STARTTIME = UTCDateTime("2020-01-01T00:00:00Z")
+
+
+def test_edge_factory():
+    """benchmark_test.EdgeServer_test.test_edge_factory()
+
+    Data written using raw input is read using waveserver protocol.
+    """
+    stream = get_synthetic_stream(
+        STARTTIME, STARTTIME + 3 * 3600 - 1, interval="second", observatory="BOU"
+    )
+    with EdgeServer() as server:
+        factory = EdgeFactory(
+            host=server.host,
+            port=server.waveserver_port,
+            write_port=server.raw_input_port,
+        )
+        factory.put_timeseries(
+            stream, channels=["H", "E"], type="variation", interval="second"
+        )
+        assert_equal(server.wait_for_inputs(), True)
+        result = factory.get_timeseries(
+            STARTTIME,
+            STARTTIME + 3 * 3600 - 1,
+            observatory="BOU",
+            channels=["H", "E", "Z"],
+            type="variation",
+            interval="second",
+        )
+    for channel in ["H", "E"]:
+        trace = result.select(channel=channel)[0]
+        assert_equal(trace.stats.starttime, STARTTIME)
+        assert_almost_equal(
+            trace.data, stream.select(channel=channel)[0].data, decimal=3
+        )
+    # not written
+    assert_equal(numpy.isnan(result.select(channel="Z")[0].data).all(), True)
+
+
+def test_miniseed_factory():
+    """benchmark_test.EdgeServer_test.test_miniseed_factory()
+
+    Data written using miniseed input is read using query protocol.
+    """
+    stream = get_synthetic_stream(
+        STARTTIME,
+        STARTTIME + 3600 - 1,
+        interval="second",
+        channels=["H", "Z"],
+        observatory="BOU",
+    )
+    with EdgeServer() as server:
+        factory = MiniSeedFactory(
+            host=server.host,
+            port=server.query_port,
+            write_port=server.miniseed_input_port,
+        )
+        factory.put_timeseries(
+            stream, channels=["H", "Z"], type="variation", interval="second"
+        )
+        # wait for data to be sent
+        factory.close()
+        assert_equal(server.wait_for_inputs(), True)
+        result = factory.get_timeseries(
+            STARTTIME,
+            STARTTIME + 3600 - 1,
+            observatory="BOU",
+            channels=["H", "Z"],
+            type="variation",
+            interval="second",
+        )
+    for channel in ["H", "Z"]:
+        assert_almost_equal(
+            result.select(channel=channel)[0].data,
+            stream.select(channel=channel)[0].data,
+        )
+
+
+def test_failure_rate():
+    """benchmark_test.EdgeServer_test.test_failure_rate()
+
+    Failed connections are counted, and reads return no data.
+    """
+    with EdgeServer(failure_rate=1) as server:
+        server.add_stream(
+            get_synthetic_stream(
+                STARTTIME, STARTTIME + 599, interval="second", channels=["H"]
+            )
+        )
+        factory = EdgeFactory(host=server.host, port=server.waveserver_port)
+        result = factory.client.get_waveforms(
+            "", "SYN", "", "H", STARTTIME, STARTTIME + 599
+        )
+    assert_equal(len(result), 0)
+    assert_equal(server.stats["connections"], 1)
+    assert_equal(server.stats["failures"], 1)
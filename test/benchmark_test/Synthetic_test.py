@@ -0,0 +1,40 @@
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import UTCDateTime
+
+from geomagio.benchmark import get_synthetic_stream
+
+
+def test_get_synthetic_stream():
+    """benchmark_test.Synthetic_test.test_get_synthetic_stream()
+
+    Generated data is deterministic, and has the requested shape.
+    """
+    kwargs = {
+        "starttime": UTCDateTime("2020-01-01T00:00:00Z"),
+        "endtime": UTCDateTime("2020-01-01T00:59:59.9Z"),
+        "interval": "tenhertz",
+        "channels": ["H", "Z"],
+        "gap_density": 0.1,
+        "gap_length": 10,
+    }
+    stream = get_synthetic_stream(**kwargs)
+    assert_equal(len(stream), 2)
+    for trace in stream:
+        assert_equal(trace.stats.npts, 36000)
+        assert_equal(trace.stats.delta, 0.1)
+        # gaps may overlap
+        gaps = numpy.isnan(trace.data).sum()
+        assert_equal(2000 < gaps <= 3600, True)
+    assert_equal(stream.select(channel="H")[0].stats.data_interval, "tenhertz")
+    numpy.testing.assert_array_equal(
+        get_synthetic_stream(**kwargs)[0].data, stream[0].data
+    )
+    assert_equal(
+        numpy.array_equal(
+            get_synthetic_stream(seed=1, **kwargs)[0].data,
+            stream[0].data,
+            equal_nan=True,
+        ),
+        False,
+    )
@@ -1,8 +1,13 @@
 """Tests for EdgeFactory.py"""
+import threading
+import time
 
+import numpy
 from obspy.core import Stream, Trace, UTCDateTime
 from geomagio.edge import EdgeFactory
+from geomagio import TimeseriesFactoryException
 from numpy.testing import assert_equal
+import pytest
 
 
 def test__get_edge_network():
@@ -60,6 +65,107 @@ def test__set_metadata():
     assert_equal(stream[1].stats["channel"], "H")
 
 
+class MockWaveformClient(object):
+    """Client that tracks how many requests are made at the same time."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def get_waveforms(self, network, station, location, channel, starttime, endtime):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.active, self.max_active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        npts = int((endtime - starttime) / 60) + 1
+        return Stream(
+            Trace(
+                numpy.full(npts, 1000, dtype="i4"),
+                {
+                    "network": network,
+                    "station": station,
+                    "location": location,
+                    "channel": channel,
+                    "starttime": starttime,
+                    "delta": 60,
+                },
+            )
+        )
+
+
+def test_get_timeseries_concurrency():
+    """edge_test.EdgeFactory_test.test_get_timeseries_concurrency()"""
+    channels = ["H", "E", "Z", "F"]
+    starttime = UTCDateTime("2020-01-01T00:00:00Z")
+    endtime = UTCDateTime("2020-01-01T00:59:00Z")
+    for concurrency, expected_active in [(1, 1), (2, 2), (8, 4)]:
+        factory = EdgeFactory(concurrency=concurrency)
+        factory.client = MockWaveformClient()
+        timeseries = factory.get_timeseries(
+            starttime, endtime, "BOU", channels, "variation", "minute"
+        )
+        assert_equal(factory.client.max_active, expected_active)
+        # channels are returned in requested order
+        assert_equal([t.stats.channel for t in timeseries], channels)
+        assert_equal(timeseries[0].data[0], 1.0)
+
+
+class MockPutEdgeFactory(EdgeFactory):
+    """EdgeFactory that records channels written, and fails for "E"."""
+
+    def __init__(self, **kwargs):
+        EdgeFactory.__init__(self, **kwargs)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.written = []
+
+    def _put_channel(
+        self, timeseries, observatory, channel, type, interval, starttime, endtime
+    ):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+            self.written.append(channel)
+        if channel == "E":
+            raise TimeseriesFactoryException("unable to write")
+
+
+def test_put_timeseries_concurrency():
+    """edge_test.EdgeFactory_test.test_put_timeseries_concurrency()"""
+    channels = ["H", "E", "Z", "F"]
+    timeseries = Stream(
+        [
+            Trace(
+                numpy.ones(60),
+                {
+                    "channel": channel,
+                    "starttime": UTCDateTime("2020-01-01T00:00:00Z"),
+                    "delta": 60,
+                    "station": "BOU",
+                },
+            )
+            for channel in channels
+        ]
+    )
+    for concurrency, expected_active in [(1, 1), (8, 4)]:
+        factory = MockPutEdgeFactory(concurrency=concurrency)
+        # all channels are written, and errors are reported
+        with pytest.raises(TimeseriesFactoryException, match='"E"'):
+            factory.put_timeseries(
+                timeseries, channels=channels, type="variation", interval="minute"
+            )
+        assert_equal(sorted(factory.written), sorted(channels))
+        assert_equal(factory.max_active, expected_active)
+
+
 # def test_get_timeseries():
 def dont_get_timeseries():
     """edge_test.EdgeFactory_test.test_get_timeseries()"""
@@ -85,3 +191,23 @@ def dont_get_timeseries():
         "H",
         "Expect timeseries stats channel to be equal to H",
     )
+
+
+def test_get_edge_sncls():
+    """edge_test.EdgeFactory_test.test_get_edge_sncls()"""
+    factory = EdgeFactory()
+    items = [
+        ("BOU", "H", "variation", "minute"),
+        ("BOU", "DST", "definitive", "hour"),
+        ("BOU", "E-N", "quasi-definitive", "second"),
+    ]
+    sncls = factory.get_edge_sncls(items)
+    assert_equal(
+        sncls,
+        [
+            ("NT", "BOU", "R0", "MVH"),
+            ("NT", "BOU", "D0", "HGD"),
+            ("NT", "BOU", "Q0", "SQN"),
+        ],
+    )
+    assert_equal(factory.parse_edge_sncls(sncls), items)
@@ -1,5 +1,8 @@
 """Tests for MiniSeedFactory.py"""
 
+import threading
+import time
+
 import numpy
 from numpy.testing import assert_equal
 from obspy.core import Stats, Stream, Trace, UTCDateTime
@@ -58,11 +61,15 @@ def test__get_interval_code():
 class MockMiniSeedInputClient(object):
     def __init__(self):
         self.close_called = False
+        self.flush_called = 0
         self.last_sent = None
 
     def close(self):
         self.close_called = True
 
+    def flush(self):
+        self.flush_called += 1
+
     def send(self, stream):
         self.last_sent = stream
 
@@ -74,8 +81,9 @@ def test__put_timeseries():
     factory = MiniSeedFactory()
     factory.write_client = client
     factory.put_timeseries(Stream(trace1), channels=("H"))
-    # put timeseries should call close when done
-    assert_equal(client.close_called, True)
+    # put timeseries waits for data to be sent, and leaves client open
+    assert_equal(client.flush_called, 2)
+    assert_equal(client.close_called, False)
     # trace should be split in 2 blocks at gap
     sent = client.last_sent
     assert_equal(len(sent), 2)
@@ -88,6 +96,23 @@ def test__put_timeseries():
     assert_equal(len(sent[1]), 5)
     assert_equal(sent[1].stats.starttime, trace1.stats.starttime + 5)
     assert_equal(sent[1].stats.endtime, trace1.stats.endtime)
+    # close waits for data to be sent
+    factory.close()
+    assert_equal(client.close_called, True)
+
+
+def test__put_timeseries_async():
+    """edge_test.MiniSeedFactory_test.test__put_timeseries_async()"""
+    trace1 = __create_trace([0, 1, 2], channel="H")
+    client = MockMiniSeedInputClient()
+    factory = MiniSeedFactory(write_async=True)
+    factory.write_client = client
+    factory.put_timeseries(Stream(trace1), channels=("H"))
+    # only waits for previous put
+    assert_equal(client.flush_called, 1)
+    assert_equal(len(client.last_sent), 1)
+    factory.close()
+    assert_equal(client.close_called, True)
 
 
 def test__set_metadata():
@@ -102,6 +127,129 @@ def test__set_metadata():
     assert_equal(stream[1].stats["channel"], "H")
 
 
+class MockWaveformClient(object):
+    """Client that tracks how many requests are made at the same time."""
+
+    def __init__(self, delay=0.05, delta=60):
+        self.delay = delay
+        self.delta = delta
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def get_waveforms(self, network, station, location, channel, starttime, endtime):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.active, self.max_active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        npts = int(round((endtime - starttime) / self.delta)) + 1
+        return Stream(
+            Trace(
+                numpy.full(npts, 1000, dtype="i4"),
+                {
+                    "network": network,
+                    "station": station,
+                    "location": location,
+                    "channel": channel,
+                    "starttime": starttime,
+                    "delta": self.delta,
+                },
+            )
+        )
+
+
+def test_get_timeseries_concurrency():
+    """edge_test.MiniSeedFactory_test.test_get_timeseries_concurrency()"""
+    channels = ["H", "E", "Z", "F"]
+    starttime = UTCDateTime("2020-01-01T00:00:00Z")
+    endtime = UTCDateTime("2020-01-01T00:59:00Z")
+    for concurrency, expected_active in [(1, 1), (2, 2), (8, 4)]:
+        factory = MiniSeedFactory(concurrency=concurrency)
+        factory.client = MockWaveformClient()
+        timeseries = factory.get_timeseries(
+            starttime, endtime, "BOU", channels, "variation", "minute"
+        )
+        assert_equal(factory.client.max_active, expected_active)
+        # channels are returned in requested order
+        assert_equal([t.stats.channel for t in timeseries], channels)
+        assert_equal(timeseries[0].data[0], 1000)
+
+
+class MockComponentClient(MockWaveformClient):
+    """Client that records requested channels, with a gap in "BEU"."""
+
+    def __init__(self, delta=60):
+        MockWaveformClient.__init__(self, delay=0, delta=delta)
+        self.requested = []
+
+    def get_waveforms(self, network, station, location, channel, starttime, endtime):
+        self.requested.append(channel)
+        stream = MockWaveformClient.get_waveforms(
+            self, network, station, location, channel, starttime, endtime
+        )
+        if channel == "BEU":
+            # missing last sample
+            stream[0].data = stream[0].data[:-1]
+        return stream
+
+
+def test_get_timeseries_convert_channels():
+    """edge_test.MiniSeedFactory_test.test_get_timeseries_convert_channels()"""
+    starttime = UTCDateTime("2020-01-01T00:00:00Z")
+    endtime = UTCDateTime("2020-01-01T00:00:00.9Z")
+    factory = MiniSeedFactory(convert_channels=["U", "V", "W"], concurrency=4)
+    factory.client = MockComponentClient(delta=0.1)
+    timeseries = factory.get_timeseries(
+        starttime, endtime, "BRT", ["H", "U", "V", "W"], "variation", "tenhertz"
+    )
+    assert_equal([t.stats.channel for t in timeseries], ["H", "U", "V", "W"])
+    # each component requested once
+    assert_equal(
+        sorted(factory.client.requested),
+        ["BEU", "BEV", "BEW", "BYU", "BYV", "BYW", "H"],
+    )
+    # sum of scaled components
+    assert_equal(timeseries.select(channel="V")[0].data[0], 1000 * 100 + 1000 * 505.6)
+    # gap in any component is a gap in channel
+    u = timeseries.select(channel="U")[0].data
+    assert_equal(len(u), 10)
+    assert_equal(numpy.isnan(u).tolist(), [False] * 9 + [True])
+
+
+def test__calculate_channels():
+    """edge_test.MiniSeedFactory_test.test__calculate_channels()"""
+    starttime = UTCDateTime("2020-01-01T00:00:00Z")
+    endtime = UTCDateTime("2020-01-01T00:09:00Z")
+    factory = MiniSeedFactory()
+    factory.client = MockComponentClient()
+    timeseries = factory._calculate_channels(
+        starttime,
+        endtime,
+        "BOU",
+        "variation",
+        "minute",
+        {
+            "X": [{"channel": "H", "scale": 1, "offset": 0}],
+            "Y": [
+                {"channel": "H", "scale": 2, "offset": 1},
+                {"channel": "Z", "scale": 0.5, "offset": 0},
+            ],
+            # same SNCL as "H"
+            "W": [{"channel": "UFH", "scale": 1, "offset": 0}],
+        },
+    )
+    # shared component only requested once
+    assert_equal(factory.client.requested, ["UFH", "UFZ"])
+    assert_equal(timeseries[0].stats.channel, "X")
+    assert_equal(timeseries[0].data[0], 1000)
+    assert_equal(timeseries[1].stats.channel, "Y")
+    assert_equal(timeseries[1].data[0], 2501)
+    assert_equal(timeseries[2].stats.channel, "W")
+    assert_equal(timeseries[2].data[0], 1000)
+
+
 # def test_get_timeseries():
 def dont_get_timeseries():
     """edge_test.MiniSeedFactory_test.test_get_timeseries()"""
@@ -161,3 +309,29 @@ def __create_trace(
     stats.data_type = data_type
     numpy_data = numpy.array(data, dtype=numpy.float64)
     return Trace(numpy_data, stats)
+
+
+def test_get_edge_sncls():
+    """edge_test.MiniSeedFactory_test.test_get_edge_sncls()"""
+    factory = MiniSeedFactory()
+    items = [
+        ("BOU", "H", "variation", "minute"),
+        ("BOU", "U_Bin", "variation", "tenhertz"),
+        ("BOU", "H_Dist", "definitive", "minute"),
+    ]
+    sncls = factory.get_edge_sncls(items)
+    assert_equal(
+        sncls,
+        [
+            ("NT", "BOU", "R0", "UFH"),
+            ("NT", "BOU", "R0", "BYU"),
+            ("NT", "BOU", "DD", "UFH"),
+        ],
+    )
+    assert_equal(factory.parse_edge_sncls(sncls), items)
+    # location code override is not memoized
+    factory.locationCode = "R1"
+    assert_equal(
+        factory.get_edge_sncls(items[:1]),
+        [("NT", "BOU", "R1", "UFH")],
+    )
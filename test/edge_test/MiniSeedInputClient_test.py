@@ -0,0 +1,102 @@
+"""Tests for MiniSeedInputClient.py"""
+import io
+import socket
+import threading
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime, read
+import pytest
+
+from geomagio.edge import MiniSeedInputClient
+
+
+class MockServer(object):
+    """Server that accepts connections and records bytes received."""
+
+    def __init__(self):
+        self.socket = socket.socket()
+        self.socket.bind(("127.0.0.1", 0))
+        self.socket.listen(5)
+        self.socket.settimeout(0.1)
+        self.port = self.socket.getsockname()[1]
+        self.received = []
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.socket.close()
+
+    def _run(self):
+        while self.running:
+            try:
+                connection, _ = self.socket.accept()
+            except socket.timeout:
+                continue
+            with connection:
+                connection.settimeout(None)
+                data = b""
+                while True:
+                    chunk = connection.recv(65536)
+                    if not chunk:
+                        break
+                    data += chunk
+                self.received.append(data)
+
+
+def _get_stream(channel, samples=1000):
+    return Stream(
+        Trace(
+            numpy.arange(samples, dtype=numpy.int32),
+            {
+                "network": "NT",
+                "station": "BOU",
+                "location": "R0",
+                "channel": channel,
+                "starttime": UTCDateTime("2020-01-01T00:00:00Z"),
+                "delta": 0.1,
+            },
+        )
+    )
+
+
+def test_send():
+    """edge_test.MiniSeedInputClient_test.test_send()"""
+    server = MockServer()
+    client = MiniSeedInputClient("127.0.0.1", server.port, reclen=512)
+    try:
+        client.send(_get_stream("LFH"))
+        client.send(_get_stream("LFE"))
+        client.close()
+    finally:
+        server.close()
+    # one connection, records are complete blocks
+    assert_equal(len(server.received), 1)
+    data = server.received[0]
+    assert_equal(len(data) % 512, 0)
+    stream = read(io.BytesIO(data), format="MSEED")
+    stream.merge()
+    assert_equal(sorted(t.stats.channel for t in stream), ["LFE", "LFH"])
+    for trace in stream:
+        assert_equal(trace.data, numpy.arange(1000))
+    stats = client.get_stats()
+    assert_equal(stats["bytes"], len(data))
+    assert_equal(stats["records"], len(data) // 512)
+
+
+def test_send_error():
+    """edge_test.MiniSeedInputClient_test.test_send_error()"""
+    # find a port that is not listening
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    client = MiniSeedInputClient("127.0.0.1", port, max_attempts=3, backoff=0)
+    client.send(_get_stream("LFH"))
+    # errors are raised when data is flushed
+    with pytest.raises(socket.error):
+        client.close()
+    assert_equal(client.get_stats()["bytes"], 0)
@@ -134,3 +134,40 @@ def test__get_time_values(caplog):
     assert_equal(usecs, 232000)
     # assert if previous test does not generate a warning message
     assert_equal(len(caplog.messages), 0)
+
+
+def test_send_trace_packets():
+    """edge_test.RawInputClient_test.test_send_trace_packets()"""
+    # crosses a year boundary, with a short last packet
+    starttime = UTCDateTime("2019-12-31T23:00:00Z")
+    data = numpy.arange(3600 * 3 + 100, dtype=numpy.int32)
+    trace = Trace(
+        data,
+        Stats(
+            {
+                "channel": "LFH",
+                "delta": 1.0,
+                "location": "R0",
+                "network": "NT",
+                "npts": len(data),
+                "starttime": starttime,
+                "station": "BOU",
+            }
+        ),
+    )
+    client = MockRawInputClient(
+        tag="tag", host="host", port="port", station="BOU", channel="LFH"
+    )
+    client.sequence = 5
+    client.send_trace("second", trace)
+    # all packets sent at once
+    assert_equal(len(client.last_send), 1)
+    assert_equal(client.sequence, 9)
+    # same as encoding each packet separately
+    expected = b""
+    for i in range(4):
+        client.sequence = 5 + i
+        expected += client._get_data(
+            data[i * 3600 : (i + 1) * 3600], starttime + i * 3600, 1.0
+        )
+    assert_equal(client.last_send[0], expected)
@@ -0,0 +1,209 @@
+"""Tests for SpoolFactory.py"""
+import os
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+
+from geomagio import TimeseriesFactory, TimeseriesFactoryException
+from geomagio.edge import SpoolFactory
+
+STARTTIME = UTCDateTime("2020-01-01T00:00:00Z")
+
+
+class MockFactory(TimeseriesFactory):
+    """Factory that records writes, and fails when not available."""
+
+    def __init__(self):
+        TimeseriesFactory.__init__(self, type="variation", interval="minute")
+        self.available = True
+        # when set, number of puts before becoming unavailable
+        self.remaining = None
+        self.closes = 0
+        self.puts = []
+
+    def close(self):
+        self.closes += 1
+
+    def get_timeseries(self, starttime, endtime, observatory=None, channels=None, **_):
+        npts = int((endtime - starttime) / 60) + 1
+        return Stream(
+            [
+                Trace(
+                    numpy.full(npts, numpy.nan),
+                    {"channel": channel, "starttime": starttime, "delta": 60},
+                )
+                for channel in channels
+            ]
+        )
+
+    def put_timeseries(self, timeseries, starttime=None, endtime=None, **kwargs):
+        if self.remaining is not None:
+            self.available = self.remaining > 0
+            self.remaining -= 1
+        if not self.available:
+            raise TimeseriesFactoryException("unavailable")
+        self.puts.append((timeseries, starttime, endtime, kwargs))
+
+
+def _get_stream(starttime, values):
+    return Stream(
+        [
+            Trace(
+                numpy.array(values, dtype=numpy.float64),
+                {
+                    "channel": channel,
+                    "starttime": starttime,
+                    "delta": 60,
+                    "station": "BOU",
+                },
+            )
+            for channel in ["H", "E"]
+        ]
+    )
+
+
+def test_put_timeseries(tmpdir):
+    """edge_test.SpoolFactory_test.test_put_timeseries()"""
+    factory = MockFactory()
+    spool = SpoolFactory(factory, str(tmpdir))
+    # written immediately when available
+    spool.put_timeseries(_get_stream(STARTTIME, [1, 2, 3]), channels=["H", "E"])
+    assert_equal(len(factory.puts), 1)
+    assert_equal(spool.get_pending(), 0)
+    # spooled during outage
+    factory.available = False
+    spool.put_timeseries(_get_stream(STARTTIME + 180, [4, 5, 6]), channels=["H", "E"])
+    spool.put_timeseries(
+        _get_stream(STARTTIME + 360, [7, numpy.nan, 9]), channels=["H", "E"]
+    )
+    assert_equal(len(factory.puts), 1)
+    assert_equal(spool.get_pending(), 2)
+    # pending data is included when reading
+    timeseries = spool.get_timeseries(
+        STARTTIME + 180, STARTTIME + 480, "BOU", ["H"], "variation", "minute"
+    )
+    assert_equal(timeseries[0].data, [4, 5, 6, 7, numpy.nan, 9])
+    # replayed in order after outage
+    factory.available = True
+    assert_equal(spool.flush(), 2)
+    assert_equal(spool.get_pending(), 0)
+    timeseries, starttime, endtime, kwargs = factory.puts[1]
+    assert_equal(starttime, STARTTIME + 180)
+    assert_equal(kwargs["observatory"], "BOU")
+    assert_equal(kwargs["channels"], ["H", "E"])
+    assert_equal(timeseries.select(channel="E")[0].data, [4, 5, 6])
+    assert_equal(factory.puts[2][1], STARTTIME + 360)
+
+
+def test_compact(tmpdir):
+    """edge_test.SpoolFactory_test.test_compact()"""
+    factory = MockFactory()
+    spool = SpoolFactory(factory, str(tmpdir))
+    factory.available = False
+    spool.put_timeseries(_get_stream(STARTTIME, [1, 2, numpy.nan]), channels=["H", "E"])
+    # replaces all data in first segment
+    spool.put_timeseries(_get_stream(STARTTIME, [3, 4, 5]), channels=["H", "E"])
+    # does not replace all data in second segment
+    spool.put_timeseries(_get_stream(STARTTIME, [6, numpy.nan, 7]), channels=["H", "E"])
+    factory.available = True
+    assert_equal(spool.flush(), 2)
+    assert_equal(
+        [put[0].select(channel="H")[0].data.tolist() for put in factory.puts],
+        [[3, 4, 5], [6, numpy.nan, 7]],
+    )
+
+
+def test_read_overlapping(tmpdir):
+    """edge_test.SpoolFactory_test.test_read_overlapping()"""
+    factory = MockFactory()
+    spool = SpoolFactory(factory, str(tmpdir))
+    factory.available = False
+    for hour in range(5):
+        spool.put_timeseries(
+            _get_stream(STARTTIME + hour * 3600, [hour, hour]), channels=["H", "E"]
+        )
+    # other observatory
+    spool.put_timeseries(
+        _get_stream(STARTTIME, [9, 9]), observatory="BRW", channels=["H", "E"]
+    )
+    read = []
+    read_segment = spool._read_segment
+
+    def _read_segment(path):
+        read.append(path)
+        return read_segment(path)
+
+    spool._read_segment = _read_segment
+    timeseries = spool.get_timeseries(
+        STARTTIME + 3600, STARTTIME + 3660, "BOU", ["H"], "variation", "minute"
+    )
+    assert_equal(timeseries[0].data, [1, 1])
+    assert_equal(len(read), 1)
+    # only overlapping segment is compared to new segment, and replaced
+    del read[:]
+    spool.put_timeseries(_get_stream(STARTTIME + 7200, [5, 5]), channels=["H", "E"])
+    # flush stops after first segment
+    assert_equal([os.path.basename(path) for path in read], ["%012d" % 3, "%012d" % 1])
+    assert_equal(spool.get_pending(), 6)
+
+
+def test_shared_directory(tmpdir):
+    """edge_test.SpoolFactory_test.test_shared_directory()"""
+    factory = MockFactory()
+    factory.available = False
+    # created before either writes a segment
+    spool1 = SpoolFactory(factory, str(tmpdir))
+    spool2 = SpoolFactory(factory, str(tmpdir))
+    spool1.put_timeseries(_get_stream(STARTTIME, [1, 2]), channels=["H", "E"])
+    spool2.put_timeseries(_get_stream(STARTTIME + 120, [3, 4]), channels=["H", "E"])
+    # segments are not replaced, and are read when spool is created
+    factory.available = True
+    assert_equal(SpoolFactory(factory, str(tmpdir)).flush(), 2)
+    assert_equal(
+        [put[0].select(channel="H")[0].data.tolist() for put in factory.puts],
+        [[1, 2], [3, 4]],
+    )
+    # segments removed by another process are skipped
+    assert_equal(spool1.flush(), 0)
+    assert_equal(spool1.get_pending(), 0)
+
+
+def test_flush_error(tmpdir):
+    """edge_test.SpoolFactory_test.test_flush_error()"""
+    factory = MockFactory()
+    spool = SpoolFactory(factory, str(tmpdir))
+    factory.available = False
+    for minute in range(3):
+        spool.put_timeseries(
+            _get_stream(STARTTIME + minute * 60, [minute]), channels=["H", "E"]
+        )
+    # second segment fails
+    factory.remaining = 1
+    try:
+        spool.flush()
+        assert False, "expected exception"
+    except TimeseriesFactoryException:
+        pass
+    # first segment was closed and removed, so it is not written again
+    assert_equal(factory.closes, 1)
+    assert_equal(spool.get_pending(), 2)
+    factory.remaining = None
+    factory.available = True
+    assert_equal(spool.flush(), 2)
+    assert_equal(
+        [put[1] for put in factory.puts], [STARTTIME + 60 * i for i in range(3)]
+    )
+
+
+def test_flush_nonblocking(tmpdir):
+    """edge_test.SpoolFactory_test.test_flush_nonblocking()"""
+    factory = MockFactory()
+    spool = SpoolFactory(factory, str(tmpdir))
+    # another thread is flushing
+    spool._flush_lock.acquire()
+    spool.put_timeseries(_get_stream(STARTTIME, [1]), channels=["H", "E"])
+    assert_equal(spool.get_pending(), 1)
+    assert_equal(spool.flush(blocking=False), 0)
+    spool._flush_lock.release()
+    assert_equal(spool.flush(), 1)
@@ -0,0 +1,99 @@
+"""Tests for TailBuffer.py"""
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+
+from geomagio.edge import TailBuffer
+
+
+class MockClient(object):
+    """Client with one second data until end, that records requests."""
+
+    def __init__(self, end):
+        self.end = end
+        self.gaps = []
+        self.requests = []
+
+    def get_waveforms(self, network, station, location, channel, starttime, endtime):
+        self.requests.append((starttime, endtime))
+        endtime = min(endtime, self.end)
+        if endtime < starttime:
+            raise TypeError("no data")
+        # each sample value is its time
+        times = numpy.arange(starttime.timestamp, endtime.timestamp + 1)
+        data = numpy.ma.masked_array(times.astype(numpy.int32))
+        for gap_start, gap_end in self.gaps:
+            data[
+                (times >= gap_start.timestamp) & (times <= gap_end.timestamp)
+            ] = numpy.ma.masked
+        return Stream(
+            Trace(
+                data,
+                {
+                    "network": network,
+                    "station": station,
+                    "location": location,
+                    "channel": channel,
+                    "starttime": starttime,
+                    "delta": 1,
+                },
+            )
+        )
+
+
+def test_get_waveforms():
+    """edge_test.TailBuffer_test.test_get_waveforms()
+
+    Only samples after the last sample received are requested.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    client = MockClient(end=start + 550)
+    buffer = TailBuffer(client)
+    sncl = ("NT", "BOU", "R0", "SVH")
+    first = buffer.get_waveforms(*sncl, start, start + 599)
+    assert_equal(client.requests, [(start, start + 599)])
+    assert_equal(first[0].stats.endtime, start + 550)
+    # next window, more data is available
+    client.end = start + 610
+    second = buffer.get_waveforms(*sncl, start + 10, start + 609)
+    assert_equal(client.requests[1], (start + 551, start + 609))
+    assert_equal(len(second), 1)
+    assert_equal(second[0].stats.starttime, start + 10)
+    assert_equal(second[0].stats.endtime, start + 609)
+    assert_equal(
+        second[0].data,
+        numpy.arange((start + 10).timestamp, (start + 610).timestamp),
+    )
+    # returned data does not modify buffer
+    second[0].data[:] = 0
+    third = buffer.get_waveforms(*sncl, start + 20, start + 600)
+    assert_equal(len(client.requests), 2)
+    assert_equal(third[0].data[0], (start + 20).timestamp)
+    # request before buffer requests entire window
+    buffer.get_waveforms(*sncl, start, start + 600)
+    assert_equal(client.requests[2], (start, start + 600))
+
+
+def test_get_waveforms_overlap():
+    """edge_test.TailBuffer_test.test_get_waveforms_overlap()
+
+    Samples before the last sample received are requested again,
+    so gaps that are filled later are updated.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    client = MockClient(end=start + 550)
+    client.gaps = [(start + 500, start + 510)]
+    buffer = TailBuffer(client, overlap=60)
+    sncl = ("NT", "BOU", "R0", "SVH")
+    first = buffer.get_waveforms(*sncl, start, start + 599)
+    assert_equal(numpy.ma.count_masked(first.merge()[0].data), 11)
+    # gap is filled, and more data is available
+    client.end = start + 610
+    client.gaps = []
+    second = buffer.get_waveforms(*sncl, start + 10, start + 609)
+    assert_equal(client.requests[1], (start + 491, start + 609))
+    assert_equal(len(second), 1)
+    assert_equal(
+        second[0].data,
+        numpy.arange((start + 10).timestamp, (start + 610).timestamp),
+    )
@@ -0,0 +1,169 @@
+"""Tests for WaveformCache.py"""
+import os
+import shutil
+import tempfile
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+
+from geomagio.edge import WaveformCache
+from geomagio.edge.WaveformCache import get_uncovered, merge_ranges
+
+
+class MockClient(object):
+    """Client that returns one second data, and records requests."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get_waveforms(self, network, station, location, channel, starttime, endtime):
+        self.requests.append((starttime, endtime))
+        # each sample value is its time
+        times = numpy.arange(starttime.timestamp, endtime.timestamp + 1)
+        return Stream(
+            Trace(
+                times.astype(numpy.int32),
+                {
+                    "network": network,
+                    "station": station,
+                    "location": location,
+                    "channel": channel,
+                    "starttime": starttime,
+                    "delta": 1,
+                },
+            )
+        )
+
+
+def _get_cache(**kwargs):
+    return WaveformCache(MockClient(), tempfile.mkdtemp(), **kwargs)
+
+
+def _get_waveforms(cache, starttime, endtime):
+    stream = cache.get_waveforms("NT", "BOU", "R0", "SVH", starttime, endtime)
+    stream.merge()
+    return stream
+
+
+def test_get_waveforms():
+    """edge_test.WaveformCache_test.test_get_waveforms()
+
+    Covered ranges are read from disk, only uncovered ranges are requested.
+    """
+    cache = _get_cache()
+    client = cache.client
+    start = UTCDateTime("2020-01-01T23:00:00Z")
+    try:
+        # spans two days
+        first = _get_waveforms(cache, start, start + 7199)
+        assert_equal(client.requests, [(start, start + 7199)])
+        assert_equal(
+            sorted(os.listdir(os.path.join(cache.directory, "NT.BOU.R0.SVH"))),
+            [
+                "20200101.mseed",
+                "20200101.mseed.json",
+                "20200102.mseed",
+                "20200102.mseed.json",
+            ],
+        )
+        # sub range is cached
+        cached = _get_waveforms(cache, start + 3000, start + 4000)
+        assert_equal(len(client.requests), 1)
+        assert_equal(cached[0].data, first[0].data[3000:4001])
+        # only request uncovered range
+        extended = _get_waveforms(cache, start + 7000, start + 9000)
+        assert_equal(client.requests[1], (start + 7199, start + 9000))
+        assert_equal(extended[0].stats.npts, 2001)
+        assert_equal(
+            extended[0].data,
+            numpy.arange((start + 7000).timestamp, (start + 9001).timestamp),
+        )
+    finally:
+        shutil.rmtree(cache.directory)
+
+
+def test_get_waveforms_settle_time():
+    """edge_test.WaveformCache_test.test_get_waveforms_settle_time()
+
+    Recent data is always requested.
+    """
+    cache = _get_cache(settle_time=600)
+    client = cache.client
+    now = UTCDateTime()
+    start = UTCDateTime(int(now.timestamp) - 1200)
+    end = UTCDateTime(int(now.timestamp) - 60)
+    try:
+        _get_waveforms(cache, start, end)
+        _get_waveforms(cache, start, end)
+        # settled part is not requested again
+        assert_equal(len(client.requests), 2)
+        assert_equal(client.requests[1][0] > start + 500, True)
+        assert_equal(client.requests[1][1], end)
+    finally:
+        shutil.rmtree(cache.directory)
+
+
+def test_evict():
+    """edge_test.WaveformCache_test.test_evict()
+
+    Least recently used days are removed when cache is too large.
+    """
+    cache = _get_cache(max_size=0)
+    try:
+        start = UTCDateTime("2020-01-01T00:00:00Z")
+        _get_waveforms(cache, start, start + 3600)
+        assert_equal(os.listdir(os.path.join(cache.directory, "NT.BOU.R0.SVH")), [])
+    finally:
+        shutil.rmtree(cache.directory)
+
+
+def test_evict_size(monkeypatch):
+    """edge_test.WaveformCache_test.test_evict_size()
+
+    The cache directory is only listed to count its size once,
+    and again when it is too large.
+    """
+    walks = []
+    walk = os.walk
+    monkeypatch.setattr(os, "walk", lambda *args: walks.append(args) or walk(*args))
+    cache = _get_cache(max_size=1024 ** 2)
+    try:
+        start = UTCDateTime("2020-01-01T00:00:00Z")
+        for day in range(3):
+            _get_waveforms(cache, start + day * 86400, start + day * 86400 + 3600)
+        assert_equal(len(walks), 1)
+        assert_equal(cache._size > 0, True)
+        # size is tracked as files are written
+        size = cache._size
+        cache._size = None
+        cache._evict()
+        assert_equal(cache._size, size)
+        cache.max_size = size
+        _get_waveforms(cache, start + 3 * 86400, start + 3 * 86400 + 3600)
+        assert_equal(len(walks), 3)
+        assert_equal(cache._size <= cache.max_size, True)
+    finally:
+        shutil.rmtree(cache.directory)
+
+
+def test_get_uncovered():
+    """edge_test.WaveformCache_test.test_get_uncovered()"""
+    t = UTCDateTime("2020-01-01T00:00:00Z")
+    assert_equal(get_uncovered(t, t + 10, []), [(t, t + 10)])
+    assert_equal(get_uncovered(t, t + 10, [(t - 5, t + 20)]), [])
+    assert_equal(
+        get_uncovered(t, t + 10, [(t + 2, t + 4), (t + 6, t + 8)]),
+        [(t, t + 2), (t + 4, t + 6), (t + 8, t + 10)],
+    )
+    assert_equal(get_uncovered(t, t, [(t, t + 1)]), [])
+    assert_equal(get_uncovered(t, t, [(t + 1, t + 2)]), [(t, t)])
+
+
+def test_merge_ranges():
+    """edge_test.WaveformCache_test.test_merge_ranges()"""
+    t = UTCDateTime("2020-01-01T00:00:00Z")
+    assert_equal(
+        merge_ranges([(t + 5, t + 6), (t, t + 2), (t + 2, t + 3)]),
+        [(t, t + 3), (t + 5, t + 6)],
+    )
@@ -0,0 +1,89 @@
+"""Tests for sncl.py"""
+from numpy.testing import assert_equal, assert_raises
+
+from geomagio.edge.sncl import (
+    SNCLException,
+    SNCLTable,
+    get_scnl,
+    get_sncls,
+    parse_sncl,
+    parse_sncls,
+)
+
+
+def test_get_scnl():
+    """edge_test.sncl_test.test_get_scnl()"""
+    assert_equal(
+        get_scnl("BOU", "H", data_type="variation", interval="second"),
+        {"station": "BOU", "network": "NT", "channel": "LFH", "location": "R0"},
+    )
+    assert_equal(get_scnl("BOU", "U-Bin", interval="tenhertz")["channel"], "BYU")
+    assert_equal(
+        get_scnl("BOU", "H-Dist", data_type="definitive", interval="minute"),
+        {"station": "BOU", "network": "NT", "channel": "UFH", "location": "DD"},
+    )
+
+
+def test_parse_sncl():
+    """edge_test.sncl_test.test_parse_sncl()"""
+    assert_equal(
+        parse_sncl(
+            {"station": "BOU", "network": "NT", "channel": "UFH", "location": "Q0"}
+        ),
+        {
+            "observatory": "BOU",
+            "network": "NT",
+            "component": "H",
+            "data_type": "quasi-definitive",
+            "interval": 60,
+        },
+    )
+
+
+def test_get_sncls():
+    """edge_test.sncl_test.test_get_sncls()"""
+    items = [
+        ("BOU", "H", "variation", 60),
+        ("BOU", "E-E", "variation", 1),
+        ("BOU", "H-Dist", "definitive", 60),
+    ]
+    sncls = get_sncls(items)
+    assert_equal([sncl["channel"] for sncl in sncls], ["UFH", "LQY", "UFH"])
+    assert_equal(
+        [
+            (p["observatory"], p["component"], p["data_type"], p["interval"])
+            for p in parse_sncls(sncls)
+        ],
+        items,
+    )
+
+
+def test_sncl_table():
+    """edge_test.sncl_test.test_sncl_table()"""
+    calls = []
+
+    def get_sncl(observatory, element, type, interval):
+        calls.append((observatory, element, type, interval))
+        location = {"variation": "R0", "definitive": "D0"}[type]
+        return ("NT", observatory, location, interval[0].upper() + element)
+
+    table = SNCLTable(
+        get_sncl,
+        elements=["H", "E"],
+        types=["variation", "definitive"],
+        intervals=["minute", "second"],
+    )
+    # translations are memoized
+    assert_equal(
+        table.get_sncls(
+            [("BOU", "H", "variation", "minute"), ("BOU", "H", "variation", "minute")]
+        ),
+        [("NT", "BOU", "R0", "MH"), ("NT", "BOU", "R0", "MH")],
+    )
+    assert_equal(len(calls), 1)
+    # reverse lookups
+    assert_equal(
+        table.parse_sncls([("NT", "BOU", "D0", "SE"), ("NT", "FRD", "R0", "MH")]),
+        [("BOU", "E", "definitive", "second"), ("FRD", "H", "variation", "minute")],
+    )
+    assert_raises(SNCLException, table.parse_sncl, "NT", "BOU", "Q0", "MH")
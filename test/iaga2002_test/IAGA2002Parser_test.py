@@ -1,5 +1,6 @@
 """Tests for the IAGA2002 Parser class."""
 
+import numpy
 from numpy.testing import assert_equal
 from geomagio.iaga2002 import IAGA2002Parser
 
@@ -110,3 +111,48 @@ def test_parse_decbas():
     parser = IAGA2002Parser()
     parser.parse(IAGA2002_EXAMPLE)
     assert_equal(parser.metadata["declination_base"], 5527)
+
+
+class LineParser(IAGA2002Parser):
+    """Parser that only parses data one line at a time."""
+
+    def _parse_data_block(self, data):
+        return False
+
+
+def test_parse_data_block():
+    """iaga2002_test.IAGA2002Parser_test.test_parse_data_block()
+
+    Call the parse method with data that is parsed all at once,
+    and data that is parsed one line at a time.
+    Verify both parse the same times and values.
+    """
+    expected = LineParser()
+    expected.parse(IAGA2002_EXAMPLE)
+    assert_equal(len(expected.times), 10)
+    lines = IAGA2002_EXAMPLE.splitlines()
+    for data in [
+        IAGA2002_EXAMPLE,
+        # windows line endings, with final line ending
+        "\r\n".join(lines) + "\r\n",
+        # different line lengths
+        IAGA2002_EXAMPLE.replace("52532.10", "52532.10   "),
+        # missing values, negative values
+        IAGA2002_EXAMPLE.replace("47809.04", "88888.00").replace(
+            "21515.04", "-1515.04"
+        ),
+    ]:
+        parser = IAGA2002Parser()
+        parser.parse(data)
+        assert_equal(parser.times, expected.times)
+        assert_equal(parser.times[1], numpy.datetime64("2013-09-01T00:01:00"))
+        for channel in ["H", "D", "Z", "F"]:
+            assert_equal(len(parser.data[channel]), 10)
+        assert_equal(parser.data["H"][:9], expected.data["H"][:9])
+        assert_equal(parser.data["D"], expected.data["D"])
+    assert_equal(parser.data["H"][9], -1515.04)
+    assert_equal(numpy.isnan(parser.data["Z"][9]), True)
+    # values that are not plain decimals are parsed one line at a time
+    parser = IAGA2002Parser()
+    parser.parse(IAGA2002_EXAMPLE.replace("52533.39", "5.25e+04"))
+    assert_equal(parser.data["F"][0], 52500)
@@ -0,0 +1,48 @@
+"""Tests for the IAGA2002 Writer class."""
+from datetime import datetime
+import sys
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+
+from geomagio.iaga2002 import IAGA2002Writer
+
+
+def test_format_data(monkeypatch):
+    """iaga2002_test.IAGA2002Writer_test.test_format_data()
+
+    Call the _format_data method with several chunks of data,
+    including gaps and values too large for the data columns.
+    Verify each line is the same as calling _format_values.
+    """
+    monkeypatch.setattr(sys.modules[IAGA2002Writer.__module__], "CHUNK_SIZE", 4)
+    starttime = UTCDateTime("2020-12-31T23:59:59.5Z")
+    data = {
+        "H": [20000.125, numpy.nan, -1.005, 0, 1, 2, 3, 4, 5, 6],
+        "E": [1, 2, 3, 4, 5, 6, 7, 1234567, 9, 10],
+        "Z": [-0.0, 1, 2, 3, 4, 5, 6, 7, 8, numpy.nan],
+        "F": numpy.arange(10) + 0.5,
+    }
+    timeseries = Stream(
+        [
+            Trace(
+                numpy.array(values, dtype=numpy.float64),
+                {"channel": channel, "starttime": starttime, "delta": 0.1},
+            )
+            for channel, values in data.items()
+        ]
+    )
+    writer = IAGA2002Writer()
+    formatted = writer._format_data(timeseries, ["H", "E", "Z", "F"])
+    assert_equal(
+        formatted,
+        "".join(
+            writer._format_values(
+                datetime.utcfromtimestamp(float(starttime) + i * 0.1),
+                [data[channel][i] for channel in ["H", "E", "Z", "F"]],
+            )
+            for i in range(10)
+        ),
+    )
+    assert_equal(formatted.splitlines()[8][:27], "2021-01-01 00:00:00.300 001")
@@ -1,5 +1,10 @@
 """Tests for the IMFJSON Writer class."""
 
+from collections import OrderedDict
+from io import BytesIO
+import json
+import sys
+
 from numpy.testing import assert_equal
 from geomagio.iaga2002 import IAGA2002Factory
 from geomagio.imfjson import IMFJSONWriter
@@ -97,3 +102,32 @@ def test_values():
     #  tolist required to prevent ValueError in comparison
     assert_equal(vals_H.tolist(), test_val_H.tolist())
     assert_equal(vals_D.tolist(), test_val_D.tolist())
+
+
+def test_write(monkeypatch):
+    """imfjson.IMFJSONWriter_test.test_write()
+
+    Call the write method with several chunks of data.
+    Verify, the output is the same as encoding the whole document,
+    and gaps are null.
+    """
+    monkeypatch.setattr(sys.modules[IMFJSONWriter.__module__], "CHUNK_SIZE", 7)
+    timeseries = EXAMPLE_DATA.copy()
+    timeseries.select(channel="H")[0].data[3] = np.nan
+    writer = IMFJSONWriter()
+    out = BytesIO()
+    writer.write(out, timeseries, EXAMPLE_CHANNELS, url="url")
+    document = json.loads(out.getvalue(), object_pairs_hook=OrderedDict)
+    stats = timeseries[0].stats
+    expected = OrderedDict()
+    expected["type"] = "Timeseries"
+    expected["metadata"] = writer._format_metadata(stats, EXAMPLE_CHANNELS)
+    expected["metadata"]["url"] = "url"
+    expected["metadata"]["generated"] = document["metadata"]["generated"]
+    expected["times"] = writer._format_times(timeseries, EXAMPLE_CHANNELS)
+    expected["values"] = writer._format_data(timeseries, EXAMPLE_CHANNELS, stats)
+    assert_equal(
+        out.getvalue(),
+        json.dumps(expected, ensure_ascii=True, separators=(",", ":")).encode("utf8"),
+    )
+    assert_equal(document["values"][0]["values"][3], None)
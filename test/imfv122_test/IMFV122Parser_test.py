@@ -1,5 +1,6 @@
 """Tests for the IMFV122 Parser class."""
 
+import numpy
 from numpy.testing import assert_equal
 from geomagio.imfv122 import IMFV122Parser
 from obspy.core import UTCDateTime
@@ -44,19 +45,18 @@ def test_imfv122_parse_data():
         "HER JAN0116 001 0123 HDZF R EDI 12440192 -14161 DRRRRRRRRRRRRRRR"
     )
     parser._parse_data("1234 5678 9101 1121 3141 5161 7181 9202")
-    import pprint
-
-    pprint.pprint(parser._parsedata)
-    assert_equal(parser._parsedata[0][0], UTCDateTime("2016-01-01T02:03:00Z"))
-    assert_equal(parser._parsedata[1][0], "1234")
-    assert_equal(parser._parsedata[2][0], "5678")
-    assert_equal(parser._parsedata[3][0], "9101")
-    assert_equal(parser._parsedata[4][0], "1121")
-    assert_equal(parser._parsedata[0][1], UTCDateTime("2016-01-01T02:04:00Z"))
-    assert_equal(parser._parsedata[1][1], "3141")
-    assert_equal(parser._parsedata[2][1], "5161")
-    assert_equal(parser._parsedata[3][1], "7181")
-    assert_equal(parser._parsedata[4][1], "9202")
+    assert_equal(
+        parser._parsedata[0][0],
+        [
+            UTCDateTime("2016-01-01T02:03:00Z").timestamp,
+            UTCDateTime("2016-01-01T02:04:00Z").timestamp,
+        ],
+    )
+    assert_equal(parser._parsedata[1][0], [1234, 3141])
+    assert_equal(parser._parsedata[2][0], [5678, 5161])
+    assert_equal(parser._parsedata[3][0], [9101, 7181])
+    assert_equal(parser._parsedata[4][0], [1121, 9202])
+    assert_equal(parser._nexttime, UTCDateTime("2016-01-01T02:05:00Z"))
 
 
 def test_imfv122_post_process():
@@ -67,13 +67,44 @@ def test_imfv122_post_process():
     )
     parser._parse_data("1234 5678 9101 1121 3141 5161 7181 9202")
     parser._post_process()
-    assert_equal(parser.times[0], UTCDateTime("2016-01-01T02:03:00Z"))
+    assert_equal(UTCDateTime(parser.times[0]), UTCDateTime("2016-01-01T02:03:00Z"))
     assert_equal(parser.data["H"][0], 123.4)
     assert_equal(parser.data["D"][0], 56.78)
     assert_equal(parser.data["Z"][0], 910.1)
     assert_equal(parser.data["F"][0], 112.1)
-    assert_equal(parser.times[1], UTCDateTime("2016-01-01T02:04:00Z"))
+    assert_equal(UTCDateTime(parser.times[1]), UTCDateTime("2016-01-01T02:04:00Z"))
     assert_equal(parser.data["H"][1], 314.1)
     assert_equal(parser.data["D"][1], 51.61)
     assert_equal(parser.data["Z"][1], 718.1)
     assert_equal(parser.data["F"][1], 920.2)
+
+
+def test_imfv122_parse():
+    """imfv122_test.test_imfv122_parse."""
+    parser = IMFV122Parser()
+    parser.parse(
+        "HER JAN0116 001 0123 HDZF R EDI 12440192 -14161 DRRRRRRRRRRRRRRR\n"
+        "1234 5678 9101 1121 3141 5161 7181 9202\n"
+        "1234 5678 9101 1121 888888 999999 7181 9202\n"
+        "HER JAN0116 001 0200 HDZF R EDI 12440192 -14161 DRRRRRRRRRRRRRRR\n"
+        "1234 5678 9101 1121 3141 5161 7181 9202\n"
+    )
+    assert_equal(len(parser.times), 6)
+    assert_equal(UTCDateTime(parser.times[3]), UTCDateTime("2016-01-01T02:06:00Z"))
+    assert_equal(UTCDateTime(parser.times[4]), UTCDateTime("2016-01-01T03:20:00Z"))
+    assert_equal(parser.data["H"], [123.4, 314.1, 123.4, numpy.nan, 123.4, 314.1])
+    assert_equal(parser.data["D"], [56.78, 51.61, 56.78, numpy.nan, 56.78, 51.61])
+
+
+def test_imfv122_parse_misaligned():
+    """imfv122_test.test_imfv122_parse_misaligned."""
+    parser = IMFV122Parser()
+    try:
+        parser.parse(
+            "HER JAN0116 001 0123 HDZF R EDI 12440192 -14161 DRRRRRRRRRRRRRRR\n"
+            "1234 5678 9101 1121 3141 5161 7181\n"
+            "1234 5678 9101 1121 3141 5161 7181 9202 1234\n"
+        )
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
@@ -0,0 +1,119 @@
+"""Tests for the GOESIMFV283Factory class."""
+import os
+import sys
+
+from numpy.testing import assert_equal
+from obspy import UTCDateTime
+
+from geomagio.imfv283 import GOESIMFV283Factory
+from .IMFV283Parser_test import IMFV283_EXAMPLE_STJ
+
+# stand-in for getDcpMessages, that logs each call,
+# fails for server "down", and otherwise outputs messages one at a time
+GETDCPMESSAGES = """#!{python}
+import sys, time
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+with open({log!r}, "a") as f:
+    f.write(args["-h"] + " " + open(args["-f"]).read().replace("\\n", " ") + "\\n")
+if args["-h"] == "down":
+    sys.stderr.write("FATAL could not connect")
+    sys.exit(1)
+for line in open({messages!r}, "rb"):
+    sys.stdout.buffer.write(line)
+    sys.stdout.flush()
+    time.sleep(0.01)
+"""
+
+
+def _get_factory(tmpdir, **kwargs):
+    messages = tmpdir.join("messages")
+    messages.write_binary(IMFV283_EXAMPLE_STJ)
+    log = tmpdir.join("log")
+    log.write("")
+    getdcpmessages = tmpdir.join("getdcpmessages")
+    getdcpmessages.write(
+        GETDCPMESSAGES.format(
+            python=sys.executable, log=str(log), messages=str(messages)
+        )
+    )
+    os.chmod(str(getdcpmessages), 0o755)
+    factory = GOESIMFV283Factory(
+        directory=str(tmpdir.join("criteria")),
+        getdcpmessages=str(getdcpmessages),
+        password="password",
+        server=["down", "up"],
+        user="GEOMAG",
+        **kwargs
+    )
+    return factory, log
+
+
+def test_get_timeseries(tmpdir):
+    """imfv283_test.GOESIMFV283Factory_test.test_get_timeseries()
+
+    Get timeseries twice, with a server that cannot be reached.
+    Verify data is parsed, and the second request is read from the cache.
+    """
+    factory, log = _get_factory(tmpdir, cache_directory=str(tmpdir.join("cache")))
+    starttime = UTCDateTime("2020-09-15T00:00:00Z")
+    endtime = UTCDateTime("2020-09-15T00:20:00Z")
+    for _ in range(2):
+        timeseries = factory.get_timeseries(starttime, endtime, observatory="STJ")
+        assert_equal(len(timeseries), 4)
+        trace = timeseries.select(channel="X")[0]
+        assert_equal(trace.stats.station, "STJ")
+        assert_equal(trace.stats.starttime, starttime)
+        assert_equal(trace.stats.npts, 21)
+    calls = log.read().splitlines()
+    assert_equal([call.split()[0] for call in calls], ["down", "up"])
+    assert_equal("DAPS_SINCE: 20/258 23:23:20" in calls[1], True)
+    # overlapping request only retrieves the uncovered range
+    factory.get_timeseries(starttime, endtime + 600, observatory="STJ")
+    calls = log.read().splitlines()
+    assert_equal(len(calls), 4)
+    assert_equal("DAPS_SINCE: 20/259 00:50:00" in calls[3], True)
+
+
+def test_get_timeseries_observatories(tmpdir):
+    """imfv283_test.GOESIMFV283Factory_test.test_get_timeseries_observatories()
+
+    Get timeseries for several observatories at the same time.
+    Verify each observatory is retrieved, and only requested data is returned.
+    """
+    factory, log = _get_factory(tmpdir, concurrency=2, server_concurrency=2)
+    factory.server = ["up"]
+    timeseries = factory.get_timeseries(
+        UTCDateTime("2020-09-15T00:00:00Z"),
+        UTCDateTime("2020-09-15T00:20:00Z"),
+        observatory=["STJ", "BOU"],
+    )
+    assert_equal(len(timeseries), 4)
+    calls = sorted(log.read().splitlines())
+    assert_equal(len(calls), 2)
+    assert_equal("NETWORK_LIST: bou.nl" in calls[0], True)
+    assert_equal("NETWORK_LIST: stj.nl" in calls[1], True)
+
+
+def test_get_timeseries_cache_observatories(tmpdir):
+    """imfv283_test.GOESIMFV283Factory_test.test_get_timeseries_cache_observatories()
+
+    Get recent timeseries for each configured observatory, one at a time.
+    Verify other observatories are only retrieved while their settled ranges
+    are missing from the cache.
+    """
+    factory, log = _get_factory(
+        tmpdir,
+        cache_directory=str(tmpdir.join("cache")),
+        observatory=["STJ", "BOU"],
+    )
+    factory.server = ["up"]
+    endtime = UTCDateTime()
+    starttime = endtime - 3600
+    # first request also retrieves settled range for BOU
+    factory.get_timeseries(starttime, endtime, observatory="STJ")
+    assert_equal(len(log.read().splitlines()), 2)
+    # only unsettled range for BOU is retrieved again
+    factory.get_timeseries(starttime, endtime, observatory="BOU")
+    calls = log.read().splitlines()
+    assert_equal(len(calls), 3)
+    assert_equal("NETWORK_LIST: bou.nl" in calls[2], True)
@@ -113,3 +113,53 @@ def test_estimate_data_time__incorrect_doy():
     assert_equal(data_time, UTCDateTime("2017-10-01T01:18:00Z"))
     assert_equal(transmit_time, UTCDateTime("2017-10-01T01:32:41Z"))
     assert_equal(corrected, True)
+
+
+def test_decode_messages():
+    """imfv283_test.IMFV283Parser_test.test_decode_messages()
+
+    Call the _decode_messages method with messages from several
+    observatories.
+    Verify goes headers match _parse_goes_header, and values are decoded
+    from big-endian counts.
+    """
+    parser = IMFV283Parser()
+    messages = []
+    for msg in [IMFV283_EXAMPLE_VIC, IMFV283_EXAMPLE_FRD] + (
+        IMFV283_EXAMPLE_STJ.splitlines()
+    ):
+        msg_header = parser._parse_msg_header(msg)
+        domsat = imfv283_codes.OBSERVATORIES[msg_header["obs"]]
+        messages.append((msg, msg_header, domsat))
+    goes_headers, values = parser._decode_messages(messages)
+    assert_equal(values.shape, (6, 12, 4))
+    for (msg, msg_header, domsat), goes_header, message_values in zip(
+        messages, goes_headers, values
+    ):
+        goes_data = parser._process_ness_block(msg, domsat, msg_header["data_len"])
+        expected = parser._parse_goes_header(goes_data)
+        assert_equal(goes_header["day"], expected["day"])
+        assert_equal(goes_header["minute"], expected["minute"])
+        assert_equal(goes_header["orient"], expected["orient"])
+        # first sample of first channel
+        count = 0x100 * goes_data[30] + goes_data[31]
+        assert_equal(
+            message_values[0, 0],
+            (count * expected["scale"][0] + expected["offset"][0] * 8192 - 1048576)
+            / 10.0,
+        )
+
+
+def test_parse():
+    """imfv283_test.IMFV283Parser_test.test_parse()
+
+    Call the parse method with consecutive messages, in reverse order.
+    Verify there is one trace per channel.
+    """
+    parser = IMFV283Parser()
+    parser.parse(IMFV283_EXAMPLE_STJ)
+    assert_equal(len(parser.stream), 4)
+    for trace in parser.stream:
+        assert_equal(trace.stats.station, "STJ")
+        assert_equal(trace.stats.npts, 48)
+    assert_equal([trace.stats.channel for trace in parser.stream], ["X", "Y", "Z", "F"])
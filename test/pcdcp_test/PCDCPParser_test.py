@@ -1,5 +1,6 @@
 """Tests for the PCDCP Parser class."""
 
+import numpy
 from numpy.testing import assert_equal
 from geomagio.pcdcp import PCDCPParser
 
@@ -67,3 +68,43 @@ def test_parse_header_sec():
     assert_equal(parser.header["year"], "2015")
     assert_equal(parser.header["yearday"], "001")
     assert_equal(parser.header["resolution"], "0.001nT")
+
+
+class LineParser(PCDCPParser):
+    """Parser that only parses data one line at a time."""
+
+    def _parse_data_block(self, data):
+        return False
+
+
+def test_parse_data_block():
+    """pcdcp_test.PCDCPParser_test.test_parse_data_block()
+
+    Call the parse method with data that is parsed all at once,
+    and data that is parsed one line at a time.
+    Verify both parse the same times and values.
+    """
+    for example in [PCDCP_EXAMPLE.lstrip(), PCDCP_EXAMPLE_SECOND.lstrip()]:
+        expected = LineParser()
+        expected.parse(example)
+        lines = example.splitlines()
+        for data in [
+            example,
+            # windows line endings
+            "\r\n".join(lines) + "\r\n",
+            # different spacing
+            example.replace("  2086239", " 2086239"),
+            # missing values
+            example.replace(" 4745741", " 9999999").replace(" 47457391", " 99999990"),
+        ]:
+            parser = PCDCPParser()
+            parser.parse(data)
+            assert_equal(parser.resolution, expected.resolution)
+            assert_equal(parser.times, expected.times)
+            for channel in ["H", "E", "Z", "F"]:
+                assert_equal(len(parser.data[channel]), len(lines) - 1)
+            assert_equal(parser.data["H"], expected.data["H"])
+            assert_equal(parser.data["E"], expected.data["E"])
+    assert_equal(parser.times[2], "00002")
+    assert_equal(parser.data["Z"][2], numpy.nan)
+    assert_equal(parser.data["F"][1], 52377.650)
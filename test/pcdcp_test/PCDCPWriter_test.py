@@ -0,0 +1,57 @@
+"""Tests for the PCDCP Writer class."""
+from datetime import datetime
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+
+from geomagio.pcdcp import PCDCPWriter
+
+
+def test_format_data():
+    """pcdcp_test.PCDCPWriter_test.test_format_data()
+
+    Call the _format_data method with several days of second data,
+    including gaps and values too large for the data columns.
+    Verify each line is the same as calling _format_values.
+    """
+    starttime = UTCDateTime("2020-12-31T23:59:58Z")
+    data = {
+        "H": [20000.125, numpy.nan, -1.0005, -0.0001, 1, 2],
+        "E": [1, 2, 3, 1234567, 5, 6],
+        "Z": [-0.0, 1, 2, 3, 4, numpy.nan],
+        "F": numpy.arange(6) + 0.5,
+    }
+    timeseries = Stream(
+        [
+            Trace(
+                numpy.array(values, dtype=numpy.float64),
+                {"channel": channel, "starttime": starttime, "delta": 1},
+            )
+            for channel, values in data.items()
+        ]
+    )
+    writer = PCDCPWriter()
+    stats = timeseries[0].stats
+    for channels in [["H", "E", "Z", "F"], ["H", "Z", "F", "F"]]:
+        formatted = writer._format_data(timeseries, channels, stats)
+        assert_equal(
+            formatted,
+            "".join(
+                writer._format_values(
+                    datetime.utcfromtimestamp(float(starttime) + i),
+                    [data[channel][i] for channel in channels],
+                    stats,
+                )
+                for i in range(6)
+            ),
+        )
+    assert_equal(
+        formatted.splitlines()[:4],
+        [
+            "86398  20000125         0       500       500",
+            "86399   9999999      1000      1500      1500",
+            "00000     -1000      2000      2500      2500",
+            "00001         0      3000      3500      3500",
+        ],
+    )
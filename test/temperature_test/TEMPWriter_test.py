@@ -0,0 +1,56 @@
+"""Tests for the TEMP Writer class."""
+from datetime import datetime
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+
+from geomagio.temperature import TEMPWriter
+
+
+def test_format_data():
+    """temperature_test.TEMPWriter_test.test_format_data()
+
+    Call the _format_data method with several days of minute data,
+    including gaps and values too large for the data columns.
+    Verify each line is the same as calling _format_values.
+    """
+    starttime = UTCDateTime("2020-12-31T23:57:00Z")
+    data = {
+        "T1": [20.125, numpy.nan, -1.05, -0.04, 1, 2],
+        "T2": [1, 2, 3, 1234567, 5, 6],
+        "T3": [-0.0, 1, 2, 3, 4, numpy.nan],
+        "T4": numpy.arange(6) + 0.25,
+        "V1": numpy.arange(6) * -10.0,
+    }
+    timeseries = Stream(
+        [
+            Trace(
+                numpy.array(values, dtype=numpy.float64),
+                {"channel": channel, "starttime": starttime, "delta": 60},
+            )
+            for channel, values in data.items()
+        ]
+    )
+    writer = TEMPWriter()
+    for channels in [["T1", "T2", "T3", "T4", "V1"], ["T1", "T3", "T4", "V1", "V1"]]:
+        formatted = writer._format_data(timeseries, channels)
+        assert_equal(
+            formatted,
+            "".join(
+                writer._format_values(
+                    datetime.utcfromtimestamp(float(starttime) + i * 60),
+                    [data[channel][i] for channel in channels],
+                )
+                for i in range(6)
+            ),
+        )
+    assert_equal(
+        formatted.splitlines()[:4],
+        [
+            "1437   201     0     2     0     0",
+            "1438  9999    10    12  -100  -100",
+            "1439   -10    20    22  -200  -200",
+            "0000     0    30    32  -300  -300",
+        ],
+    )
@@ -0,0 +1,55 @@
+"""Tests for the VBF Writer class."""
+from datetime import datetime
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+
+from geomagio.vbf import VBFWriter
+
+
+def test_format_data():
+    """vbf_test.VBFWriter_test.test_format_data()
+
+    Call the _format_data method with several days of second data,
+    including gaps and values too large for the data columns.
+    Verify each line is the same as calling _format_values.
+    """
+    starttime = UTCDateTime("2020-12-31T23:59:58Z")
+    data = {
+        "H": [20.125, numpy.nan, -1000.5, -0.0001, 1, 2],
+        "E": [1.5, 2, -3.5, 1234567, 5, 6],
+        "Z": [-0.0, 1, 2, 3, 4, numpy.nan],
+        "F": [-0.5, numpy.nan, 2, 3, 4, 5],
+    }
+    timeseries = Stream(
+        [
+            Trace(
+                numpy.array(values, dtype=numpy.float64),
+                {"channel": channel, "starttime": starttime, "delta": 1},
+            )
+            for channel, values in data.items()
+        ]
+    )
+    writer = VBFWriter()
+    for channels in [["H", "E", "Z", "F", "H", "F"], ["H", "F", "Z", "F", "Z", "F"]]:
+        formatted = writer._format_data(timeseries, channels)
+        assert_equal(
+            formatted,
+            "".join(
+                writer._format_values(
+                    datetime.utcfromtimestamp(float(starttime) + i),
+                    [data[channel][i] for channel in channels],
+                )
+                for i in range(6)
+            ),
+        )
+    assert_equal(
+        formatted.splitlines()[:4],
+        [
+            "86398   0.020125    0  -0.000000    0  -0.000000    0",
+            "86399  99.999999  999   0.001000  999   0.001000  999",
+            "00000  -1.000500    2   0.002000    2   0.002000    2",
+            "00001  -0.000000    3   0.003000    3   0.003000    3",
+        ],
+    )